@@ -0,0 +1,14 @@
+"""Offline performance benchmarks.
+
+Everything here runs without network access: ``fakes`` provides
+deterministic stand-ins for the OpenAI embedding and chat models and
+``corpus`` generates a synthetic document collection, so numbers are
+comparable across machines and runs. See ``python -m benchmarks --help``.
+"""
+
+import os
+
+# Chroma's telemetry client batches events in a dict without a lock, which
+# fails queries under concurrent load, and must not phone home from an
+# air-gapped run. Chroma reads this when a client is created.
+os.environ.setdefault("CHROMA_PRODUCT_TELEMETRY_IMPL", "benchmarks.fakes.NoTelemetry")
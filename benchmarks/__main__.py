@@ -0,0 +1,135 @@
+"""CLI: ``python -m benchmarks run``, ``compare`` and ``sweep``."""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+from benchmarks.compare import compare, format_comparison
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks",
+        description="Offline benchmarks for ingestion and query performance",
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run = commands.add_parser("run", help="Run the suite and write JSON results")
+    run.add_argument("--scale", choices=["tiny", "small", "medium"], default="small")
+    run.add_argument("--backend", choices=["chroma", "numpy"], default="chroma")
+    run.add_argument("--shards", type=int, default=1, help="Shards of the benchmark collection")
+    run.add_argument("--seed", type=int, default=0)
+    run.add_argument("--ask-concurrency", type=int, default=8)
+    run.add_argument("--out", type=Path, default=None, help="Results file (default: stdout)")
+
+    diff = commands.add_parser("compare", help="Compare two result files")
+    diff.add_argument("baseline", type=Path)
+    diff.add_argument("current", type=Path)
+    diff.add_argument(
+        "--threshold",
+        type=float,
+        default=0.10,
+        help="Relative change counted as a regression (default 0.10)",
+    )
+
+    sweep = commands.add_parser(
+        "sweep", help="Score retrieval parameters on labeled questions over the ingested collection"
+    )
+    sweep.add_argument("labels", type=Path, help="JSON lines of {question, relevant}")
+    sweep.add_argument("--top-k", type=int, nargs="+", default=None)
+    sweep.add_argument("--rerank-k", type=int, nargs="+", default=None)
+    sweep.add_argument("--rrf-k", type=int, nargs="+", default=None)
+    sweep.add_argument(
+        "--pool-factor", type=int, nargs="+", default=None,
+        help="Vector candidates per top_k re-scored by BM25 (candidates scope only)",
+    )
+    sweep.add_argument(
+        "--scope", choices=["corpus", "candidates"], nargs="+", default=None,
+        help="Keyword search scopes to sweep (default from .env)",
+    )
+    sweep.add_argument(
+        "--latency", choices=["p50", "p95"], default="p50",
+        help="Latency percentile used for the Pareto frontier",
+    )
+    sweep.add_argument("--out", type=Path, default=None, help="Also write rows as JSON")
+    return parser
+
+
+def main() -> None:
+    args = build_parser().parse_args()
+
+    if args.command == "compare":
+        baseline = json.loads(args.baseline.read_text())
+        current = json.loads(args.current.read_text())
+        if baseline["meta"].get("scale") != current["meta"].get("scale"):
+            print("⚠️  Runs used different scales; absolute numbers are not comparable", file=sys.stderr)
+        rows = compare(baseline, current, args.threshold)
+        print(format_comparison(rows))
+        regressions = [r["metric"] for r in rows if r["status"] == "regression"]
+        if regressions:
+            print(f"\n❌ {len(regressions)} regression(s): {', '.join(regressions)}")
+            sys.exit(1)
+        print("\n✅ No regressions")
+        return
+
+    if args.command == "sweep":
+        run_sweep_command(args)
+        return
+
+    # Imported here so ``compare`` works without the application's dependencies.
+    from benchmarks.suite import run_suite
+
+    results = run_suite(
+        scale=args.scale,
+        backend=args.backend,
+        shards=args.shards,
+        seed=args.seed,
+        ask_concurrency=args.ask_concurrency,
+        log=lambda message: print(f"⏱️  {message}", file=sys.stderr),
+    )
+    text = json.dumps(results, indent=2)
+    if args.out:
+        args.out.write_text(text + "\n")
+        print(f"✅ Wrote {args.out}", file=sys.stderr)
+    else:
+        print(text)
+
+
+def run_sweep_command(args: argparse.Namespace) -> None:
+    from benchmarks.sweep import format_sweep, load_labels, pareto_frontier, run_sweep
+
+    try:
+        labels = load_labels(args.labels)
+    except (OSError, ValueError) as exc:
+        print(f"❌ {exc}", file=sys.stderr)
+        sys.exit(1)
+    if not labels:
+        print(f"❌ No labeled questions in {args.labels}", file=sys.stderr)
+        sys.exit(1)
+
+    grid = {
+        name: values
+        for name, values in [
+            ("top_k", args.top_k),
+            ("rerank_k", args.rerank_k),
+            ("rrf_k", args.rrf_k),
+            ("pool_factor", args.pool_factor),
+        ]
+        if values
+    }
+    rows = run_sweep(
+        labels,
+        grid,
+        args.scope,
+        log=lambda message: print(f"⏱️  {message}", file=sys.stderr),
+    )
+    frontier = pareto_frontier(rows, latency=f"{args.latency}_ms")
+    print(format_sweep(rows, frontier))
+    if args.out:
+        args.out.write_text(json.dumps({"rows": rows, "pareto": frontier}, indent=2) + "\n")
+        print(f"✅ Wrote {args.out}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+"""Compare two benchmark result files and flag regressions."""
+
+from __future__ import annotations
+
+import math
+
+
+def compare(baseline: dict, current: dict, threshold: float = 0.10) -> list[dict]:
+    """
+    One row per metric present in both runs. ``change`` is the relative
+    change in the metric's *better* direction (positive = improvement); a
+    metric that got worse by more than ``threshold`` is a regression.
+    """
+    rows = []
+    for name, base in baseline["metrics"].items():
+        new = current["metrics"].get(name)
+        if new is None:
+            continue
+        old_value, new_value = base["value"], new["value"]
+        if old_value == new_value:
+            change = 0.0
+        elif old_value == 0:
+            change = math.inf if new_value > 0 else -math.inf
+        else:
+            change = (new_value - old_value) / abs(old_value)
+        if base["better"] == "lower" and change:
+            change = -change
+        if change < -threshold:
+            status = "regression"
+        elif change > threshold:
+            status = "improved"
+        else:
+            status = "ok"
+        rows.append({
+            "metric": name,
+            "unit": base["unit"],
+            "baseline": old_value,
+            "current": new_value,
+            "change": change,
+            "status": status,
+        })
+    return rows
+
+
+def format_comparison(rows: list[dict]) -> str:
+    width = max([len(r["metric"]) for r in rows] + [6])
+    lines = [f"{'metric':<{width}}  {'baseline':>12}  {'current':>12}  {'change':>8}  status"]
+    for r in rows:
+        change = f"{r['change']:+.1%}" if math.isfinite(r["change"]) else f"{r['change']:+}"
+        flag = "REGRESSION" if r["status"] == "regression" else r["status"]
+        lines.append(
+            f"{r['metric']:<{width}}  {r['baseline']:>12g}  {r['current']:>12g}  {change:>8}  {flag}"
+        )
+    return "\n".join(lines)
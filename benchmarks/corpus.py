@@ -0,0 +1,72 @@
+"""Synthetic corpus and question generator.
+
+Pages are built from a fixed pseudo-word vocabulary with a Zipf-like
+frequency distribution, split into sentences and paragraphs, so chunking,
+BM25 and hashed embeddings all see text with realistic structure. The
+same seed always yields the same corpus.
+"""
+
+from __future__ import annotations
+
+import numpy as np
+from langchain_core.documents import Document
+
+_SYLLABLES = [
+    "ka", "to", "ri", "ne", "mo", "sa", "lu", "vi", "de", "po",
+    "an", "el", "or", "um", "is", "qu", "ze", "ba", "fi", "go",
+]
+
+
+def vocabulary(size: int = 5000, seed: int = 0) -> list[str]:
+    """``size`` distinct pseudo-words of two to four syllables."""
+    rng = np.random.default_rng(seed)
+    words: dict[str, None] = {}
+    while len(words) < size:
+        parts = rng.choice(_SYLLABLES, rng.integers(2, 5))
+        words["".join(parts)] = None
+    return list(words)
+
+
+def synthetic_documents(
+    files: int = 20,
+    pages_per_file: int = 5,
+    words_per_page: int = 400,
+    vocab_size: int = 5000,
+    seed: int = 0,
+) -> list[Document]:
+    """Page documents with the metadata ``load_pdf`` would produce."""
+    rng = np.random.default_rng(seed)
+    vocab = np.array(vocabulary(vocab_size, seed))
+    ranks = np.arange(1, vocab_size + 1)
+    weights = 1.0 / ranks
+    weights /= weights.sum()
+
+    pages = []
+    for f in range(files):
+        source = f"/synthetic/doc_{f:04d}.pdf"
+        for p in range(pages_per_file):
+            words = vocab[rng.choice(vocab_size, words_per_page, p=weights)]
+            sentences, start = [], 0
+            while start < len(words):
+                end = start + int(rng.integers(8, 20))
+                sentences.append(" ".join(words[start:end]).capitalize() + ".")
+                start = end
+            paragraphs = [
+                " ".join(sentences[i:i + 5]) for i in range(0, len(sentences), 5)
+            ]
+            pages.append(Document(
+                page_content="\n\n".join(paragraphs),
+                metadata={"source": source, "page": p},
+            ))
+    return pages
+
+
+def synthetic_questions(documents: list[Document], count: int = 100, seed: int = 0) -> list[str]:
+    """Questions built from a few consecutive words of random pages."""
+    rng = np.random.default_rng(seed + 1)
+    questions = []
+    for i in rng.integers(0, len(documents), count):
+        words = documents[i].page_content.replace(".", "").split()
+        start = int(rng.integers(0, max(1, len(words) - 6)))
+        questions.append(f"What does the document say about {' '.join(words[start:start + 4]).lower()}?")
+    return questions
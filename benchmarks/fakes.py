@@ -0,0 +1,117 @@
+"""Deterministic stand-ins for the OpenAI embedding and chat models, and Chroma telemetry."""
+
+from __future__ import annotations
+
+import asyncio
+import re
+import time
+import zlib
+from typing import Any, AsyncIterator, Iterator
+
+import numpy as np
+from chromadb.telemetry.product import ProductTelemetryClient, ProductTelemetryEvent
+from langchain_core.embeddings import Embeddings
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from overrides import override
+
+_TOKEN = re.compile(r"\w+")
+
+
+class HashEmbeddings(Embeddings):
+    """
+    Signed feature hashing of lowercase word tokens into ``size``
+    dimensions, L2-normalized. Texts sharing words get similar vectors, so
+    semantic search behaves plausibly, and the same text always maps to the
+    same vector in every process. ``latency`` seconds are slept per call to
+    model a remote API.
+    """
+
+    def __init__(self, size: int = 256, latency: float = 0.0):
+        self.size = size
+        self.latency = latency
+
+    def _embed(self, text: str) -> list[float]:
+        vector = np.zeros(self.size, dtype=np.float32)
+        for token in _TOKEN.findall(text.lower()):
+            h = zlib.crc32(token.encode())
+            vector[h % self.size] += 1.0 if h & 0x80000000 else -1.0
+        norm = np.linalg.norm(vector)
+        return (vector / norm if norm else vector).tolist()
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        if self.latency:
+            time.sleep(self.latency)
+        return [self._embed(t) for t in texts]
+
+    def embed_query(self, text: str) -> list[float]:
+        return self.embed_documents([text])[0]
+
+    async def aembed_documents(self, texts: list[str]) -> list[list[float]]:
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        return [self._embed(t) for t in texts]
+
+    async def aembed_query(self, text: str) -> list[float]:
+        return (await self.aembed_documents([text]))[0]
+
+
+class FakeChatModel(BaseChatModel):
+    """
+    Chat model that answers with the first ``tokens`` words of the prompt's
+    context. ``latency`` seconds are spent before the first token and
+    ``token_latency`` between streamed tokens.
+    """
+
+    tokens: int = 48
+    latency: float = 0.0
+    token_latency: float = 0.0
+
+    @property
+    def _llm_type(self) -> str:
+        return "benchmark-fake"
+
+    def _words(self, messages: list[BaseMessage]) -> list[str]:
+        prompt = str(messages[-1].content)
+        context = prompt.split("---", 2)[1] if prompt.count("---") >= 2 else prompt
+        words = context.split()[: self.tokens] or ["No", "context."]
+        return [w + " " for w in words]
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs: Any) -> ChatResult:
+        if self.latency:
+            time.sleep(self.latency)
+        content = "".join(self._words(messages)).strip()
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=content))])
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs: Any) -> ChatResult:
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        content = "".join(self._words(messages)).strip()
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=content))])
+
+    def _stream(self, messages, stop=None, run_manager=None, **kwargs: Any) -> Iterator[ChatGenerationChunk]:
+        if self.latency:
+            time.sleep(self.latency)
+        for word in self._words(messages):
+            if self.token_latency:
+                time.sleep(self.token_latency)
+            yield ChatGenerationChunk(message=AIMessageChunk(content=word))
+
+    async def _astream(
+        self, messages, stop=None, run_manager=None, **kwargs: Any
+    ) -> AsyncIterator[ChatGenerationChunk]:
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        for word in self._words(messages):
+            if self.token_latency:
+                await asyncio.sleep(self.token_latency)
+            yield ChatGenerationChunk(message=AIMessageChunk(content=word))
+
+
+class NoTelemetry(ProductTelemetryClient):
+    """Chroma product telemetry client that drops every event."""
+
+    @override
+    def capture(self, event: ProductTelemetryEvent) -> None:
+        pass
@@ -0,0 +1,362 @@
+"""Benchmark cases and the runner that isolates them from local data.
+
+Each case returns a flat ``{name: metric}`` mapping where a metric is
+``{"value", "unit", "better"}`` and ``better`` is ``"higher"`` or
+``"lower"``; ``compare`` uses it to decide which direction is a
+regression. The runner points every store at a temporary directory and
+injects the stand-in models, so a run never reads or writes ``./data``
+and never calls OpenAI.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+
+import httpx
+import numpy as np
+from langchain_core.documents import Document
+
+from benchmarks.corpus import synthetic_documents, synthetic_questions
+from benchmarks.fakes import FakeChatModel, HashEmbeddings
+from src.clients import registry
+from src.config import settings
+from src.ingestion.embedder import chunk_ids, ingest_documents
+from src.ingestion.jobs import close_job_manager
+from src.ingestion.loader import chunk_documents
+from src.search.hybrid import fuse_rankings, hybrid_search
+
+SCHEMA_VERSION = 1
+
+SCALES = {
+    "tiny": dict(
+        files=4, pages_per_file=3, words_per_page=300, queries=20, asks=10, rrf_calls=200, cold_starts=1,
+    ),
+    "small": dict(
+        files=40, pages_per_file=5, words_per_page=400, queries=200, asks=100, rrf_calls=2000, cold_starts=3,
+    ),
+    "medium": dict(
+        files=200, pages_per_file=10, words_per_page=400, queries=500, asks=300, rrf_calls=5000, cold_starts=5,
+    ),
+}
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# Settings a cold-start subprocess inherits through the environment
+CHILD_SETTINGS = (
+    "openai_api_key",
+    "vector_backend",
+    "collection_shards",
+    "chroma_persist_dir",
+    "vector_index_dir",
+    "bm25_index_db",
+    "embedding_cache_db",
+    "ingest_manifest_db",
+    "jobs_db",
+    "retrieval_cache_db",
+    "upload_dir",
+)
+
+# Run in a fresh interpreter: import the API, start its lifespan and time
+# the first /health response, both from the start of the import.
+STARTUP_PROBE = """
+import asyncio, json, time
+started = time.perf_counter()
+from src.api.server import app
+imported = time.perf_counter()
+import httpx
+
+async def first_request():
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://benchmark") as client:
+            (await client.get("/health")).raise_for_status()
+            return time.perf_counter()
+
+answered = asyncio.run(first_request())
+print(json.dumps({
+    "import_ms": (imported - started) * 1000,
+    "first_request_ms": (answered - started) * 1000,
+}))
+"""
+
+
+def metric(value: float, unit: str, better: str) -> dict:
+    return {"value": round(float(value), 4), "unit": unit, "better": better}
+
+
+def latency_metrics(prefix: str, samples_ms: list[float]) -> dict:
+    p50, p95, p99 = np.percentile(samples_ms, [50, 95, 99])
+    return {
+        f"{prefix}.p50_ms": metric(p50, "ms", "lower"),
+        f"{prefix}.p95_ms": metric(p95, "ms", "lower"),
+        f"{prefix}.p99_ms": metric(p99, "ms", "lower"),
+    }
+
+
+@contextmanager
+def isolated(workdir: Path, backend: str = "chroma", shards: int = 1):
+    """Point every store at ``workdir``, disable caches and limits, install the fakes."""
+    overrides = {
+        "openai_api_key": "benchmark",
+        "vector_backend": backend,
+        "collection_shards": shards,
+        "chroma_persist_dir": str(workdir / "chroma"),
+        "vector_index_dir": str(workdir / "vectors"),
+        "bm25_index_db": str(workdir / "bm25_index.db"),
+        "embedding_cache_db": str(workdir / "embedding_cache.db"),
+        "ingest_manifest_db": str(workdir / "ingest_manifest.db"),
+        "jobs_db": str(workdir / "jobs.db"),
+        "retrieval_cache_db": str(workdir / "retrieval_cache.db"),
+        "upload_dir": str(workdir / "uploads"),
+        # Measure the uncached paths; the fakes cost nothing to rate-limit.
+        "embedding_cache_enabled": False,
+        "answer_cache_enabled": False,
+        "retrieval_cache_enabled": False,
+        "embedding_requests_per_minute": 0,
+        "embedding_tokens_per_minute": 0,
+    }
+    registry.shutdown()
+    with override_settings(**overrides):
+        try:
+            install_fakes()
+            yield
+        finally:
+            registry.shutdown()
+            close_job_manager()
+
+
+@contextmanager
+def override_settings(**values):
+    """Temporarily set ``settings`` attributes, restoring them on exit."""
+    saved = {name: getattr(settings, name) for name in values}
+    for name, value in values.items():
+        setattr(settings, name, value)
+    try:
+        yield
+    finally:
+        for name, value in saved.items():
+            setattr(settings, name, value)
+
+
+def install_fakes() -> None:
+    registry.set(embeddings=HashEmbeddings(), chat_model=FakeChatModel())
+
+
+# -- Cases -------------------------------------------------------------------
+
+
+def bench_chunking(pages: list[Document], repeats: int = 3) -> tuple[dict, list[Document]]:
+    """``chunk_documents`` throughput over the synthetic pages (best of ``repeats``)."""
+    megabytes = sum(len(p.page_content) for p in pages) / 1e6
+    best = float("inf")
+    for _ in range(repeats):
+        copies = [Document(page_content=p.page_content, metadata=dict(p.metadata)) for p in pages]
+        started = time.perf_counter()
+        chunks = chunk_documents(copies)
+        best = min(best, time.perf_counter() - started)
+    return {
+        "chunk.pages_per_sec": metric(len(pages) / best, "pages/s", "higher"),
+        "chunk.chunks_per_sec": metric(len(chunks) / best, "chunks/s", "higher"),
+        "chunk.mb_per_sec": metric(megabytes / best, "MB/s", "higher"),
+    }, chunks
+
+
+def bench_ingest(chunks: list[Document]) -> dict:
+    """``ingest_documents`` into an empty store: embed, vector upsert and BM25 indexing."""
+    started = time.perf_counter()
+    stats = ingest_documents(chunks)
+    elapsed = time.perf_counter() - started
+    if stats["failed_chunks"]:
+        raise RuntimeError(f"Ingest failed: {stats['errors'][:3]}")
+    return {
+        "ingest.chunks_per_sec": metric(stats["new_chunks"] / elapsed, "chunks/s", "higher"),
+        "ingest.seconds": metric(elapsed, "s", "lower"),
+    }
+
+
+def bench_search(questions: list[str], warmup: int = 5) -> dict:
+    """Per-query ``hybrid_search`` latency with the retrieval cache off."""
+    for question in questions[:warmup]:
+        hybrid_search(question)
+    samples = []
+    started = time.perf_counter()
+    for question in questions:
+        t = time.perf_counter()
+        hybrid_search(question)
+        samples.append((time.perf_counter() - t) * 1000)
+    elapsed = time.perf_counter() - started
+    return {
+        **latency_metrics("hybrid_search", samples),
+        "hybrid_search.qps": metric(len(questions) / elapsed, "queries/s", "higher"),
+    }
+
+
+def bench_rrf(chunks: list[Document], calls: int, k: int | None = None, seed: int = 0) -> dict:
+    """Cost of fusing two ``k``-long rankings that share about half their chunk ids."""
+    k = k or settings.top_k
+    rng = np.random.default_rng(seed)
+    ids = chunk_ids(chunks)
+    pool = min(len(ids), int(k * 1.5))
+    legs = []
+    for _ in range(calls):
+        picked = rng.choice(len(ids), pool, replace=False)
+        legs.append([
+            [(ids[i], 1.0) for i in picked[:k]],
+            [(ids[i], 1.0) for i in rng.permutation(picked[-k:])],
+        ])
+    started = time.perf_counter()
+    for rankings in legs:
+        fuse_rankings(rankings)
+    elapsed = time.perf_counter() - started
+    return {"rrf.us_per_call": metric(elapsed * 1e6 / calls, "us", "lower")}
+
+
+async def _ask_load(questions: list[str], concurrency: int) -> tuple[list[float], int, float]:
+    from src.api.server import app
+
+    semaphore = asyncio.Semaphore(concurrency)
+    samples: list[float] = []
+    errors = 0
+
+    async def one(client: httpx.AsyncClient, question: str) -> None:
+        nonlocal errors
+        async with semaphore:
+            t = time.perf_counter()
+            response = await client.post("/ask", json={"question": question})
+            samples.append((time.perf_counter() - t) * 1000)
+            if response.status_code != 200:
+                errors += 1
+
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://benchmark") as client:
+            started = time.perf_counter()
+            await asyncio.gather(*(one(client, q) for q in questions))
+            elapsed = time.perf_counter() - started
+    return samples, errors, elapsed
+
+
+def bench_ask(questions: list[str], concurrency: int = 8) -> dict:
+    """End-to-end ``/ask`` through the FastAPI app with the stand-in chat model."""
+    samples, errors, elapsed = asyncio.run(_ask_load(questions, concurrency))
+    install_fakes()
+    return {
+        **latency_metrics("ask", samples),
+        "ask.requests_per_sec": metric(len(questions) / elapsed, "requests/s", "higher"),
+        "ask.errors": metric(errors, "requests", "lower"),
+    }
+
+
+def _child_env() -> dict[str, str]:
+    """The environment plus the current (isolated) settings, for subprocesses."""
+    return {**os.environ, **{name.upper(): str(getattr(settings, name)) for name in CHILD_SETTINGS}}
+
+
+def bench_startup(runs: int = 3) -> dict:
+    """
+    Cold start in fresh interpreters: time to import the API, time to its
+    first ``/health`` response, and wall time of ``ingest.py --stats``.
+    Medians over ``runs``.
+    """
+    env = _child_env()
+    imports, first_requests, stats = [], [], []
+    for _ in range(runs):
+        probe = subprocess.run(
+            [sys.executable, "-c", STARTUP_PROBE],
+            cwd=ROOT, env=env, capture_output=True, text=True, check=True,
+        )
+        found = json.loads(probe.stdout.strip().splitlines()[-1])
+        imports.append(found["import_ms"])
+        first_requests.append(found["first_request_ms"])
+
+        started = time.perf_counter()
+        subprocess.run(
+            [sys.executable, "ingest.py", "--stats", "."],
+            cwd=ROOT, env=env, capture_output=True, check=True,
+        )
+        stats.append((time.perf_counter() - started) * 1000)
+    return {
+        "startup.import_ms": metric(np.median(imports), "ms", "lower"),
+        "startup.first_request_ms": metric(np.median(first_requests), "ms", "lower"),
+        "startup.ingest_stats_ms": metric(np.median(stats), "ms", "lower"),
+    }
+
+
+# -- Runner ------------------------------------------------------------------
+
+
+def _git_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_suite(
+    scale: str = "small",
+    backend: str = "chroma",
+    shards: int = 1,
+    seed: int = 0,
+    ask_concurrency: int = 8,
+    log=print,
+) -> dict:
+    """Run every case at ``scale`` against a throwaway store and return the results document."""
+    params = SCALES[scale]
+    pages = synthetic_documents(
+        files=params["files"],
+        pages_per_file=params["pages_per_file"],
+        words_per_page=params["words_per_page"],
+        seed=seed,
+    )
+    questions = synthetic_questions(pages, params["queries"], seed=seed)
+    metrics: dict[str, dict] = {}
+
+    with tempfile.TemporaryDirectory(prefix="rag-bench-") as workdir, isolated(Path(workdir), backend, shards):
+        log(f"chunking {len(pages)} pages")
+        found, chunks = bench_chunking(pages)
+        metrics.update(found)
+        log(f"ingesting {len(chunks)} chunks")
+        metrics.update(bench_ingest(chunks))
+        log(f"searching {len(questions)} queries")
+        metrics.update(bench_search(questions))
+        log(f"fusing {params['rrf_calls']} result pairs")
+        metrics.update(bench_rrf(chunks, params["rrf_calls"], seed=seed))
+        log(f"asking {params['asks']} questions at concurrency {ask_concurrency}")
+        metrics.update(bench_ask(questions[: params["asks"]], ask_concurrency))
+        log(f"cold-starting the API and ingest.py --stats {params['cold_starts']} time(s)")
+        metrics.update(bench_startup(params["cold_starts"]))
+
+    return {
+        "schema": SCHEMA_VERSION,
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "git_commit": _git_commit(),
+            "python": sys.version.split()[0],
+            "numpy": np.__version__,
+            "platform": platform.platform(),
+            "scale": scale,
+            "backend": backend,
+            "shards": shards,
+            "seed": seed,
+            "ask_concurrency": ask_concurrency,
+            "pages": len(pages),
+            "chunks": len(chunks),
+            "chunk_size": settings.chunk_size,
+            "chunk_overlap": settings.chunk_overlap,
+            "top_k": settings.top_k,
+            "rerank_top_k": settings.rerank_top_k,
+        },
+        "metrics": metrics,
+    }
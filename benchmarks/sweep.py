@@ -0,0 +1,207 @@
+"""Sweep retrieval parameters over an ingested collection.
+
+Each configuration of ``top_k``, ``rerank_k``, the RRF constant and the
+keyword pool factor is run over a file of labeled questions and scored
+by recall@k (k = ``rerank_k``, the chunks the LLM actually sees), mean
+reciprocal rank and retrieval latency. The Pareto frontier holds the
+configurations no other one beats on recall, MRR and latency at once.
+
+Labels are JSON lines::
+
+    {"question": "What optimizer was used?", "relevant": ["<chunk id>", {"filename": "paper.pdf", "page": 4}]}
+
+A relevant entry is either a chunk id or a ``filename``/``page`` pair,
+which any chunk of that page satisfies. Queries are embedded once up
+front, so latency covers the vector query, keyword leg and fusion —
+the stages these parameters change — and not the embedding call.
+"""
+
+from __future__ import annotations
+
+import itertools
+import json
+import time
+from pathlib import Path
+from typing import NamedTuple
+
+import numpy as np
+from langchain_core.documents import Document
+
+from benchmarks.suite import override_settings
+from src.clients import registry
+from src.config import settings
+from src.ingestion.embedder import get_embeddings
+from src.search.hybrid import hybrid_search
+
+DEFAULT_GRID = {
+    "top_k": [5, 10, 20],
+    "rerank_k": [3, 5, 8],
+    "rrf_k": [10, 30, 60, 100],
+    "pool_factor": [1, 2, 3],
+}
+
+
+class LabeledQuestion(NamedTuple):
+    question: str
+    ids: frozenset[str]
+    pages: frozenset[tuple[str, str]]
+
+
+class Config(NamedTuple):
+    scope: str
+    top_k: int
+    rerank_k: int
+    rrf_k: int
+    # Only used by the "candidates" keyword scope
+    pool_factor: int | None
+
+
+def load_labels(path: Path) -> list[LabeledQuestion]:
+    """Read a JSON-lines label file; blank lines are skipped."""
+    labels = []
+    for number, line in enumerate(Path(path).read_text().splitlines(), 1):
+        if not line.strip():
+            continue
+        try:
+            entry = json.loads(line)
+            ids, pages = set(), set()
+            for target in entry["relevant"]:
+                if isinstance(target, str):
+                    ids.add(target)
+                else:
+                    pages.add((target["filename"], str(target["page"])))
+            question = entry["question"]
+        except (ValueError, KeyError, TypeError) as exc:
+            raise ValueError(f"{path}:{number}: invalid label line ({exc})") from exc
+        if not ids and not pages:
+            raise ValueError(f"{path}:{number}: no relevant chunks listed")
+        labels.append(LabeledQuestion(question, frozenset(ids), frozenset(pages)))
+    return labels
+
+
+def score(results: list[Document], label: LabeledQuestion) -> tuple[float, float]:
+    """Recall and reciprocal rank of one result list."""
+    found: set = set()
+    first_hit = None
+    for rank, doc in enumerate(results, 1):
+        page = (doc.metadata.get("filename"), str(doc.metadata.get("page")))
+        matched = [target for target in (doc.id, page) if target in label.ids or target in label.pages]
+        if matched and first_hit is None:
+            first_hit = rank
+        found.update(matched)
+    recall = len(found) / (len(label.ids) + len(label.pages))
+    return recall, 1.0 / first_hit if first_hit else 0.0
+
+
+def configurations(grid: dict[str, list[int]], scopes: list[str]) -> list[Config]:
+    """Every grid point; pool factors are only expanded for the "candidates" scope."""
+    configs = []
+    for scope in scopes:
+        pools = grid["pool_factor"] if scope == "candidates" else [None]
+        for top_k, rerank_k, rrf_k, pool in itertools.product(
+            grid["top_k"], grid["rerank_k"], grid["rrf_k"], pools
+        ):
+            configs.append(Config(scope, top_k, rerank_k, rrf_k, pool))
+    return configs
+
+
+def pareto_frontier(rows: list[dict], latency: str = "p50_ms") -> list[dict]:
+    """Rows not dominated on (recall ↑, MRR ↑, ``latency`` ↓), fastest first."""
+
+    def dominates(a: dict, b: dict) -> bool:
+        no_worse = a["recall"] >= b["recall"] and a["mrr"] >= b["mrr"] and a[latency] <= b[latency]
+        better = a["recall"] > b["recall"] or a["mrr"] > b["mrr"] or a[latency] < b[latency]
+        return no_worse and better
+
+    frontier = [row for row in rows if not any(dominates(other, row) for other in rows)]
+    return sorted(frontier, key=lambda row: row[latency])
+
+
+def run_sweep(
+    labels: list[LabeledQuestion],
+    grid: dict[str, list[int]] | None = None,
+    scopes: list[str] | None = None,
+    warmup: int = 5,
+    log=print,
+) -> list[dict]:
+    """Score every configuration against ``labels`` on the configured collection."""
+    grid = {**DEFAULT_GRID, **(grid or {})}
+    configs = configurations(grid, scopes or [settings.keyword_search_scope])
+
+    rows = []
+    # A cached ranking would make a configuration look free. The cache is
+    # built on first use, so this only holds in a process that has not
+    # searched yet, like the CLI.
+    with override_settings(retrieval_cache_enabled=False):
+        if registry.retrieval_cache() is not None:
+            raise RuntimeError("The retrieval cache is already in use; run the sweep in a fresh process")
+        log(f"embedding {len(labels)} questions")
+        vectors = get_embeddings().embed_documents([label.question for label in labels])
+        for label, vector in list(zip(labels, vectors))[:warmup]:
+            hybrid_search(label.question, vector=vector)
+
+        for number, config in enumerate(configs, 1):
+            log(f"[{number}/{len(configs)}] {describe(config)}")
+            rows.append(_run_config(config, labels, vectors))
+    return rows
+
+
+def _run_config(config: Config, labels: list[LabeledQuestion], vectors: list[list[float]]) -> dict:
+    overrides = {"keyword_search_scope": config.scope, "rrf_k": config.rrf_k}
+    if config.pool_factor is not None:
+        overrides["keyword_pool_factor"] = config.pool_factor
+    recalls, reciprocal_ranks, samples = [], [], []
+    with override_settings(**overrides):
+        for label, vector in zip(labels, vectors):
+            t0 = time.perf_counter()
+            results = hybrid_search(label.question, config.top_k, config.rerank_k, vector=vector)
+            samples.append((time.perf_counter() - t0) * 1000)
+            recall, reciprocal = score(results, label)
+            recalls.append(recall)
+            reciprocal_ranks.append(reciprocal)
+    p50, p95 = np.percentile(samples, [50, 95])
+    return {
+        **config._asdict(),
+        "recall": round(float(np.mean(recalls)), 4),
+        "mrr": round(float(np.mean(reciprocal_ranks)), 4),
+        "p50_ms": round(float(p50), 3),
+        "p95_ms": round(float(p95), 3),
+    }
+
+
+def describe(config: Config | dict) -> str:
+    """Settings of a configuration as ``.env`` assignments."""
+    values = config._asdict() if isinstance(config, Config) else config
+    parts = [
+        f"KEYWORD_SEARCH_SCOPE={values['scope']}",
+        f"TOP_K={values['top_k']}",
+        f"RERANK_TOP_K={values['rerank_k']}",
+        f"RRF_K={values['rrf_k']}",
+    ]
+    if values["pool_factor"] is not None:
+        parts.append(f"KEYWORD_POOL_FACTOR={values['pool_factor']}")
+    return " ".join(parts)
+
+
+def format_sweep(rows: list[dict], frontier: list[dict]) -> str:
+    optimal = {id(row) for row in frontier}
+    header = (
+        f"  {'scope':<10}  {'top_k':>5}  {'rerank':>6}  {'rrf_k':>5}  {'pool':>4}"
+        f"  {'recall@k':>8}  {'MRR':>6}  {'p50 ms':>8}  {'p95 ms':>8}"
+    )
+    lines = [header]
+    for row in sorted(rows, key=lambda r: (-r["recall"], -r["mrr"], r["p50_ms"])):
+        pool = "-" if row["pool_factor"] is None else row["pool_factor"]
+        lines.append(
+            f"{'*' if id(row) in optimal else ' '} {row['scope']:<10}  {row['top_k']:>5}"
+            f"  {row['rerank_k']:>6}  {row['rrf_k']:>5}  {pool:>4}  {row['recall']:>8.3f}"
+            f"  {row['mrr']:>6.3f}  {row['p50_ms']:>8.2f}  {row['p95_ms']:>8.2f}"
+        )
+    lines.append("")
+    lines.append("Pareto-optimal settings (* above), fastest first:")
+    for row in frontier:
+        lines.append(
+            f"  recall@k={row['recall']:.3f}  MRR={row['mrr']:.3f}  p50={row['p50_ms']:.2f}ms"
+            f"  p95={row['p95_ms']:.2f}ms  {describe(row)}"
+        )
+    return "\n".join(lines)
@@ -5,11 +5,24 @@ import argparse
 import sys
 from pathlib import Path
 
-from src.ingestion.loader import load_pdf, load_directory, chunk_documents
-from src.ingestion.embedder import ingest_documents, get_collection_stats
+import numpy as np
 
+from src.clients import registry
+from src.config import settings
+from src.ingestion.embedder import get_collection_stats, get_vector_backend, rebuild_keyword_index
+from src.ingestion.pipeline import run_ingest_pipeline
+from src.search.compression import candidate_codecs, recall_report
+from src.search.sharding import collection_name
 
-def main():
+
+def collection_arg(value: str) -> str:
+    try:
+        return collection_name(value)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e))
+
+
+def build_parser() -> argparse.ArgumentParser:
     parser = argparse.ArgumentParser(description="Ingest PDFs into the RAG system")
     parser.add_argument(
         "path",
@@ -28,54 +41,168 @@ def main():
         default=None,
         help="Override chunk overlap (default from .env)",
     )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=settings.ingest_workers,
+        help="Processes used to parse and chunk PDFs in parallel (default from .env)",
+    )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Re-parse every file, even those unchanged since the last ingest",
+    )
+    parser.add_argument(
+        "--collection",
+        type=collection_arg,
+        default=None,
+        help="Collection to ingest into or report on (default from .env)",
+    )
     parser.add_argument("--stats", action="store_true", help="Show collection stats and exit")
+    parser.add_argument(
+        "--rebuild-keyword-index",
+        action="store_true",
+        help="Rebuild the BM25 keyword index from the vector store and exit",
+    )
+    parser.add_argument(
+        "--compression-report",
+        action="store_true",
+        help="Report recall vs memory of each vector storage setting on stored vectors and exit",
+    )
+    parser.add_argument(
+        "--report-sample",
+        type=int,
+        default=5000,
+        help="Stored vectors sampled for --compression-report (default 5000)",
+    )
+    return parser
 
-    args = parser.parse_args()
 
+def print_compression_report(sample: int, collection: str | None = None) -> None:
+    """Score every codec on a sample of stored vectors, holding some out as queries."""
+    vectors = get_vector_backend(collection).sample_vectors(sample)
+    if len(vectors) < 10:
+        print("❌ Not enough stored vectors for a report")
+        sys.exit(1)
+    vectors = vectors[np.random.default_rng(0).permutation(len(vectors))]
+    held_out = min(200, len(vectors) // 5)
+    k = min(settings.top_k, len(vectors) - held_out)
+    rows = recall_report(
+        vectors[held_out:],
+        vectors[:held_out],
+        candidate_codecs(vectors.shape[1]),
+        k=k,
+        rescore=settings.vector_rescore,
+    )
+    print(
+        f"📐 Recall@{k} vs exact search: {len(vectors) - held_out} vectors,"
+        f" {held_out} held-out queries, shortlist {k * settings.vector_rescore}"
+    )
+    print(f"   {'storage':<8} {'dims':>5} {'bytes':>6} {'memory':>7} {'coarse':>7} {'rescored':>9} {'ms/q':>7}")
+    for row in rows:
+        print(
+            f"   {row['storage']:<8} {row['dims']:>5} {row['bytes_per_vector']:>6}"
+            f" {row['memory_reduction']:>6.2f}x {row['recall_coarse']:>7.3f}"
+            f" {row['recall_rescored']:>9.3f} {row['ms_per_query']:>7.2f}"
+        )
+
+
+def run(args: argparse.Namespace) -> None:
+    """Execute one CLI invocation using the shared client registry."""
     if args.stats:
-        stats = get_collection_stats()
+        stats = get_collection_stats(args.collection)
         print(f"📊 Collection Stats:")
+        print(f"   Collection: {stats['collection']} ({stats['shards']} shard(s))")
         print(f"   Documents: {stats['total_documents']}")
         print(f"   Location:  {stats['persist_dir']}")
         return
 
+    if args.compression_report:
+        print_compression_report(args.report_sample, args.collection)
+        return
+
+    if args.rebuild_keyword_index:
+        print("🔄 Rebuilding keyword index...")
+        indexed = rebuild_keyword_index(collection=args.collection)
+        print(f"✅ Indexed {indexed} chunks")
+        return
+
     target = Path(args.path)
 
     if target.is_file() and target.suffix.lower() == ".pdf":
         print(f"📄 Loading: {target.name}")
-        documents = load_pdf(target)
+        pdfs = [target]
     elif target.is_dir():
-        pdfs = list(target.glob("*.pdf"))
+        pdfs = sorted(target.glob("*.pdf"))
         print(f"📁 Found {len(pdfs)} PDF(s) in {target}")
         if not pdfs:
             print("❌ No PDF files found")
             sys.exit(1)
-        documents = load_directory(target)
     else:
         print(f"❌ Invalid path: {args.path}")
         sys.exit(1)
 
-    print(f"   Pages loaded: {len(documents)}")
+    # Stream parse → chunk → embed → store
+    print("🔄 Parsing, embedding and storing...")
+
+    def on_file(result):
+        if result.error:
+            line = f"   ❌ {result.path.name}: {result.error}"
+        else:
+            line = f"   {result.path.name}: {result.pages} pages, {len(result.chunks)} chunks in {result.seconds:.2f}s"
+        print(f"\r\033[K{line}")
+
+    def on_progress(progress):
+        print(
+            f"\r\033[K   📦 files {progress.files_done}/{progress.files_total}"
+            f" | chunks {progress.chunks_written}/{progress.chunks_parsed} stored"
+            f" | {progress.chunks_per_sec:.1f} chunks/s",
+            end="",
+            flush=True,
+        )
 
-    # Chunk
-    chunks = chunk_documents(
-        documents,
+    stats = run_ingest_pipeline(
+        pdfs,
+        workers=args.workers,
         chunk_size=args.chunk_size,
         chunk_overlap=args.chunk_overlap,
+        on_progress=on_progress,
+        on_file=on_file,
+        directory=target if target.is_dir() else None,
+        force=args.force,
+        collection=args.collection,
     )
-    print(f"   Chunks created: {len(chunks)}")
-
-    # Ingest
-    print("🔄 Embedding and storing...")
-    stats = ingest_documents(chunks)
+    print()
     print(f"✅ Done!")
+    print(f"   Chunks created: {stats['total_chunks']}")
     print(f"   New chunks:    {stats['new_chunks']}")
     print(f"   Duplicates:    {stats['duplicates_skipped']}")
+    if stats["skipped_files"]:
+        print(f"   Unchanged:     {stats['skipped_files']} file(s) skipped")
+    if stats["removed_files"] or stats["removed_chunks"]:
+        print(
+            f"   Retired:       {stats['removed_chunks']} stale chunk(s),"
+            f" {stats['removed_files']} removed file(s)"
+        )
+    if stats["failed_files"]:
+        print(f"⚠️  Files failed:  {stats['failed_files']}")
+    if stats["failed_chunks"]:
+        print(f"⚠️  Failed:        {stats['failed_chunks']} chunk(s)")
+    for error in stats["errors"]:
+        print(f"   - {error}")
 
     # Show total
-    total = get_collection_stats()
+    total = get_collection_stats(args.collection)
     print(f"   Total in store: {total['total_documents']}")
 
 
+def main():
+    args = build_parser().parse_args()
+    try:
+        run(args)
+    finally:
+        registry.shutdown()
+
+
 if __name__ == "__main__":
     main()
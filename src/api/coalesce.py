@@ -0,0 +1,139 @@
+"""Single-flight coalescing of identical concurrent requests.
+
+When many clients ask the same question at once, only the first request
+(the leader) runs retrieval and the LLM call; requests with the same key
+that arrive while it is in flight await the same result. Streaming
+followers replay the events the leader has produced so far and then
+receive the rest live. Nothing is kept once the flight finishes, so a
+request arriving afterwards always starts fresh; this shares work, it is
+not a cache.
+
+The shared work runs in its own task, so a leader whose client goes away
+does not fail its followers. A stream is cancelled once every subscriber
+has disconnected, as a single uncoalesced stream would be.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from typing import Any, AsyncIterator, Awaitable, Callable, Hashable
+
+from src.config import settings
+from src.metrics import COALESCED_REQUESTS
+from src.search.result_cache import normalize_query
+
+
+def request_key(route: str, question: str, *params: Any) -> tuple:
+    """Key under which identical requests to ``route`` are coalesced."""
+    return (route, normalize_query(question), *params)
+
+
+class _Stream:
+    """Events of one in-flight stream, replayable by late subscribers."""
+
+    def __init__(self) -> None:
+        self.events: list[Any] = []
+        self.finished = False
+        self.error: BaseException | None = None
+        self.subscribers = 0
+        self.task: asyncio.Task | None = None
+        self._changed = asyncio.Event()
+
+    def notify(self) -> None:
+        self._changed.set()
+        self._changed = asyncio.Event()
+
+    async def wait(self) -> None:
+        await self._changed.wait()
+
+
+class SingleFlight:
+    """In-flight calls and streams keyed by request, created lazily for the running loop."""
+
+    def __init__(self) -> None:
+        self._calls: dict[Hashable, asyncio.Task] = {}
+        self._streams: dict[Hashable, _Stream] = {}
+        self._loop: asyncio.AbstractEventLoop | None = None
+
+    def _bind(self) -> None:
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            self._calls.clear()
+            self._streams.clear()
+            self._loop = loop
+
+    def in_flight(self) -> int:
+        return len(self._calls) + len(self._streams)
+
+    async def call(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """Await ``fn()``, or the identical call already in flight under ``key``."""
+        if not settings.request_coalescing:
+            return await fn()
+        self._bind()
+        task = self._calls.get(key)
+        if task is None:
+            task = asyncio.ensure_future(fn())
+            self._calls[key] = task
+            task.add_done_callback(lambda done: self._forget(key, done))
+        else:
+            COALESCED_REQUESTS.inc(route=key[0])
+        # Shielded so one caller's cancellation does not cancel the others.
+        return await asyncio.shield(task)
+
+    def _forget(self, key: Hashable, task: asyncio.Task) -> None:
+        if self._calls.get(key) is task:
+            del self._calls[key]
+        # Mark the outcome retrieved even if every caller went away.
+        if not task.cancelled():
+            task.exception()
+
+    async def stream(self, key: Hashable, produce: Callable[[], AsyncIterator[Any]]) -> AsyncIterator[Any]:
+        """Iterate ``produce()``, or attach to the identical stream already in flight."""
+        if not settings.request_coalescing:
+            async for item in produce():
+                yield item
+            return
+        self._bind()
+        stream = self._streams.get(key)
+        if stream is None:
+            stream = self._streams[key] = _Stream()
+            stream.task = asyncio.ensure_future(self._pump(key, stream, produce))
+        else:
+            COALESCED_REQUESTS.inc(route=key[0])
+
+        stream.subscribers += 1
+        try:
+            position = 0
+            while True:
+                while position < len(stream.events):
+                    yield stream.events[position]
+                    position += 1
+                if stream.finished:
+                    if stream.error is not None:
+                        raise stream.error
+                    return
+                await stream.wait()
+        finally:
+            stream.subscribers -= 1
+            if stream.subscribers == 0 and not stream.finished:
+                # Nobody is listening: stop generating, and let the next
+                # identical request start a stream of its own.
+                if self._streams.get(key) is stream:
+                    del self._streams[key]
+                stream.task.cancel()
+
+    async def _pump(self, key: Hashable, stream: _Stream, produce: Callable[[], AsyncIterator[Any]]) -> None:
+        try:
+            async for item in produce():
+                stream.events.append(item)
+                stream.notify()
+        except Exception as exc:
+            stream.error = exc
+        finally:
+            stream.finished = True
+            if self._streams.get(key) is stream:
+                del self._streams[key]
+            stream.notify()
+
+
+flights = SingleFlight()
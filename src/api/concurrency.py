@@ -0,0 +1,51 @@
+"""Helpers that keep blocking work off the event loop.
+
+Blocking calls (PDF parsing, BM25 scoring, Chroma queries) run on the
+registry's bounded executor, and each endpoint family is capped by its
+own semaphore so a burst of ``/ask`` calls cannot starve ``/search`` or
+``/health``.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from contextlib import asynccontextmanager
+from functools import partial
+from typing import Any, Callable
+
+from src.clients import registry
+from src.config import settings
+
+
+async def run_blocking(fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+    """Run ``fn`` on the shared bounded executor and await its result."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(registry.executor(), partial(fn, *args, **kwargs))
+
+
+class EndpointLimits:
+    """Per-endpoint concurrency caps, created lazily for the running loop."""
+
+    def __init__(self) -> None:
+        self._semaphores: dict[str, asyncio.Semaphore] = {}
+        self._loop: asyncio.AbstractEventLoop | None = None
+
+    def _limit_for(self, name: str) -> int:
+        return getattr(settings, f"api_{name}_concurrency")
+
+    def _semaphore(self, name: str) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            self._semaphores.clear()
+            self._loop = loop
+        if name not in self._semaphores:
+            self._semaphores[name] = asyncio.Semaphore(max(1, self._limit_for(name)))
+        return self._semaphores[name]
+
+    @asynccontextmanager
+    async def limit(self, name: str):
+        async with self._semaphore(name):
+            yield
+
+
+limits = EndpointLimits()
@@ -2,16 +2,60 @@
 
 from __future__ import annotations
 
-from typing import List, Union
+from datetime import datetime, timezone
+from typing import Annotated, Any, Dict, List, Optional, Union
 
 from pydantic import BaseModel, Field
 
+from src.search.filters import MetadataFilter
+from src.search.sharding import COLLECTION_NAME_PATTERN
+
+CollectionName = Annotated[str, Field(pattern=COLLECTION_NAME_PATTERN)]
+
 
 # ---------------------------------------------------------------------------
 # Requests
 # ---------------------------------------------------------------------------
 
 
+def _epoch(moment: Optional[datetime]) -> Optional[float]:
+    """Unix time of ``moment``; naive datetimes are taken as UTC."""
+    if moment is None:
+        return None
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return moment.timestamp()
+
+
+class SearchFilters(BaseModel):
+    """Metadata conditions a retrieved chunk must meet; all given conditions apply."""
+
+    filenames: Optional[List[str]] = Field(
+        default=None, min_length=1, max_length=100, description="Only chunks of these PDF file names"
+    )
+    page_from: Optional[int] = Field(
+        default=None, ge=0, description="First page (0-based, as in sources), inclusive"
+    )
+    page_to: Optional[int] = Field(
+        default=None, ge=0, description="Last page (0-based, as in sources), inclusive"
+    )
+    ingested_after: Optional[datetime] = Field(
+        default=None, description="Only chunks ingested at or after this time"
+    )
+    ingested_before: Optional[datetime] = Field(
+        default=None, description="Only chunks ingested before this time"
+    )
+
+    def to_filter(self) -> MetadataFilter:
+        return MetadataFilter(
+            filenames=tuple(sorted(set(self.filenames))) if self.filenames else None,
+            page_from=self.page_from,
+            page_to=self.page_to,
+            ingested_after=_epoch(self.ingested_after),
+            ingested_before=_epoch(self.ingested_before),
+        )
+
+
 class QuestionRequest(BaseModel):
     """Payload for the /ask and /search endpoints."""
 
@@ -24,6 +68,25 @@ class QuestionRequest(BaseModel):
     rerank_k: int = Field(
         default=5, ge=1, le=20, description="Number of results after re-ranking"
     )
+    collections: Optional[List[CollectionName]] = Field(
+        default=None, min_length=1, max_length=16,
+        description="Collections to search (default collection when omitted)",
+    )
+    filters: Optional[SearchFilters] = Field(
+        default=None, description="Restrict retrieval to chunks matching these metadata conditions"
+    )
+
+
+class BatchQuestionRequest(BaseModel):
+    """Payload for the /search/batch and /ask/batch endpoints."""
+
+    questions: List[QuestionRequest] = Field(
+        ..., min_length=1, description="Questions, answered in order"
+    )
+    concurrency: Optional[int] = Field(
+        default=None, ge=1, le=32,
+        description="LLM calls in flight for /ask/batch (default from settings)",
+    )
 
 
 class IngestRequest(BaseModel):
@@ -32,6 +95,9 @@ class IngestRequest(BaseModel):
     directory: str = Field(
         default="./docs", description="Directory containing PDFs to ingest"
     )
+    collection: Optional[CollectionName] = Field(
+        default=None, description="Collection to ingest into (default collection when omitted)"
+    )
 
 
 # ---------------------------------------------------------------------------
@@ -52,15 +118,75 @@ class AnswerResponse(BaseModel):
     answer: str
     sources: List[SourceInfo]
     num_sources: int
+    timings_ms: Dict[str, float] = Field(
+        default_factory=dict, description="Per-stage retrieval and generation timings"
+    )
+    cache_hit: Optional[str] = Field(
+        default=None, description="'exact' or 'semantic' when served from the answer cache"
+    )
+    context_tokens: Optional[Dict[str, int]] = Field(
+        default=None,
+        description="Estimated context tokens sent, saved by merging and budgeting, and chunks dropped",
+    )
+
+
+class JobResponse(BaseModel):
+    """State of a background ingestion job (/ingest, /upload, /jobs)."""
+
+    id: str
+    kind: str
+    status: str = Field(description="queued, running, succeeded or failed")
+    stage: str = Field(description="queued, parsing, embedding, done or failed")
+    files_total: int
+    files_done: int
+    chunks_total: int
+    chunks_done: int
+    chunks_per_sec: float
+    errors: List[str]
+    result: Optional[Dict[str, Any]] = None
+    created_at: float
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+
+
+class JobListResponse(BaseModel):
+    """Response from the /jobs endpoint, newest first."""
+
+    jobs: List[JobResponse]
 
 
-class IngestResponse(BaseModel):
-    """Response from the /ingest endpoint with ingestion statistics."""
+class EmbeddingCacheStats(BaseModel):
+    """Hit/miss counters and size of the embedding cache."""
 
-    total_chunks: int
-    new_chunks: int
-    duplicates_skipped: int
-    message: str
+    hits: int
+    misses: int
+    hit_rate: float
+    entries: int
+    max_entries: int
+
+
+class AnswerCacheStats(BaseModel):
+    """Hit rates and latency saved by the /ask answer cache."""
+
+    exact_hits: int
+    semantic_hits: int
+    misses: int
+    hit_rate: float
+    latency_saved_ms: float
+    entries: int
+    max_entries: int
+
+
+class RetrievalCacheStats(BaseModel):
+    """Hit rates of the hybrid search result cache."""
+
+    hits: int
+    shared_hits: int
+    misses: int
+    hit_rate: float
+    entries: int
+    shared_entries: Optional[int] = None
+    max_entries: int
 
 
 class StatsResponse(BaseModel):
@@ -68,6 +194,11 @@ class StatsResponse(BaseModel):
 
     total_documents: int
     persist_dir: str
+    collection: str
+    shards: int
+    embedding_cache: Optional[EmbeddingCacheStats] = None
+    answer_cache: Optional[AnswerCacheStats] = None
+    retrieval_cache: Optional[RetrievalCacheStats] = None
 
 
 class HealthResponse(BaseModel):
@@ -75,12 +206,3 @@ class HealthResponse(BaseModel):
 
     status: str = "healthy"
     version: str = "1.0.0"
-
-
-class UploadResponse(BaseModel):
-    """Response from the /upload endpoint after PDF processing."""
-
-    filename: str
-    total_chunks: int
-    new_chunks: int
-    message: str
@@ -1,25 +1,63 @@
 from __future__ import annotations
 """FastAPI server for the RAG Document Intelligence System."""
 
+import asyncio
+import json
 import shutil
+import time
+from contextlib import asynccontextmanager
 from pathlib import Path
 
-from fastapi import FastAPI, UploadFile, File, HTTPException
+from fastapi import FastAPI, UploadFile, File, HTTPException, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse, StreamingResponse
 
+from src.api.coalesce import flights, request_key
+from src.api.concurrency import limits, run_blocking
 from src.api.models import (
     QuestionRequest,
+    BatchQuestionRequest,
     IngestRequest,
     AnswerResponse,
-    IngestResponse,
+    JobResponse,
+    JobListResponse,
     StatsResponse,
     HealthResponse,
-    UploadResponse,
 )
+from src.clients import registry
 from src.config import settings
-from src.ingestion.loader import load_pdf, load_directory, chunk_documents
-from src.ingestion.embedder import ingest_documents, get_collection_stats
-from src.search.qa import ask
+from src.ingestion.embedder import get_collection_stats
+from src.ingestion.jobs import close_job_manager, get_job_manager
+from src.metrics import (
+    REQUEST_SECONDS,
+    Family,
+    begin_request,
+    end_request,
+    metrics,
+    server_timing_header,
+)
+from src.search.filters import MetadataFilter
+from src.search.hybrid import SearchQuery, ahybrid_search, ahybrid_search_batch
+from src.search.qa import aask, abatch_ask, answer_cache, astream_ask
+from src.search.sharding import COLLECTION_NAME_PATTERN
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Open the keyword index, start serving while the vector backend and
+    model clients warm up in the background, and close them on shutdown.
+    """
+    registry.startup()
+    # A failed warm-up is retried, and reported, by the first request that
+    # needs the client.
+    warm_up = asyncio.ensure_future(run_blocking(registry.warm_up))
+    get_job_manager().start()
+    yield
+    await asyncio.gather(warm_up, return_exceptions=True)
+    await run_blocking(close_job_manager)
+    await registry.ashutdown()
+
 
 app = FastAPI(
     title="RAG Document Intelligence",
@@ -27,6 +65,7 @@ app = FastAPI(
     version="1.0.0",
     docs_url="/docs",
     redoc_url="/redoc",
+    lifespan=lifespan,
 )
 
 app.add_middleware(
@@ -35,63 +74,155 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["Server-Timing"],
 )
 
 
+@app.middleware("http")
+async def server_timing(request: Request, call_next):
+    """Export request latency and return the request's stage timings as ``Server-Timing``."""
+    if not settings.metrics_enabled:
+        return await call_next(request)
+    started = time.perf_counter()
+    token = begin_request()
+    try:
+        response = await call_next(request)
+    finally:
+        stages = end_request(token)
+    total_ms = (time.perf_counter() - started) * 1000
+    route = request.scope.get("route")
+    REQUEST_SECONDS.observe(
+        total_ms / 1000,
+        route=getattr(route, "path", "unmatched"),
+        status=str(response.status_code),
+    )
+    # Streamed responses send headers before the body is generated, so
+    # they carry only the stages finished by then.
+    response.headers["Server-Timing"] = server_timing_header(stages, total_ms)
+    return response
+
+
+def _cache_metrics() -> list[Family]:
+    """Hit and miss counters kept by the answer, retrieval and embedding caches."""
+    samples = []
+    if settings.answer_cache_enabled:
+        stats = answer_cache.stats()
+        samples += [
+            ({"cache": "answer", "result": "exact_hit"}, stats["exact_hits"]),
+            ({"cache": "answer", "result": "semantic_hit"}, stats["semantic_hits"]),
+            ({"cache": "answer", "result": "miss"}, stats["misses"]),
+        ]
+    retrieval = registry.retrieval_cache()
+    if retrieval is not None:
+        stats = retrieval.stats()
+        samples += [
+            ({"cache": "retrieval", "result": "hit"}, stats["hits"]),
+            ({"cache": "retrieval", "result": "shared_hit"}, stats["shared_hits"]),
+            ({"cache": "retrieval", "result": "miss"}, stats["misses"]),
+        ]
+    embedding = registry.embedding_cache()
+    if embedding is not None:
+        samples += [
+            ({"cache": "embedding", "result": "hit"}, embedding.hits),
+            ({"cache": "embedding", "result": "miss"}, embedding.misses),
+        ]
+    return [("rag_cache_lookups_total", "counter", "Cache lookups by cache and result", samples)]
+
+
+metrics.register_collector(_cache_metrics)
+
+
 @app.get("/health", response_model=HealthResponse)
 async def health_check():
     """Health check endpoint."""
     return HealthResponse()
 
 
+@app.get("/metrics", include_in_schema=False)
+async def prometheus_metrics():
+    """Prometheus text exposition of stage histograms, token and cache counters."""
+    if not settings.metrics_enabled:
+        raise HTTPException(status_code=404, detail="Metrics are disabled")
+    # The cache collectors take the registry lock, which warm-up holds.
+    text = await run_blocking(metrics.render)
+    return PlainTextResponse(text, media_type="text/plain; version=0.0.4")
+
+
 @app.get("/stats", response_model=StatsResponse)
-async def collection_stats():
-    """Get vector store statistics."""
-    return StatsResponse(**get_collection_stats())
+async def collection_stats(collection: str | None = Query(default=None, pattern=COLLECTION_NAME_PATTERN)):
+    """Get vector store statistics for a collection (the default collection when omitted)."""
+    stats = await run_blocking(get_collection_stats, collection)
+    if settings.answer_cache_enabled:
+        stats["answer_cache"] = answer_cache.stats()
+    return StatsResponse(**stats)
 
 
-@app.post("/ingest", response_model=IngestResponse)
+@app.post("/ingest", response_model=JobResponse, status_code=202)
 async def ingest_directory(request: IngestRequest):
-    """Ingest all PDFs from a directory."""
+    """Queue ingestion of all PDFs in a directory; poll ``/jobs/{id}`` for progress."""
     dir_path = Path(request.directory)
     if not dir_path.exists():
         raise HTTPException(status_code=404, detail=f"Directory not found: {request.directory}")
 
-    pdfs = list(dir_path.glob("*.pdf"))
+    pdfs = sorted(dir_path.glob("*.pdf"))
     if not pdfs:
         raise HTTPException(status_code=400, detail="No PDF files found in directory")
 
-    documents = load_directory(dir_path)
-    chunks = chunk_documents(documents)
-    stats = ingest_documents(chunks)
-
-    return IngestResponse(
-        **stats,
-        message=f"Ingested {len(pdfs)} PDF(s) from {request.directory}",
+    job = await run_blocking(
+        get_job_manager().submit, "ingest_directory", pdfs,
+        directory=request.directory, collection=request.collection,
     )
+    return JobResponse(**job)
+
+
+def _save_upload(source, upload_path: Path) -> None:
+    with open(upload_path, "wb") as f:
+        shutil.copyfileobj(source, f)
 
 
-@app.post("/upload", response_model=UploadResponse)
-async def upload_pdf(file: UploadFile = File(...)):
-    """Upload and ingest a single PDF."""
+@app.post("/upload", response_model=JobResponse, status_code=202)
+async def upload_pdf(
+    file: UploadFile = File(...),
+    collection: str | None = Query(default=None, pattern=COLLECTION_NAME_PATTERN),
+):
+    """Save an uploaded PDF and queue it for ingestion into ``collection``."""
     if not file.filename or not file.filename.lower().endswith(".pdf"):
         raise HTTPException(status_code=400, detail="Only PDF files are accepted")
 
-    # Save upload
     upload_path = settings.upload_path / file.filename
-    with open(upload_path, "wb") as f:
-        shutil.copyfileobj(file.file, f)
-
-    # Process
-    documents = load_pdf(upload_path)
-    chunks = chunk_documents(documents)
-    stats = ingest_documents(chunks)
-
-    return UploadResponse(
-        filename=file.filename,
-        total_chunks=stats["total_chunks"],
-        new_chunks=stats["new_chunks"],
-        message=f"Uploaded and ingested {file.filename}",
+    await run_blocking(_save_upload, file.file, upload_path)
+    job = await run_blocking(
+        get_job_manager().submit, "upload", [upload_path], filename=file.filename, collection=collection
+    )
+    return JobResponse(**job)
+
+
+@app.get("/jobs", response_model=JobListResponse)
+async def list_jobs(limit: int = 50):
+    """List recent ingestion jobs, newest first."""
+    jobs = await run_blocking(get_job_manager().list, limit)
+    return JobListResponse(jobs=[JobResponse(**job) for job in jobs])
+
+
+@app.get("/jobs/{job_id}", response_model=JobResponse)
+async def get_job(job_id: str):
+    """Report stage, progress, throughput and errors for one ingestion job."""
+    job = await run_blocking(get_job_manager().get, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job not found: {job_id}")
+    return JobResponse(**job)
+
+
+def _filters(request: QuestionRequest) -> MetadataFilter | None:
+    return request.filters.to_filter() if request.filters else None
+
+
+def _request_key(route: str, request: QuestionRequest) -> tuple:
+    collections = tuple(request.collections) if request.collections else None
+    filters = _filters(request)
+    return request_key(
+        route, request.question, request.top_k, request.rerank_k, collections,
+        filters.key() if filters else None,
     )
 
 
@@ -104,30 +235,71 @@ async def ask_question(request: QuestionRequest):
             detail="OPENAI_API_KEY not configured. Set it in your .env file.",
         )
 
+    async def answer() -> dict:
+        async with limits.limit("ask"):
+            return await aask(
+                question=request.question,
+                top_k=request.top_k,
+                rerank_k=request.rerank_k,
+                collections=request.collections,
+                filters=_filters(request),
+            )
+
     try:
-        result = ask(
-            question=request.question,
-            top_k=request.top_k,
-            rerank_k=request.rerank_k,
-        )
+        key = _request_key("/ask", request)
+        result = await flights.call(key, answer)
         return AnswerResponse(**result)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@app.post("/search")
-async def search_documents(request: QuestionRequest):
-    """Search documents without generating an answer (retrieval only)."""
-    from src.search.hybrid import hybrid_search
+def _sse(event: str, data: dict) -> str:
+    """Encode one server-sent event."""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
 
-    results = hybrid_search(
-        query=request.question,
-        top_k=request.top_k,
-        rerank_k=request.rerank_k,
+
+@app.post("/ask/stream")
+async def ask_question_stream(request: QuestionRequest):
+    """
+    Stream an answer over server-sent events: a ``sources`` event once
+    retrieval finishes, ``token`` events as the LLM generates, then ``done``
+    (or ``error``).
+    """
+    if not settings.openai_api_key:
+        raise HTTPException(
+            status_code=500,
+            detail="OPENAI_API_KEY not configured. Set it in your .env file.",
+        )
+
+    async def produce():
+        async with limits.limit("ask"):
+            async for event, data in astream_ask(
+                question=request.question,
+                top_k=request.top_k,
+                rerank_k=request.rerank_k,
+                collections=request.collections,
+                filters=_filters(request),
+            ):
+                yield _sse(event, data)
+
+    async def events():
+        key = _request_key("/ask/stream", request)
+        try:
+            async for message in flights.stream(key, produce):
+                yield message
+        except Exception as e:
+            yield _sse("error", {"detail": str(e)})
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
     )
 
+
+def _search_payload(query: str, results: list, timings: dict[str, float]) -> dict:
     return {
-        "query": request.question,
+        "query": query,
         "num_results": len(results),
         "results": [
             {
@@ -136,4 +308,97 @@ async def search_documents(request: QuestionRequest):
             }
             for doc in results
         ],
+        "timings_ms": timings,
     }
+
+
+@app.post("/search")
+async def search_documents(request: QuestionRequest):
+    """Search documents without generating an answer (retrieval only)."""
+
+    async def search() -> dict:
+        timings: dict[str, float] = {}
+        async with limits.limit("search"):
+            results = await ahybrid_search(
+                query=request.question,
+                top_k=request.top_k,
+                rerank_k=request.rerank_k,
+                timings=timings,
+                collections=request.collections,
+                filters=_filters(request),
+            )
+        return _search_payload(request.question, results, timings)
+
+    key = _request_key("/search", request)
+    return await flights.call(key, search)
+
+
+def _batch_queries(request: BatchQuestionRequest) -> list[SearchQuery]:
+    if len(request.questions) > settings.batch_max_queries:
+        raise HTTPException(
+            status_code=413,
+            detail=f"At most {settings.batch_max_queries} questions per batch.",
+        )
+    return [
+        SearchQuery(q.question, q.top_k, q.rerank_k, q.collections, _filters(q))
+        for q in request.questions
+    ]
+
+
+def _ndjson(data: dict) -> str:
+    return json.dumps(data) + "\n"
+
+
+@app.post("/search/batch")
+async def search_documents_batch(request: BatchQuestionRequest):
+    """
+    Retrieval for many questions, streamed back as NDJSON lines in input
+    order. Each slice of questions is embedded, queried and keyword-scored
+    together; ``timings_ms`` on a line covers its whole slice.
+    """
+    queries = _batch_queries(request)
+
+    async def lines():
+        size = max(1, settings.batch_chunk_size)
+        for offset in range(0, len(queries), size):
+            batch = queries[offset:offset + size]
+            timings: dict[str, float] = {}
+            try:
+                async with limits.limit("search"):
+                    results = await ahybrid_search_batch(batch, timings=timings)
+            except Exception as e:
+                for i in range(len(batch)):
+                    yield _ndjson({"index": offset + i, "error": str(e)})
+                continue
+            for i, (query, docs) in enumerate(zip(batch, results)):
+                yield _ndjson({"index": offset + i, **_search_payload(query.query, docs, timings)})
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+
+@app.post("/ask/batch")
+async def ask_question_batch(request: BatchQuestionRequest):
+    """
+    Answer many questions, streamed back as NDJSON lines in input order.
+    Retrieval is batched per slice and LLM calls run with bounded
+    concurrency; a failed question produces an ``error`` line.
+    """
+    if not settings.openai_api_key:
+        raise HTTPException(
+            status_code=500,
+            detail="OPENAI_API_KEY not configured. Set it in your .env file.",
+        )
+    queries = _batch_queries(request)
+
+    async def lines():
+        async with limits.limit("ask"):
+            index = 0
+            try:
+                async for result in abatch_ask(queries, concurrency=request.concurrency):
+                    yield _ndjson({"index": index, **result})
+                    index += 1
+            except Exception as e:
+                for i in range(index, len(queries)):
+                    yield _ndjson({"index": i, "error": str(e)})
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
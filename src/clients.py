@@ -0,0 +1,370 @@
+"""Process-wide registry of vector store, model and index clients.
+
+Clients are created once (warmed in the background by the API lifespan
+hook, lazily elsewhere) and shared, so HTTP keep-alive connections to
+OpenAI and the persistent Chroma client are reused across requests. The
+Chroma, LangChain OpenAI and embedding-cache modules are imported by the
+methods that build their clients, so importing this module (and the API
+or ``ingest.py`` on top of it) does not pay for SDKs a process never
+uses. Callers such as ``ingest.py`` or the test suite can inject their
+own instances with ``registry.set(...)``. Vector backends, keyword
+indexes and ingest manifests are kept per named collection (see
+``src.search.sharding``).
+"""
+
+from __future__ import annotations
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+from src.config import settings
+from src.ingestion.manifest import IngestManifest
+from src.ingestion.rate_limit import RateLimiter
+from src.ingestion.version import CollectionVersion
+from src.search.bm25_index import BM25Index
+from src.search.numpy_backend import NumpyBackend
+from src.search.result_cache import RetrievalCache
+from src.search.sharding import ShardedBackend, collection_name, shard_names
+from src.search.vector_backend import ChromaBackend, VectorBackend
+
+if TYPE_CHECKING:
+    import httpx
+
+    from src.ingestion.embedding_cache import EmbeddingCache
+
+
+def _collection_file(path: Path, collection: str) -> Path:
+    """Per-collection variant of a data file; the default collection keeps ``path``."""
+    if collection == settings.default_collection:
+        return path
+    return path.with_name(f"{path.stem}.{collection}{path.suffix}")
+
+
+class ClientRegistry:
+    """Lazily-built, lock-protected holder for shared clients."""
+
+    def __init__(self) -> None:
+        self._lock = threading.RLock()
+        self._http_client: httpx.Client | None = None
+        self._async_http_client: httpx.AsyncClient | None = None
+        self._chroma_client: Any = None
+        self._embeddings: Any = None
+        self._embedding_cache: EmbeddingCache | None = None
+        self._vector_store: Any = None
+        self._vector_backends: dict[str, VectorBackend] = {}
+        self._chat_model: Any = None
+        self._keyword_indexes: dict[str, BM25Index] = {}
+        self._rate_limiter: RateLimiter | None = None
+        self._executor: ThreadPoolExecutor | None = None
+        # Separate from ``_lock``, which is held while clients are built:
+        # the event loop takes this one on every offloaded call.
+        self._executor_lock = threading.Lock()
+        self._collection_versions: dict[str, CollectionVersion] = {}
+        self._retrieval_cache: RetrievalCache | None = None
+        self._ingest_manifests: dict[str, IngestManifest] = {}
+
+    # -- HTTP ----------------------------------------------------------------
+
+    def _limits(self) -> httpx.Limits:
+        import httpx
+
+        return httpx.Limits(
+            max_connections=settings.http_max_connections,
+            max_keepalive_connections=settings.http_max_keepalive_connections,
+            keepalive_expiry=settings.http_keepalive_expiry,
+        )
+
+    def http_client(self) -> httpx.Client:
+        with self._lock:
+            if self._http_client is None:
+                import httpx
+
+                self._http_client = httpx.Client(
+                    limits=self._limits(), timeout=settings.http_timeout
+                )
+            return self._http_client
+
+    def async_http_client(self) -> httpx.AsyncClient:
+        with self._lock:
+            if self._async_http_client is None:
+                import httpx
+
+                self._async_http_client = httpx.AsyncClient(
+                    limits=self._limits(), timeout=settings.http_timeout
+                )
+            return self._async_http_client
+
+    # -- Clients -------------------------------------------------------------
+
+    def embeddings(self):
+        with self._lock:
+            if self._embeddings is None:
+                from langchain_openai import OpenAIEmbeddings
+
+                from src.ingestion.embedding_cache import CachedEmbeddings
+
+                embeddings = OpenAIEmbeddings(
+                    model=settings.embedding_model,
+                    openai_api_key=settings.openai_api_key,
+                    http_client=self.http_client(),
+                    http_async_client=self.async_http_client(),
+                )
+                cache = self.embedding_cache()
+                if cache is not None:
+                    embeddings = CachedEmbeddings(embeddings, cache, settings.embedding_model)
+                self._embeddings = embeddings
+            return self._embeddings
+
+    def embedding_cache(self) -> EmbeddingCache | None:
+        """Shared embedding cache, or ``None`` when disabled in settings."""
+        with self._lock:
+            if self._embedding_cache is None and settings.embedding_cache_enabled:
+                from src.ingestion.embedding_cache import EmbeddingCache
+
+                self._embedding_cache = EmbeddingCache(
+                    settings.embedding_cache_path,
+                    max_entries=settings.embedding_cache_max_entries,
+                )
+            return self._embedding_cache
+
+    def chroma_client(self):
+        with self._lock:
+            if self._chroma_client is None:
+                import chromadb
+
+                self._chroma_client = chromadb.PersistentClient(path=str(settings.chroma_path))
+            return self._chroma_client
+
+    def vector_store(self):
+        """LangChain wrapper over the default collection's (first) Chroma collection."""
+        with self._lock:
+            if self._vector_store is None:
+                from langchain_chroma import Chroma
+
+                self._vector_store = Chroma(
+                    collection_name=self._store_collection(),
+                    embedding_function=self.embeddings(),
+                    client=self.chroma_client(),
+                )
+            return self._vector_store
+
+    @staticmethod
+    def _store_collection() -> str:
+        return shard_names(collection_name(), settings.collection_shards)[0]
+
+    def vector_backend(self, collection: str | None = None) -> VectorBackend:
+        """
+        Vector index of ``collection`` (the default collection when omitted),
+        selected by ``settings.vector_backend`` and sharded when
+        ``settings.collection_shards`` is above 1.
+        """
+        name = collection_name(collection)
+        with self._lock:
+            backend = self._vector_backends.get(name)
+            if backend is None:
+                shards = [
+                    self._open_backend(shard)
+                    for shard in shard_names(name, settings.collection_shards)
+                ]
+                backend = shards[0] if len(shards) == 1 else ShardedBackend(shards)
+                self._vector_backends[name] = backend
+            return backend
+
+    def _open_backend(self, name: str) -> VectorBackend:
+        """One unsharded backend stored under ``name``."""
+        if settings.vector_backend == "numpy":
+            path = settings.vector_index_path
+            return NumpyBackend(
+                path if name == settings.default_collection else path / name,
+                index=settings.vector_index,
+                nlist=settings.ivf_nlist,
+                nprobe=settings.ivf_nprobe,
+                storage=settings.vector_storage,
+                dims=settings.vector_dims,
+                rescore=settings.vector_rescore,
+            )
+        if settings.vector_backend == "chroma":
+            if self._vector_store is not None and name == self._store_collection():
+                return ChromaBackend(self._vector_store._collection)
+            return ChromaBackend(
+                self.chroma_client().get_or_create_collection(name, embedding_function=None)
+            )
+        raise ValueError(
+            f"Unknown vector backend {settings.vector_backend!r}; expected 'chroma' or 'numpy'"
+        )
+
+    def chat_model(self):
+        with self._lock:
+            if self._chat_model is None:
+                from langchain_openai import ChatOpenAI
+
+                self._chat_model = ChatOpenAI(
+                    model=settings.openai_model,
+                    temperature=0.1,
+                    # Report token usage on streamed responses too
+                    stream_usage=True,
+                    openai_api_key=settings.openai_api_key,
+                    http_client=self.http_client(),
+                    http_async_client=self.async_http_client(),
+                )
+            return self._chat_model
+
+    def keyword_index(self, collection: str | None = None) -> BM25Index:
+        """BM25 index of ``collection``; one per collection, not sharded."""
+        name = collection_name(collection)
+        with self._lock:
+            if name not in self._keyword_indexes:
+                self._keyword_indexes[name] = BM25Index(
+                    _collection_file(settings.bm25_index_path, name)
+                )
+            return self._keyword_indexes[name]
+
+    def rate_limiter(self) -> RateLimiter:
+        """Embedding API budget shared by every concurrent ingestion."""
+        with self._lock:
+            if self._rate_limiter is None:
+                self._rate_limiter = RateLimiter(
+                    settings.embedding_requests_per_minute,
+                    settings.embedding_tokens_per_minute,
+                )
+            return self._rate_limiter
+
+    def collection_version(self, collection: str | None = None) -> CollectionVersion:
+        """Version counter bumped whenever ``collection`` changes."""
+        name = collection_name(collection)
+        with self._lock:
+            if name not in self._collection_versions:
+                self._collection_versions[name] = CollectionVersion(
+                    _collection_file(settings.chroma_path / "version.db", name)
+                )
+            return self._collection_versions[name]
+
+    def ingest_manifest(self, collection: str | None = None) -> IngestManifest:
+        """Record of the files ingested into ``collection``, their hashes and chunk ids."""
+        name = collection_name(collection)
+        with self._lock:
+            if name not in self._ingest_manifests:
+                self._ingest_manifests[name] = IngestManifest(
+                    _collection_file(settings.ingest_manifest_path, name)
+                )
+            return self._ingest_manifests[name]
+
+    def retrieval_cache(self) -> RetrievalCache | None:
+        """Shared hybrid search result cache, or ``None`` when disabled in settings."""
+        with self._lock:
+            if self._retrieval_cache is None and settings.retrieval_cache_enabled:
+                self._retrieval_cache = RetrievalCache(
+                    max_entries=settings.retrieval_cache_max_entries,
+                    shared_path=(
+                        settings.retrieval_cache_path if settings.retrieval_cache_shared else None
+                    ),
+                )
+            return self._retrieval_cache
+
+    def executor(self) -> ThreadPoolExecutor:
+        """Bounded pool for blocking work offloaded from the event loop."""
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=settings.api_executor_threads,
+                    thread_name_prefix="blocking",
+                )
+            return self._executor
+
+    # -- Lifecycle -----------------------------------------------------------
+
+    def set(
+        self,
+        *,
+        embeddings=None,
+        vector_store=None,
+        chat_model=None,
+        keyword_index: BM25Index | None = None,
+        vector_backend: VectorBackend | None = None,
+    ) -> None:
+        """
+        Inject pre-built instances; ``None`` leaves a slot untouched. Vector
+        backends and keyword indexes go to the default collection.
+        """
+        default = collection_name()
+        with self._lock:
+            if embeddings is not None:
+                self._embeddings = embeddings
+            if vector_store is not None:
+                self._vector_store = vector_store
+                if isinstance(self._vector_backends.get(default), ChromaBackend):
+                    del self._vector_backends[default]
+            if vector_backend is not None:
+                self._vector_backends[default] = vector_backend
+            if chat_model is not None:
+                self._chat_model = chat_model
+            if keyword_index is not None:
+                self._keyword_indexes[default] = keyword_index
+
+    def startup(self) -> None:
+        """Start the executor and open the default collection's keyword index."""
+        self.executor()
+        with self._lock:
+            self.keyword_index()
+
+    def warm_up(self) -> None:
+        """
+        Build the vector backend and, with an API key, the OpenAI clients.
+        These import the heavy SDKs under the registry lock, so the API runs
+        this on the executor after it starts serving, and async code resolves
+        clients on the executor too: a request that needs a client waits for
+        it there without stalling the event loop.
+        """
+        self.vector_backend()
+        if settings.openai_api_key:
+            self.embeddings()
+            self.chat_model()
+
+    def shutdown(self) -> None:
+        """Close pooled connections and drop every cached client."""
+        with self._executor_lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+        with self._lock:
+            if self._http_client is not None:
+                self._http_client.close()
+            for index in self._keyword_indexes.values():
+                index.close()
+            for backend in self._vector_backends.values():
+                backend.close()
+            if self._embedding_cache is not None:
+                self._embedding_cache.close()
+            for version in self._collection_versions.values():
+                version.close()
+            if self._retrieval_cache is not None:
+                self._retrieval_cache.close()
+            for manifest in self._ingest_manifests.values():
+                manifest.close()
+            if self._chroma_client is not None:
+                self._chroma_client.clear_system_cache()
+            self._http_client = None
+            self._async_http_client = None
+            self._chroma_client = None
+            self._embeddings = None
+            self._embedding_cache = None
+            self._vector_store = None
+            self._vector_backends = {}
+            self._chat_model = None
+            self._keyword_indexes = {}
+            self._rate_limiter = None
+            self._collection_versions = {}
+            self._retrieval_cache = None
+            self._ingest_manifests = {}
+
+    async def ashutdown(self) -> None:
+        """Async variant for the API lifespan: also drains the async HTTP pool."""
+        async_client = self._async_http_client
+        if async_client is not None:
+            await async_client.aclose()
+        self.shutdown()
+
+
+registry = ClientRegistry()
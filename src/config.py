@@ -19,9 +19,59 @@ class Settings(BaseSettings):
     openai_model: str = "gpt-4o-mini"
     embedding_model: str = "text-embedding-3-small"
 
+    # Embedding cache
+    embedding_cache_enabled: bool = True
+    embedding_cache_db: str = "./data/embedding_cache.db"
+    embedding_cache_max_entries: int = 200_000
+
+    # API concurrency: blocking work runs on a bounded executor and each
+    # endpoint family is capped independently
+    api_executor_threads: int = 16
+    api_ask_concurrency: int = 8
+    api_search_concurrency: int = 32
+    api_ingest_concurrency: int = 2
+    # Identical concurrent /ask, /ask/stream and /search requests share one
+    # in-flight retrieval and LLM call
+    request_coalescing: bool = True
+
+    # Batch endpoints: queries per request, queries embedded and retrieved
+    # together, and LLM calls in flight per /ask/batch request
+    batch_max_queries: int = 1000
+    batch_chunk_size: int = 64
+    batch_llm_concurrency: int = 4
+
+    # HTTP connection pool shared by the OpenAI clients
+    http_max_connections: int = 20
+    http_max_keepalive_connections: int = 10
+    http_keepalive_expiry: float = 30.0
+    http_timeout: float = 60.0
+
     # ChromaDB
     chroma_persist_dir: str = "./data/chroma"
 
+    # Collections: requests and ingests without an explicit collection use
+    # default_collection. Each collection's vectors are spread over
+    # collection_shards shards by chunk-id hash (1 = unsharded); changing
+    # the shard count of a populated collection needs a forced re-ingest.
+    default_collection: str = "documents"
+    collection_shards: int = 1
+
+    # Vector backend: "chroma", or "numpy" for the in-process memory-mapped
+    # index. The numpy backend searches exactly ("flat") or over k-means
+    # lists ("ivf"); ivf_nlist=0 picks sqrt(corpus size) lists.
+    vector_backend: str = "chroma"
+    vector_index_dir: str = "./data/vectors"
+    vector_index: str = "flat"
+    ivf_nlist: int = 0
+    ivf_nprobe: int = 8
+    # First-pass vector storage for the numpy backend: "float32", "float16"
+    # or "int8", optionally truncated to the leading vector_dims dimensions
+    # (0 = all). Lossy settings rescore vector_rescore x k candidates at
+    # full precision.
+    vector_storage: str = "float32"
+    vector_dims: int = 0
+    vector_rescore: int = 4
+
     # Uploads
     upload_dir: str = "./data/uploads"
 
@@ -29,9 +79,63 @@ class Settings(BaseSettings):
     chunk_size: int = 1000
     chunk_overlap: int = 200
 
+    # Ingestion: processes used to parse and chunk PDFs (1 = in-process)
+    ingest_workers: int = 1
+    # Parsed files buffered between the parse and embed stages
+    pipeline_queue_size: int = 8
+
+    # Manifest of ingested files used to skip unchanged PDFs on re-ingest
+    ingest_manifest_db: str = "./data/ingest_manifest.db"
+
+    # Background ingestion jobs
+    jobs_db: str = "./data/jobs.db"
+    job_workers: int = 1
+
+    # Ingestion: batched, concurrent, rate-limited embedding writes
+    ingest_batch_size: int = 128
+    ingest_concurrency: int = 4
+    ingest_max_retries: int = 5
+    embedding_requests_per_minute: int = 3000
+    embedding_tokens_per_minute: int = 1_000_000
+
     # Search
     top_k: int = 10
     rerank_top_k: int = 5
+    # "corpus" scores keywords over the persistent BM25 index; "candidates"
+    # re-scores only the chunks returned by the vector store.
+    keyword_search_scope: str = "corpus"
+    # RRF constant: larger values flatten the rank weighting
+    rrf_k: int = 60
+    # Per-leg RRF weights; 0 drops a leg from the fused ranking
+    rrf_semantic_weight: float = 1.0
+    rrf_keyword_weight: float = 1.0
+    # In "candidates" scope the vector leg fetches top_k * this many chunks
+    # for BM25 to re-score
+    keyword_pool_factor: int = 2
+    # Estimated tokens of retrieved context sent to the LLM per answer
+    # (0 = no limit); overlapping chunks of a page are merged first
+    context_token_budget: int = 3000
+
+    # Answer cache for /ask: exact + near-duplicate question tiers
+    answer_cache_enabled: bool = True
+    answer_cache_semantic: bool = True
+    answer_cache_similarity: float = 0.97
+    answer_cache_ttl_seconds: float = 3600.0
+    answer_cache_max_entries: int = 1000
+
+    # Retrieval cache for hybrid_search rankings, keyed by collection
+    # generation; the optional shared tier is a SQLite file that several
+    # API workers on one host can read and fill
+    retrieval_cache_enabled: bool = True
+    retrieval_cache_max_entries: int = 5000
+    retrieval_cache_shared: bool = False
+    retrieval_cache_db: str = "./data/retrieval_cache.db"
+
+    # Prometheus /metrics, stage histograms and Server-Timing headers
+    metrics_enabled: bool = True
+
+    # Keyword index
+    bm25_index_db: str = "./data/bm25_index.db"
 
     @property
     def chroma_path(self) -> Path:
@@ -39,6 +143,42 @@ class Settings(BaseSettings):
         p.mkdir(parents=True, exist_ok=True)
         return p
 
+    @property
+    def vector_index_path(self) -> Path:
+        p = Path(self.vector_index_dir)
+        p.mkdir(parents=True, exist_ok=True)
+        return p
+
+    @property
+    def bm25_index_path(self) -> Path:
+        p = Path(self.bm25_index_db)
+        p.parent.mkdir(parents=True, exist_ok=True)
+        return p
+
+    @property
+    def embedding_cache_path(self) -> Path:
+        p = Path(self.embedding_cache_db)
+        p.parent.mkdir(parents=True, exist_ok=True)
+        return p
+
+    @property
+    def retrieval_cache_path(self) -> Path:
+        p = Path(self.retrieval_cache_db)
+        p.parent.mkdir(parents=True, exist_ok=True)
+        return p
+
+    @property
+    def ingest_manifest_path(self) -> Path:
+        p = Path(self.ingest_manifest_db)
+        p.parent.mkdir(parents=True, exist_ok=True)
+        return p
+
+    @property
+    def jobs_path(self) -> Path:
+        p = Path(self.jobs_db)
+        p.parent.mkdir(parents=True, exist_ok=True)
+        return p
+
     @property
     def upload_path(self) -> Path:
         p = Path(self.upload_dir)
@@ -1,6 +1,9 @@
 from __future__ import annotations
 """Streamlit frontend for RAG Document Intelligence."""
 
+import json
+import time
+
 import requests
 import streamlit as st
 
@@ -31,6 +34,34 @@ def get_stats():
         return {"total_documents": 0, "persist_dir": "N/A"}
 
 
+def wait_for_job(job: dict):
+    """Poll an ingestion job until it finishes, rendering live progress."""
+    bar = st.progress(0.0)
+    status = st.empty()
+    while job["status"] in ("queued", "running"):
+        total = max(job["chunks_total"], 1)
+        files = f"{job['files_done']}/{job['files_total']} files"
+        chunks = f"{job['chunks_done']}/{job['chunks_total']} chunks"
+        bar.progress(min(job["chunks_done"] / total, 1.0) if job["chunks_total"] else 0.0)
+        status.caption(f"{job['stage']} — {files}, {chunks}, {job['chunks_per_sec']:.1f} chunks/s")
+        time.sleep(1)
+        job = requests.get(f"{API_URL}/jobs/{job['id']}", timeout=5).json()
+    bar.progress(1.0)
+    status.empty()
+    return job
+
+
+def iter_sse(response):
+    """Yield (event, data) pairs from a server-sent-events response."""
+    event = "message"
+    for line in response.iter_lines(decode_unicode=True):
+        if line.startswith("event: "):
+            event = line[len("event: "):]
+        elif line.startswith("data: "):
+            yield event, json.loads(line[len("data: "):])
+            event = "message"
+
+
 # --- Sidebar ---
 with st.sidebar:
     st.title("📚 Document Intelligence")
@@ -49,33 +80,41 @@ with st.sidebar:
 
     if uploaded_file and api_live:
         if st.button("🚀 Ingest Document", use_container_width=True):
-            with st.spinner("Processing document..."):
-                files = {"file": (uploaded_file.name, uploaded_file.getvalue(), "application/pdf")}
-                try:
-                    r = requests.post(f"{API_URL}/upload", files=files, timeout=120)
-                    if r.status_code == 200:
-                        data = r.json()
-                        st.success(f"✅ {data['message']}")
-                        st.info(f"Chunks: {data['total_chunks']} total, {data['new_chunks']} new")
+            files = {"file": (uploaded_file.name, uploaded_file.getvalue(), "application/pdf")}
+            try:
+                r = requests.post(f"{API_URL}/upload", files=files, timeout=60)
+                if r.status_code == 202:
+                    job = wait_for_job(r.json())
+                    if job["status"] == "succeeded":
+                        result = job["result"]
+                        st.success(f"✅ Ingested {uploaded_file.name}")
+                        st.info(f"Chunks: {result['total_chunks']} total, {result['new_chunks']} new")
                     else:
-                        st.error(f"Error: {r.json().get('detail', 'Unknown error')}")
-                except Exception as e:
-                    st.error(f"Upload failed: {e}")
+                        st.error(f"Ingestion failed: {'; '.join(job['errors'])}")
+                else:
+                    st.error(f"Error: {r.json().get('detail', 'Unknown error')}")
+            except Exception as e:
+                st.error(f"Upload failed: {e}")
 
     st.markdown("---")
     st.subheader("📁 Bulk Ingest")
     ingest_dir = st.text_input("PDF Directory", value="./docs")
     if st.button("📥 Ingest Directory", use_container_width=True) and api_live:
-        with st.spinner("Ingesting documents..."):
-            try:
-                r = requests.post(f"{API_URL}/ingest", json={"directory": ingest_dir}, timeout=300)
-                if r.status_code == 200:
-                    data = r.json()
-                    st.success(f"✅ {data['message']}")
+        try:
+            r = requests.post(f"{API_URL}/ingest", json={"directory": ingest_dir}, timeout=30)
+            if r.status_code == 202:
+                job = wait_for_job(r.json())
+                if job["status"] == "succeeded":
+                    result = job["result"]
+                    st.success(f"✅ Ingested {result['files'] - result['failed_files']} PDF(s), {result['new_chunks']} new chunks")
+                    for error in job["errors"]:
+                        st.warning(error)
                 else:
-                    st.error(f"Error: {r.json().get('detail', 'Unknown error')}")
-            except Exception as e:
-                st.error(f"Ingestion failed: {e}")
+                    st.error(f"Ingestion failed: {'; '.join(job['errors'])}")
+            else:
+                st.error(f"Error: {r.json().get('detail', 'Unknown error')}")
+        except Exception as e:
+            st.error(f"Ingestion failed: {e}")
 
     st.markdown("---")
     st.markdown("Built with LangChain + ChromaDB + FastAPI")
@@ -114,27 +153,34 @@ with col_search:
 
 # Handle Ask
 if ask_btn and question:
-    with st.spinner("Searching and generating answer..."):
-        try:
-            r = requests.post(
-                f"{API_URL}/ask",
-                json={"question": question, "top_k": top_k, "rerank_k": rerank_k},
-                timeout=60,
-            )
+    try:
+        with requests.post(
+            f"{API_URL}/ask/stream",
+            json={"question": question, "top_k": top_k, "rerank_k": rerank_k},
+            timeout=60,
+            stream=True,
+        ) as r:
             if r.status_code == 200:
-                data = r.json()
-
                 st.markdown("### 💡 Answer")
-                st.markdown(data["answer"])
-
-                if data["sources"]:
-                    st.markdown("### 📑 Sources")
-                    for src in data["sources"]:
-                        st.markdown(f"- **{src['filename']}** — Page {src['page']}")
+                answer_box = st.empty()
+                sources_box = st.container()
+                answer = ""
+                for event, data in iter_sse(r):
+                    if event == "sources" and data["sources"]:
+                        with sources_box:
+                            st.markdown("### 📑 Sources")
+                            for src in data["sources"]:
+                                st.markdown(f"- **{src['filename']}** — Page {src['page']}")
+                    elif event == "token":
+                        answer += data["text"]
+                        answer_box.markdown(answer + "▌")
+                    elif event == "error":
+                        st.error(f"Error: {data['detail']}")
+                answer_box.markdown(answer)
             else:
                 st.error(f"Error: {r.json().get('detail', 'Unknown error')}")
-        except Exception as e:
-            st.error(f"Request failed: {e}")
+    except Exception as e:
+        st.error(f"Request failed: {e}")
 
 # Handle Search
 if search_btn and question:
@@ -2,29 +2,55 @@ from __future__ import annotations
 """Vector store management with ChromaDB."""
 
 import hashlib
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
+from typing import TYPE_CHECKING, Callable, Sequence
 
-from langchain_openai import OpenAIEmbeddings
-from langchain_chroma import Chroma
-from langchain.schema import Document
+from langchain_core.documents import Document
+from tenacity import Retrying, stop_after_attempt, wait_exponential
 
+from src.clients import registry
 from src.config import settings
+from src.ingestion.rate_limit import estimate_tokens
+from src.metrics import span
+from src.search.bm25_index import BM25Index
+from src.search.sharding import collection_name, resolve_collections
+from src.search.vector_backend import VectorBackend
+
+if TYPE_CHECKING:
+    from langchain_chroma import Chroma
+    from langchain_openai import OpenAIEmbeddings
 
 
 def get_embeddings() -> OpenAIEmbeddings:
-    """Create OpenAI embeddings instance."""
-    return OpenAIEmbeddings(
-        model=settings.embedding_model,
-        openai_api_key=settings.openai_api_key,
-    )
+    """Return the shared OpenAI embeddings client."""
+    return registry.embeddings()
 
 
 def get_vector_store() -> Chroma:
-    """Get or create the ChromaDB vector store."""
-    return Chroma(
-        collection_name="documents",
-        embedding_function=get_embeddings(),
-        persist_directory=str(settings.chroma_path),
+    """Return the shared LangChain ChromaDB vector store."""
+    return registry.vector_store()
+
+
+def get_vector_backend(collection: str | None = None) -> VectorBackend:
+    """Return the shared vector backend of ``collection`` (default collection if omitted)."""
+    return registry.vector_backend(collection)
+
+
+def get_keyword_index(collection: str | None = None) -> BM25Index:
+    """Return the shared BM25 keyword index of ``collection``."""
+    return registry.keyword_index(collection)
+
+
+def get_collection_version(collections: Sequence[str] | None = None) -> tuple[tuple[str, int], ...]:
+    """
+    ``(collection, version)`` for each of ``collections`` (the default
+    collection when omitted). A collection's version changes after every
+    ingest or delete that changes it, and only then.
+    """
+    return tuple(
+        (name, registry.collection_version(name).get()) for name in resolve_collections(collections)
     )
 
 
@@ -34,19 +60,52 @@ def _doc_hash(doc: Document) -> str:
     return hashlib.sha256(content.encode()).hexdigest()[:16]
 
 
-def ingest_documents(chunks: list[Document]) -> dict:
-    """Embed and store document chunks. Returns ingestion stats."""
-    store = get_vector_store()
-
-    # Deduplicate by content hash
-    ids = [_doc_hash(c) for c in chunks]
-    existing = set()
-    try:
-        collection = store._collection
-        existing_ids = collection.get(ids=ids)["ids"]
-        existing = set(existing_ids)
-    except Exception:
-        pass
+def chunk_ids(chunks: list[Document]) -> list[str]:
+    """Ids under which ``chunks`` are (or would be) stored."""
+    return [_doc_hash(c) for c in chunks]
+
+
+def _write_batch(
+    backend: VectorBackend,
+    index: BM25Index,
+    ids: list[str],
+    chunks: list[Document],
+    ingested_at: float,
+) -> None:
+    """Embed one batch under the rate limit and commit it to the vector backend and BM25."""
+    texts = [c.page_content for c in chunks]
+    metadatas = [{**(c.metadata or {}), "ingested_at": ingested_at} for c in chunks]
+    with span("ingest.rate_limit_wait"):
+        registry.rate_limiter().acquire(sum(estimate_tokens(t) for t in texts))
+    with span("ingest.embed"):
+        vectors = get_embeddings().embed_documents(texts)
+    with span("ingest.write"):
+        backend.upsert(ids, vectors, texts, metadatas)
+        index.add(ids, texts, metadatas)
+
+
+def ingest_documents(
+    chunks: list[Document],
+    progress: Callable[[int], None] | None = None,
+    collection: str | None = None,
+) -> dict:
+    """
+    Embed and store document chunks in ``collection``. Returns ingestion stats.
+
+    New chunks are split into ``settings.ingest_batch_size`` batches that
+    are embedded concurrently under the shared rate limiter, retried with
+    exponential backoff, and committed as each one finishes, so a failure
+    only loses the batches that never succeeded. In a sharded collection
+    each batch is written to its shards in parallel. Stored chunks carry
+    an ``ingested_at`` Unix time for metadata filters. ``progress`` is
+    called with the size of every committed batch.
+    """
+    backend = get_vector_backend(collection)
+    index = get_keyword_index(collection)
+
+    # Deduplicate by content hash, both against the store and within the input
+    ids = chunk_ids(chunks)
+    existing = backend.existing_ids(ids)
 
     new_chunks = []
     new_ids = []
@@ -54,22 +113,100 @@ def ingest_documents(chunks: list[Document]) -> dict:
         if doc_id not in existing:
             new_chunks.append(chunk)
             new_ids.append(doc_id)
+            existing.add(doc_id)
+
+    ingested_at = time.time()
+    size = max(1, settings.ingest_batch_size)
+    batches = [
+        (new_ids[i:i + size], new_chunks[i:i + size])
+        for i in range(0, len(new_chunks), size)
+    ]
+    retrying = Retrying(
+        stop=stop_after_attempt(settings.ingest_max_retries),
+        wait=wait_exponential(multiplier=1, min=1, max=30),
+        reraise=True,
+    )
 
-    if new_chunks:
-        store.add_documents(new_chunks, ids=new_ids)
+    written = 0
+    errors: list[str] = []
+    if batches:
+        workers = min(max(1, settings.ingest_concurrency), len(batches))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="ingest") as pool:
+            futures = {
+                pool.submit(retrying, _write_batch, backend, index, batch_ids, batch, ingested_at): len(batch_ids)
+                for batch_ids, batch in batches
+            }
+            for future in as_completed(futures):
+                try:
+                    future.result()
+                except Exception as e:
+                    errors.append(str(e))
+                    continue
+                written += futures[future]
+                if progress is not None:
+                    progress(futures[future])
+
+    if written:
+        registry.collection_version(collection).bump()
 
     return {
         "total_chunks": len(chunks),
-        "new_chunks": len(new_chunks),
+        "new_chunks": written,
         "duplicates_skipped": len(chunks) - len(new_chunks),
+        "failed_chunks": len(new_chunks) - written,
+        "errors": errors,
     }
 
 
-def get_collection_stats() -> dict:
-    """Return stats about the current vector store."""
+def stored_chunk_ids(ids: list[str], collection: str | None = None) -> set[str]:
+    """The subset of ``ids`` currently present in the vector store."""
+    return get_vector_backend(collection).existing_ids(ids)
+
+
+def delete_chunks(ids: list[str], collection: str | None = None) -> int:
+    """Remove chunks from the vector store and keyword index. Returns count removed."""
+    ids = list(dict.fromkeys(ids))
+    if not ids:
+        return 0
+    backend = get_vector_backend(collection)
+    present = list(backend.existing_ids(ids))
+    if present:
+        backend.delete(present)
+    get_keyword_index(collection).remove(ids)
+    if present:
+        registry.collection_version(collection).bump()
+    return len(present)
+
+
+def rebuild_keyword_index(batch_size: int = 1000, collection: str | None = None) -> int:
+    """Rebuild the BM25 index, with its filter metadata, from every chunk in the vector store."""
+    backend = get_vector_backend(collection)
+    index = get_keyword_index(collection)
+    index.clear()
+    for ids, texts in backend.iter_texts(batch_size):
+        metadata = {doc.id: doc.metadata for doc in backend.get(ids)}
+        index.add(ids, texts, [metadata.get(chunk_id) for chunk_id in ids])
+    registry.collection_version(collection).bump()
+    return index.count()
+
+
+def get_collection_stats(collection: str | None = None) -> dict:
+    """Return stats about a collection's vector store and the shared caches."""
     try:
-        store = get_vector_store()
-        count = store._collection.count()
+        count = get_vector_backend(collection).count()
     except Exception:
         count = 0
-    return {"total_documents": count, "persist_dir": str(settings.chroma_path)}
+    persist_dir = settings.vector_index_path if settings.vector_backend == "numpy" else settings.chroma_path
+    stats = {
+        "total_documents": count,
+        "persist_dir": str(persist_dir),
+        "collection": collection_name(collection),
+        "shards": max(1, settings.collection_shards),
+    }
+    cache = registry.embedding_cache()
+    if cache is not None:
+        stats["embedding_cache"] = cache.stats()
+    retrieval_cache = registry.retrieval_cache()
+    if retrieval_cache is not None:
+        stats["retrieval_cache"] = retrieval_cache.stats()
+    return stats
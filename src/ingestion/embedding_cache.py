@@ -0,0 +1,211 @@
+"""Content-addressed embedding cache shared by ingestion and queries.
+
+Vectors are stored in SQLite keyed by ``(embedding model, sha256(text))``
+so re-chunking a corpus or repeating a question only pays for text that
+has never been embedded before. The cache is bounded by entry count and
+evicts the least recently used vectors first.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import sqlite3
+import threading
+from pathlib import Path
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+from src.clients import registry
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS embeddings (
+    model TEXT NOT NULL,
+    text_hash TEXT NOT NULL,
+    vector BLOB NOT NULL,
+    last_used INTEGER NOT NULL,
+    PRIMARY KEY (model, text_hash)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_embeddings_last_used ON embeddings (last_used);
+"""
+
+# Puts between exact recounts; other processes sharing the file change the
+# entry count without this one seeing it.
+RECOUNT_EVERY = 1000
+
+
+def text_hash(text: str) -> str:
+    return hashlib.sha256(text.encode()).hexdigest()
+
+
+class EmbeddingCache:
+    """SQLite-backed LRU store of embedding vectors with hit/miss counters."""
+
+    def __init__(self, path: str | Path, max_entries: int = 200_000):
+        self.path = Path(path)
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(SCHEMA)
+        # Logical clock for recency: strictly increasing across operations,
+        # resumed from the stored maximum so LRU order survives restarts.
+        (clock,) = self._conn.execute("SELECT MAX(last_used) FROM embeddings").fetchone()
+        self._clock = clock or 0
+        # Running entry count, so puts need not scan the table to enforce the bound.
+        self._count = self._entry_count()
+        self._puts = 0
+
+    def _entry_count(self) -> int:
+        return self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+
+    def _tick(self) -> int:
+        self._clock += 1
+        return self._clock
+
+    def get_many(self, model: str, hashes: list[str]) -> dict[str, list[float]]:
+        """Look up vectors by text hash, refreshing their recency on hit."""
+        found: dict[str, list[float]] = {}
+        unique = list(dict.fromkeys(hashes))
+        with self._lock, self._conn:
+            for start in range(0, len(unique), 500):
+                batch = unique[start:start + 500]
+                placeholders = ",".join("?" * len(batch))
+                rows = self._conn.execute(
+                    f"SELECT text_hash, vector FROM embeddings "
+                    f"WHERE model = ? AND text_hash IN ({placeholders})",
+                    [model, *batch],
+                )
+                for h, blob in rows:
+                    found[h] = np.frombuffer(blob, dtype=np.float32).tolist()
+            if found:
+                now = self._tick()
+                self._conn.executemany(
+                    "UPDATE embeddings SET last_used = ? WHERE model = ? AND text_hash = ?",
+                    [(now, model, h) for h in found],
+                )
+            hit_count = sum(1 for h in hashes if h in found)
+            self.hits += hit_count
+            self.misses += len(hashes) - hit_count
+        return found
+
+    def put_many(self, model: str, items: dict[str, list[float]]) -> None:
+        """Store vectors and evict the least recently used beyond ``max_entries``."""
+        if not items:
+            return
+        with self._lock, self._conn:
+            now = self._tick()
+            rows = [
+                (np.asarray(v, dtype=np.float32).tobytes(), now, model, h)
+                for h, v in items.items()
+            ]
+            inserted = self._conn.executemany(
+                "INSERT OR IGNORE INTO embeddings (vector, last_used, model, text_hash) "
+                "VALUES (?, ?, ?, ?)",
+                rows,
+            ).rowcount
+            if inserted < len(rows):
+                # Another caller stored some of these texts first.
+                self._conn.executemany(
+                    "UPDATE embeddings SET vector = ?, last_used = ? "
+                    "WHERE model = ? AND text_hash = ?",
+                    rows,
+                )
+            self._count += inserted
+            self._puts += 1
+            if self._puts % RECOUNT_EVERY == 0:
+                self._count = self._entry_count()
+            overflow = self._count - self.max_entries
+            if overflow > 0:
+                self._count -= self._conn.execute(
+                    "DELETE FROM embeddings WHERE (model, text_hash) IN ("
+                    "SELECT model, text_hash FROM embeddings ORDER BY last_used LIMIT ?)",
+                    (overflow,),
+                ).rowcount
+
+    def stats(self) -> dict:
+        with self._lock:
+            entries = self._entry_count()
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "entries": entries,
+                "max_entries": self.max_entries,
+            }
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class CachedEmbeddings(Embeddings):
+    """Embeddings wrapper that consults an ``EmbeddingCache`` before the model."""
+
+    def __init__(self, embeddings: Embeddings, cache: EmbeddingCache, model: str):
+        self.embeddings = embeddings
+        self.cache = cache
+        self.model = model
+
+    @staticmethod
+    def _missing(hashes: list[str], texts: list[str], found: dict) -> dict[str, str]:
+        missing: dict[str, str] = {}
+        for h, t in zip(hashes, texts):
+            if h not in found:
+                missing.setdefault(h, t)
+        return missing
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        hashes = [text_hash(t) for t in texts]
+        found = self.cache.get_many(self.model, hashes)
+
+        missing = self._missing(hashes, texts, found)
+        if missing:
+            vectors = self.embeddings.embed_documents(list(missing.values()))
+            computed = dict(zip(missing.keys(), vectors))
+            self.cache.put_many(self.model, computed)
+            found.update(computed)
+
+        return [found[h] for h in hashes]
+
+    @staticmethod
+    async def _offload(fn, *args):
+        """Run SQLite work on the registry's bounded executor, off the event loop."""
+        return await asyncio.get_running_loop().run_in_executor(registry.executor(), fn, *args)
+
+    async def aembed_documents(self, texts: list[str]) -> list[list[float]]:
+        # SQLite lookups run off the event loop; the model call uses the
+        # wrapped client's native async path.
+        hashes = [text_hash(t) for t in texts]
+        found = await self._offload(self.cache.get_many, self.model, hashes)
+
+        missing = self._missing(hashes, texts, found)
+        if missing:
+            vectors = await self.embeddings.aembed_documents(list(missing.values()))
+            computed = dict(zip(missing.keys(), vectors))
+            await self._offload(self.cache.put_many, self.model, computed)
+            found.update(computed)
+
+        return [found[h] for h in hashes]
+
+    def embed_query(self, text: str) -> list[float]:
+        h = text_hash(text)
+        found = self.cache.get_many(self.model, [h])
+        if h in found:
+            return found[h]
+        vector = self.embeddings.embed_query(text)
+        self.cache.put_many(self.model, {h: vector})
+        return vector
+
+    async def aembed_query(self, text: str) -> list[float]:
+        h = text_hash(text)
+        found = await self._offload(self.cache.get_many, self.model, [h])
+        if h in found:
+            return found[h]
+        vector = await self.embeddings.aembed_query(text)
+        await self._offload(self.cache.put_many, self.model, {h: vector})
+        return vector
@@ -0,0 +1,245 @@
+"""Persistent background ingestion jobs.
+
+``/ingest`` and ``/upload`` enqueue a job and return its id immediately;
+a local pool of worker threads runs the streaming ingestion pipeline and
+records stage, counters, throughput and errors. Jobs live in SQLite, so
+queued work (and work interrupted by a restart) is picked up again when
+the manager starts.
+"""
+
+from __future__ import annotations
+
+import json
+import queue
+import sqlite3
+import threading
+import time
+import uuid
+from pathlib import Path
+
+from src.config import settings
+from src.ingestion.pipeline import IngestProgress, run_ingest_pipeline
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    status TEXT NOT NULL,
+    stage TEXT NOT NULL,
+    files_total INTEGER NOT NULL DEFAULT 0,
+    files_done INTEGER NOT NULL DEFAULT 0,
+    chunks_total INTEGER NOT NULL DEFAULT 0,
+    chunks_done INTEGER NOT NULL DEFAULT 0,
+    chunks_per_sec REAL NOT NULL DEFAULT 0,
+    errors TEXT NOT NULL DEFAULT '[]',
+    result TEXT,
+    created_at REAL NOT NULL,
+    started_at REAL,
+    finished_at REAL
+);
+CREATE INDEX IF NOT EXISTS idx_jobs_created ON jobs (created_at);
+"""
+
+QUEUED, RUNNING, SUCCEEDED, FAILED = "queued", "running", "succeeded", "failed"
+
+# Minimum seconds between progress writes for a running job
+PROGRESS_INTERVAL = 0.5
+
+
+class JobInterrupted(Exception):
+    """Raised inside a running job when the manager is shutting down."""
+
+
+class JobManager:
+    """SQLite-backed job table plus a pool of worker threads."""
+
+    def __init__(self, path: str | Path, workers: int = 1):
+        self.path = Path(path)
+        self.workers = workers
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(SCHEMA)
+        self._queue: queue.Queue[str | None] = queue.Queue()
+        self._threads: list[threading.Thread] = []
+        self._stopping = threading.Event()
+
+    # -- Persistence ---------------------------------------------------------
+
+    def _update(self, job_id: str, **fields) -> None:
+        assignments = ", ".join(f"{name} = ?" for name in fields)
+        with self._lock, self._conn:
+            self._conn.execute(
+                f"UPDATE jobs SET {assignments} WHERE id = ?", [*fields.values(), job_id]
+            )
+
+    @staticmethod
+    def _row_to_dict(row: sqlite3.Row) -> dict:
+        job = dict(row)
+        job["payload"] = json.loads(job["payload"])
+        job["errors"] = json.loads(job["errors"])
+        job["result"] = json.loads(job["result"]) if job["result"] else None
+        return job
+
+    def get(self, job_id: str) -> dict | None:
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return self._row_to_dict(row) if row else None
+
+    def list(self, limit: int = 50) -> list[dict]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT * FROM jobs ORDER BY created_at DESC LIMIT ?", (limit,)
+            ).fetchall()
+        return [self._row_to_dict(row) for row in rows]
+
+    # -- Queue ---------------------------------------------------------------
+
+    def submit(self, kind: str, paths: list[str | Path], **payload) -> dict:
+        """Persist a new job over ``paths`` and queue it for the workers."""
+        job_id = uuid.uuid4().hex
+        payload = {"paths": [str(p) for p in paths], **payload}
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT INTO jobs (id, kind, payload, status, stage, files_total, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (job_id, kind, json.dumps(payload), QUEUED, QUEUED, len(paths), time.time()),
+            )
+        self._queue.put(job_id)
+        return self.get(job_id)
+
+    def start(self) -> None:
+        """Re-queue unfinished jobs from a previous run and start the workers."""
+        if self._threads:
+            return
+        self._stopping.clear()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE jobs SET status = ?, stage = ? WHERE status = ?",
+                (QUEUED, QUEUED, RUNNING),
+            )
+            pending = self._conn.execute(
+                "SELECT id FROM jobs WHERE status = ? ORDER BY created_at", (QUEUED,)
+            ).fetchall()
+        # Rebuild the in-memory queue from the table so it holds exactly the
+        # persisted queued jobs, in submission order.
+        self._queue = queue.Queue()
+        for (job_id,) in pending:
+            self._queue.put(job_id)
+        for i in range(max(1, self.workers)):
+            thread = threading.Thread(target=self._work, name=f"ingest-job-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self) -> None:
+        """
+        Stop the workers. A running job is interrupted at its next progress
+        point and, like every queued job, resumes on the next ``start()``;
+        already-committed chunks are deduplicated on the re-run.
+        """
+        self._stopping.set()
+        for _ in self._threads:
+            self._queue.put(None)
+        for thread in self._threads:
+            thread.join()
+        self._threads.clear()
+
+    def close(self) -> None:
+        self.stop()
+        with self._lock:
+            self._conn.close()
+
+    # -- Execution -----------------------------------------------------------
+
+    def _work(self) -> None:
+        while True:
+            job_id = self._queue.get()
+            if job_id is None or self._stopping.is_set():
+                return
+            job = self.get(job_id)
+            if job is None or job["status"] != QUEUED:
+                continue
+            self._run(job)
+
+    def _run(self, job: dict) -> None:
+        job_id = job["id"]
+        self._update(job_id, status=RUNNING, stage="parsing", started_at=time.time())
+        last_write = 0.0
+
+        def on_progress(progress: IngestProgress) -> None:
+            nonlocal last_write
+            if self._stopping.is_set():
+                raise JobInterrupted()
+            now = time.monotonic()
+            if now - last_write < PROGRESS_INTERVAL:
+                return
+            last_write = now
+            self._update(job_id, **_progress_fields(progress))
+
+        try:
+            stats = run_ingest_pipeline(
+                job["payload"]["paths"],
+                on_progress=on_progress,
+                directory=job["payload"].get("directory"),
+                collection=job["payload"].get("collection"),
+            )
+        except JobInterrupted:
+            self._update(job_id, status=QUEUED, stage=QUEUED)
+            return
+        except Exception as e:
+            self._update(
+                job_id,
+                status=FAILED,
+                stage=FAILED,
+                errors=json.dumps([f"{type(e).__name__}: {e}"]),
+                finished_at=time.time(),
+            )
+            return
+
+        self._update(
+            job_id,
+            status=SUCCEEDED,
+            stage="done",
+            files_done=stats["files"],
+            chunks_total=stats["total_chunks"],
+            chunks_done=stats["new_chunks"] + stats["duplicates_skipped"],
+            chunks_per_sec=round(stats["new_chunks"] / stats["seconds"], 2) if stats["seconds"] else 0.0,
+            errors=json.dumps(stats["errors"]),
+            result=json.dumps(stats),
+            finished_at=time.time(),
+        )
+
+
+def _progress_fields(progress: IngestProgress) -> dict:
+    parsing = progress.files_done < progress.files_total
+    return {
+        "stage": "parsing" if parsing else "embedding",
+        "files_done": progress.files_done,
+        "chunks_total": progress.chunks_parsed,
+        "chunks_done": progress.chunks_written + progress.duplicates_skipped,
+        "chunks_per_sec": round(progress.chunks_per_sec, 2),
+        "errors": json.dumps(progress.errors),
+    }
+
+
+_manager: JobManager | None = None
+_manager_lock = threading.Lock()
+
+
+def get_job_manager() -> JobManager:
+    """Return the process-wide job manager (workers start via ``start()``)."""
+    global _manager
+    with _manager_lock:
+        if _manager is None:
+            _manager = JobManager(settings.jobs_path, workers=settings.job_workers)
+        return _manager
+
+
+def close_job_manager() -> None:
+    global _manager
+    with _manager_lock:
+        if _manager is not None:
+            _manager.close()
+            _manager = None
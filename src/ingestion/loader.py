@@ -1,16 +1,25 @@
 from __future__ import annotations
 """PDF loading and text chunking pipeline."""
 
+import time
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass, field
 from pathlib import Path
-from langchain_community.document_loaders import PyPDFLoader
-from langchain.text_splitter import RecursiveCharacterTextSplitter
-from langchain.schema import Document
+from typing import Iterable, Iterator
+
+from langchain_core.documents import Document
 
 from src.config import settings
 
 
 def load_pdf(file_path: str | Path) -> list[Document]:
     """Load a single PDF and return raw page documents."""
+    # Imported on first use: langchain_community is slow to import and
+    # processes that never parse a PDF should not pay for it.
+    from langchain_community.document_loaders import PyPDFLoader
+
     loader = PyPDFLoader(str(file_path))
     return loader.load()
 
@@ -30,6 +39,8 @@ def chunk_documents(
     chunk_overlap: int | None = None,
 ) -> list[Document]:
     """Split documents into chunks with metadata preserved."""
+    from langchain.text_splitter import RecursiveCharacterTextSplitter
+
     splitter = RecursiveCharacterTextSplitter(
         chunk_size=chunk_size or settings.chunk_size,
         chunk_overlap=chunk_overlap or settings.chunk_overlap,
@@ -46,3 +57,97 @@ def chunk_documents(
         chunk.metadata["filename"] = Path(source).name if source else "unknown"
 
     return chunks
+
+
+@dataclass
+class FileResult:
+    """Chunks produced from one PDF, with timing and any parse error."""
+
+    path: Path
+    chunks: list[Document] = field(default_factory=list)
+    pages: int = 0
+    seconds: float = 0.0
+    error: str | None = None
+    parse_seconds: float = 0.0
+    chunk_seconds: float = 0.0
+
+
+def load_and_chunk_file(
+    file_path: str | Path,
+    chunk_size: int | None = None,
+    chunk_overlap: int | None = None,
+) -> FileResult:
+    """Parse and chunk a single PDF, capturing failures instead of raising."""
+    path = Path(file_path)
+    start = time.perf_counter()
+    try:
+        pages = load_pdf(path)
+        parsed = time.perf_counter()
+        chunks = chunk_documents(pages, chunk_size=chunk_size, chunk_overlap=chunk_overlap)
+        end = time.perf_counter()
+        return FileResult(
+            path, chunks, len(pages), end - start,
+            parse_seconds=parsed - start, chunk_seconds=end - parsed,
+        )
+    except Exception as e:
+        return FileResult(path, seconds=time.perf_counter() - start, error=f"{type(e).__name__}: {e}")
+
+
+def load_and_chunk_files(
+    paths: Iterable[str | Path],
+    workers: int | None = None,
+    chunk_size: int | None = None,
+    chunk_overlap: int | None = None,
+) -> Iterator[FileResult]:
+    """
+    Parse and chunk PDFs, optionally across a process pool.
+
+    Results are yielded in input order. With ``workers > 1`` at most
+    ``2 * workers`` files are in flight, and a file that crashes its worker
+    is retried once in a fresh pool and then reported as a failed
+    ``FileResult`` rather than aborting the batch.
+    """
+    paths = [Path(p) for p in paths]
+    workers = workers or settings.ingest_workers
+    if workers <= 1:
+        for path in paths:
+            yield load_and_chunk_file(path, chunk_size, chunk_overlap)
+        return
+
+    window = 2 * workers
+    pool = ProcessPoolExecutor(max_workers=workers)
+    pending: deque[tuple[Path, Future, int]] = deque()
+    backlog: deque[tuple[Path, int]] = deque((p, 1) for p in paths)
+
+    def refill() -> None:
+        while backlog and len(pending) < window:
+            path, attempt = backlog.popleft()
+            future = pool.submit(load_and_chunk_file, path, chunk_size, chunk_overlap)
+            pending.append((path, future, attempt))
+
+    try:
+        refill()
+        while pending:
+            path, future, attempt = pending.popleft()
+            try:
+                result = future.result()
+            except BrokenProcessPool:
+                # A worker died hard (e.g. a native crash inside the parser) and
+                # took every in-flight file with it. Restart the pool and re-run
+                # the head file alone: if it breaks the pool on its own it is the
+                # culprit and is reported as failed.
+                pool.shutdown(wait=False, cancel_futures=True)
+                pool = ProcessPoolExecutor(max_workers=workers)
+                backlog.extendleft(reversed([(p, a) for p, _, a in pending]))
+                pending.clear()
+                if attempt > 1:
+                    yield FileResult(path, error="BrokenProcessPool: worker crashed while parsing")
+                    refill()
+                else:
+                    future = pool.submit(load_and_chunk_file, path, chunk_size, chunk_overlap)
+                    pending.append((path, future, attempt + 1))
+                continue
+            yield result
+            refill()
+    finally:
+        pool.shutdown(wait=True, cancel_futures=True)
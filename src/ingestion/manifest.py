@@ -0,0 +1,177 @@
+"""Persistent manifest of ingested files.
+
+Each successfully ingested PDF is recorded with its size, mtime, content
+hash, the chunking parameters used and the ids of the chunks it produced.
+A re-ingest consults the manifest before opening any file: files whose
+size and mtime are unchanged are skipped outright, files whose bytes are
+unchanged (e.g. only touched) are skipped after hashing, and only new or
+changed files are parsed. The recorded chunk ids let superseded chunks of
+changed or removed files be retired from the store.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    path TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    sha256 TEXT NOT NULL,
+    chunking TEXT NOT NULL,
+    chunk_ids TEXT NOT NULL,
+    ingested_at REAL NOT NULL
+) WITHOUT ROWID;
+"""
+
+
+def file_key(path: str | Path) -> str:
+    """Manifest key for a file: its absolute, resolved path."""
+    return str(Path(path).resolve())
+
+
+def file_sha256(path: str | Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+@dataclass
+class FileRecord:
+    """One manifest row."""
+
+    path: str
+    size: int
+    mtime_ns: int
+    sha256: str
+    chunking: str
+    chunk_ids: list[str] = field(default_factory=list)
+    ingested_at: float = 0.0
+
+
+@dataclass
+class PlannedFile:
+    """A new or changed file that must be parsed, with its current state."""
+
+    path: Path
+    size: int
+    mtime_ns: int
+    sha256: str
+    previous: FileRecord | None = None
+
+
+class IngestManifest:
+    """SQLite table of ingested files keyed by resolved path."""
+
+    def __init__(self, path: str | Path):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(SCHEMA)
+
+    @staticmethod
+    def _row_to_record(row: tuple) -> FileRecord:
+        path, size, mtime_ns, sha256, chunking, chunk_ids, ingested_at = row
+        return FileRecord(path, size, mtime_ns, sha256, chunking, json.loads(chunk_ids), ingested_at)
+
+    def get(self, path: str | Path) -> FileRecord | None:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT * FROM files WHERE path = ?", (file_key(path),)
+            ).fetchone()
+        return self._row_to_record(row) if row else None
+
+    def under(self, root: str | Path) -> list[FileRecord]:
+        """Records for every file directly inside directory ``root``."""
+        root = file_key(root)
+        # Range scan over the primary key for paths prefixed by ``root/``
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT * FROM files WHERE path > ? AND path < ?",
+                (root + os.sep, root + chr(ord(os.sep) + 1)),
+            ).fetchall()
+        return [
+            record for record in map(self._row_to_record, rows)
+            if str(Path(record.path).parent) == root
+        ]
+
+    def record(self, record: FileRecord) -> None:
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (
+                    file_key(record.path),
+                    record.size,
+                    record.mtime_ns,
+                    record.sha256,
+                    record.chunking,
+                    json.dumps(record.chunk_ids),
+                    record.ingested_at or time.time(),
+                ),
+            )
+
+    def touch(self, path: str | Path, size: int, mtime_ns: int) -> None:
+        """Refresh the stat fields of a file whose content did not change."""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE files SET size = ?, mtime_ns = ? WHERE path = ?",
+                (size, mtime_ns, file_key(path)),
+            )
+
+    def remove(self, path: str | Path) -> None:
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM files WHERE path = ?", (file_key(path),))
+
+    def count(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM files").fetchone()[0]
+
+    def plan(
+        self,
+        paths: list[Path],
+        chunking: str,
+        force: bool = False,
+    ) -> tuple[list[PlannedFile], int]:
+        """
+        Split ``paths`` into files that need parsing and a count of files
+        that are unchanged since they were last ingested with ``chunking``.
+        ``force`` plans every file.
+        """
+        planned: list[PlannedFile] = []
+        unchanged = 0
+        for path in paths:
+            try:
+                st = path.stat()
+            except OSError:
+                # Let the parser report the file as failed.
+                planned.append(PlannedFile(path, -1, -1, "", self.get(path)))
+                continue
+            previous = self.get(path)
+            if previous is not None and previous.chunking == chunking and not force:
+                if previous.size == st.st_size and previous.mtime_ns == st.st_mtime_ns:
+                    unchanged += 1
+                    continue
+                digest = file_sha256(path)
+                if previous.size == st.st_size and previous.sha256 == digest:
+                    self.touch(path, st.st_size, st.st_mtime_ns)
+                    unchanged += 1
+                    continue
+            else:
+                digest = file_sha256(path)
+            planned.append(PlannedFile(path, st.st_size, st.st_mtime_ns, digest, previous))
+        return planned, unchanged
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,268 @@
+"""Streaming, bounded-memory ingestion pipeline.
+
+Files flow parse → chunk → embed/store through generators joined by a
+bounded queue: a background thread parses and chunks PDFs (optionally
+across a process pool) while the calling thread embeds and commits
+chunks in batches. Peak memory is bounded by the queue size and the
+write buffer, not by the corpus, and chunks become searchable as soon as
+their batch is committed.
+
+Before parsing, paths are checked against the ingest manifest so that
+unchanged files are never opened; once all of a file's chunks are
+committed its manifest entry is written and any chunks from its previous
+version are retired.
+"""
+
+from __future__ import annotations
+
+import queue
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Iterable, Iterator
+
+from langchain_core.documents import Document
+
+from src.clients import registry
+from src.config import settings
+from src.ingestion.embedder import (
+    chunk_ids,
+    delete_chunks,
+    get_vector_backend,
+    ingest_documents,
+    stored_chunk_ids,
+)
+from src.ingestion.loader import FileResult, load_and_chunk_files
+from src.ingestion.manifest import FileRecord, PlannedFile, file_key
+from src.metrics import record_stages
+
+_DONE = object()
+
+
+@dataclass
+class IngestProgress:
+    """Live counters for a pipeline run."""
+
+    files_total: int
+    files_done: int = 0
+    files_failed: int = 0
+    files_skipped: int = 0
+    files_removed: int = 0
+    chunks_parsed: int = 0
+    chunks_written: int = 0
+    duplicates_skipped: int = 0
+    chunks_failed: int = 0
+    chunks_removed: int = 0
+    errors: list[str] = field(default_factory=list)
+    started: float = field(default_factory=time.perf_counter)
+
+    @property
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started
+
+    @property
+    def chunks_per_sec(self) -> float:
+        return self.chunks_written / self.elapsed if self.elapsed > 0 else 0.0
+
+    def as_stats(self) -> dict:
+        return {
+            "total_chunks": self.chunks_parsed,
+            "new_chunks": self.chunks_written,
+            "duplicates_skipped": self.duplicates_skipped,
+            "failed_chunks": self.chunks_failed,
+            "errors": self.errors,
+            "files": self.files_total,
+            "failed_files": self.files_failed,
+            "skipped_files": self.files_skipped,
+            "removed_files": self.files_removed,
+            "removed_chunks": self.chunks_removed,
+            "seconds": round(self.elapsed, 3),
+        }
+
+
+class _Failure:
+    def __init__(self, error: BaseException):
+        self.error = error
+
+
+def iter_bounded(items: Iterable, maxsize: int) -> Iterator:
+    """
+    Run ``items`` in a background thread and yield its values through a
+    bounded queue, so the producer runs ahead of the consumer by at most
+    ``maxsize`` items. Producer exceptions are re-raised in the consumer.
+    """
+    q: queue.Queue = queue.Queue(maxsize=max(1, maxsize))
+    stop = threading.Event()
+
+    def put(item) -> bool:
+        while not stop.is_set():
+            try:
+                q.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def produce() -> None:
+        try:
+            for item in items:
+                if not put(item):
+                    return
+        except BaseException as e:
+            put(_Failure(e))
+        finally:
+            put(_DONE)
+
+    thread = threading.Thread(target=produce, name="ingest-producer", daemon=True)
+    thread.start()
+    try:
+        while True:
+            item = q.get()
+            if item is _DONE:
+                return
+            if isinstance(item, _Failure):
+                raise item.error
+            yield item
+    finally:
+        stop.set()
+        thread.join()
+
+
+def batched(chunks: Iterable[Document], size: int) -> Iterator[list[Document]]:
+    """Group a chunk stream into lists of at most ``size``."""
+    batch: list[Document] = []
+    for chunk in chunks:
+        batch.append(chunk)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def run_ingest_pipeline(
+    paths: Iterable[str | Path],
+    workers: int | None = None,
+    chunk_size: int | None = None,
+    chunk_overlap: int | None = None,
+    on_progress: Callable[[IngestProgress], None] | None = None,
+    on_file: Callable[[FileResult], None] | None = None,
+    directory: str | Path | None = None,
+    force: bool = False,
+    collection: str | None = None,
+) -> dict:
+    """
+    Stream PDFs through parse, chunk, embed and store with bounded memory,
+    into ``collection`` (the default collection when omitted).
+
+    Files unchanged since their last ingest are skipped (``force`` parses
+    everything). When ``directory`` is given, manifest entries for files
+    in it that are no longer among ``paths`` are treated as removed and
+    their chunks are deleted.
+
+    ``on_file`` is called for every parsed file (including failures) and
+    ``on_progress`` after every committed batch or file. Returns the same
+    stats as ``ingest_documents`` plus file counts.
+    """
+    paths = [Path(p) for p in paths]
+    manifest = registry.ingest_manifest(collection)
+    chunking = f"{chunk_size or settings.chunk_size}:{chunk_overlap or settings.chunk_overlap}"
+    planned, unchanged = manifest.plan(paths, chunking, force=force)
+    by_path = {p.path: p for p in planned}
+
+    progress = IngestProgress(files_total=len(paths), files_done=unchanged, files_skipped=unchanged)
+    report = on_progress or (lambda _: None)
+
+    if directory is not None:
+        present = {file_key(p) for p in paths}
+        for record in manifest.under(directory):
+            if record.path not in present:
+                progress.chunks_removed += delete_chunks(record.chunk_ids, collection)
+                progress.files_removed += 1
+                manifest.remove(record.path)
+    report(progress)
+
+    # Parsed files whose chunks are not all committed yet, with the
+    # cumulative chunk offset at which each one ends.
+    pending: deque[tuple[FileResult, int]] = deque()
+
+    def settle(flushed: int) -> None:
+        while pending and pending[0][1] <= flushed:
+            result, _ = pending.popleft()
+            if not result.error and result.path in by_path:
+                _commit_file(by_path[result.path], result, chunking, progress, collection)
+
+    def chunk_stream() -> Iterator[Document]:
+        results = load_and_chunk_files(
+            list(by_path), workers=workers, chunk_size=chunk_size, chunk_overlap=chunk_overlap
+        )
+        for result in iter_bounded(results, settings.pipeline_queue_size):
+            progress.files_done += 1
+            if result.error:
+                progress.files_failed += 1
+                progress.errors.append(f"{result.path.name}: {result.error}")
+            else:
+                record_stages("ingest", {
+                    "parse_ms": result.parse_seconds * 1000,
+                    "chunk_ms": result.chunk_seconds * 1000,
+                })
+            progress.chunks_parsed += len(result.chunks)
+            pending.append((result, progress.chunks_parsed))
+            if on_file is not None:
+                on_file(result)
+            report(progress)
+            yield from result.chunks
+
+    def on_batch(written: int) -> None:
+        progress.chunks_written += written
+        report(progress)
+
+    # Each flush hands ingest_documents enough chunks to keep every
+    # embedding worker busy, and no more.
+    flush_size = max(1, settings.ingest_batch_size * settings.ingest_concurrency)
+    flushed = 0
+    for batch in batched(chunk_stream(), flush_size):
+        stats = ingest_documents(batch, progress=on_batch, collection=collection)
+        progress.duplicates_skipped += stats["duplicates_skipped"]
+        progress.chunks_failed += stats["failed_chunks"]
+        progress.errors.extend(stats["errors"])
+        flushed += len(batch)
+        settle(flushed)
+    settle(flushed)
+
+    # Let the vector backend refresh derived structures (e.g. IVF lists)
+    # once per run rather than per batch.
+    if progress.chunks_written:
+        get_vector_backend(collection).optimize()
+
+    return progress.as_stats()
+
+
+def _commit_file(
+    planned: PlannedFile,
+    result: FileResult,
+    chunking: str,
+    progress: IngestProgress,
+    collection: str | None = None,
+) -> None:
+    """Record a fully flushed file in the manifest and retire its superseded chunks."""
+    ids = list(dict.fromkeys(chunk_ids(result.chunks)))
+    # After a failed batch, leave the file out of the manifest so the next
+    # run parses it again.
+    if progress.chunks_failed and len(stored_chunk_ids(ids, collection)) < len(ids):
+        return
+    if planned.previous is not None:
+        stale = set(planned.previous.chunk_ids).difference(ids)
+        progress.chunks_removed += delete_chunks(sorted(stale), collection)
+    registry.ingest_manifest(collection).record(
+        FileRecord(
+            path=str(planned.path),
+            size=planned.size,
+            mtime_ns=planned.mtime_ns,
+            sha256=planned.sha256,
+            chunking=chunking,
+            chunk_ids=ids,
+        )
+    )
@@ -0,0 +1,41 @@
+"""Monotonic collection version shared by every process using the store.
+
+Each collection has its own version, bumped by every ingest or delete that
+changes it; caches tag their entries with the versions of the collections
+they were computed from and ignore entries from older versions, so they
+never serve results from before an ingest.
+"""
+
+from __future__ import annotations
+
+import sqlite3
+import threading
+from pathlib import Path
+
+
+class CollectionVersion:
+    """Integer counter persisted in SQLite so increments are atomic across processes."""
+
+    def __init__(self, path: str | Path):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS version (id INTEGER PRIMARY KEY CHECK (id = 0), value INTEGER NOT NULL)"
+        )
+        with self._conn:
+            self._conn.execute("INSERT OR IGNORE INTO version (id, value) VALUES (0, 0)")
+
+    def get(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT value FROM version WHERE id = 0").fetchone()[0]
+
+    def bump(self) -> int:
+        with self._lock, self._conn:
+            self._conn.execute("UPDATE version SET value = value + 1 WHERE id = 0")
+            return self._conn.execute("SELECT value FROM version WHERE id = 0").fetchone()[0]
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,243 @@
+"""Prometheus metrics and per-request stage timings.
+
+Pipeline code already records per-stage wall times into ``timings``
+dicts; ``record_stages`` feeds those into the ``rag_stage_duration_seconds``
+histogram and into the Server-Timing collector of the HTTP request being
+served, if any. ``span`` times a block directly where no dict is
+threaded through (ingestion). Counters that components already keep
+(cache hits and misses) are read at scrape time by registered collectors,
+so the hot path pays only for a dict update and a bucket increment.
+
+The exposition format is written by hand to avoid a client dependency.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Iterable
+
+from src.config import settings
+
+DEFAULT_BUCKETS = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0,
+)
+
+# (metric name, type, help, [(labels, value)])
+Family = tuple[str, str, str, list[tuple[dict[str, str], float]]]
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(labels: dict[str, str]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in labels.items()) + "}"
+
+
+def _number(value: float) -> str:
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+class Counter:
+    """Monotonic counter keyed by label values."""
+
+    def __init__(self, name: str, help: str, labelnames: tuple[str, ...] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = labelnames
+        self._values: dict[tuple, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = tuple(labels[name] for name in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def collect(self) -> Iterable[str]:
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} counter"
+        with self._lock:
+            values = list(self._values.items())
+        for key, value in values:
+            yield f"{self.name}{_labels(dict(zip(self.labelnames, key)))} {_number(value)}"
+
+
+class Histogram:
+    """Cumulative-bucket histogram keyed by label values."""
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labelnames: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ):
+        self.name = name
+        self.help = help
+        self.labelnames = labelnames
+        self.buckets = tuple(sorted(buckets))
+        # label key -> [per-bucket counts (+Inf last), sum]
+        self._series: dict[tuple, list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = tuple(labels[name] for name in self.labelnames)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][index] += 1
+            series[1] += value
+
+    def collect(self) -> Iterable[str]:
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} histogram"
+        with self._lock:
+            series = [(key, list(counts), total) for key, (counts, total) in self._series.items()]
+        for key, counts, total in series:
+            labels = dict(zip(self.labelnames, key))
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else _number(bound)
+                yield f"{self.name}_bucket{_labels({**labels, 'le': le})} {cumulative}"
+            yield f"{self.name}_sum{_labels(labels)} {_number(total)}"
+            yield f"{self.name}_count{_labels(labels)} {cumulative}"
+
+
+class MetricsRegistry:
+    """Owned metrics plus scrape-time collectors, rendered in text format."""
+
+    def __init__(self) -> None:
+        self._metrics: list[Counter | Histogram] = []
+        self._collectors: list[Callable[[], list[Family]]] = []
+
+    def counter(self, name: str, help: str, labelnames: tuple[str, ...] = ()) -> Counter:
+        metric = Counter(name, help, labelnames)
+        self._metrics.append(metric)
+        return metric
+
+    def histogram(self, name: str, help: str, labelnames: tuple[str, ...] = (), **kwargs) -> Histogram:
+        metric = Histogram(name, help, labelnames, **kwargs)
+        self._metrics.append(metric)
+        return metric
+
+    def register_collector(self, collector: Callable[[], list[Family]]) -> None:
+        """Add a callable returning metric families computed at scrape time."""
+        self._collectors.append(collector)
+
+    def render(self) -> str:
+        lines: list[str] = []
+        for metric in self._metrics:
+            lines.extend(metric.collect())
+        for collector in self._collectors:
+            for name, kind, help, samples in collector():
+                lines.append(f"# HELP {name} {help}")
+                lines.append(f"# TYPE {name} {kind}")
+                lines.extend(f"{name}{_labels(labels)} {_number(value)}" for labels, value in samples)
+        return "\n".join(lines) + "\n"
+
+
+metrics = MetricsRegistry()
+
+STAGE_SECONDS = metrics.histogram(
+    "rag_stage_duration_seconds",
+    "Wall time of one pipeline stage (search.*, ask.*, ingest.*)",
+    ("stage",),
+)
+REQUEST_SECONDS = metrics.histogram(
+    "rag_http_request_duration_seconds",
+    "HTTP request latency until the response headers are sent",
+    ("route", "status"),
+)
+LLM_TOKENS = metrics.counter(
+    "rag_llm_tokens_total",
+    "Tokens reported by the chat model, by kind (prompt or completion)",
+    ("kind",),
+)
+CONTEXT_TOKENS = metrics.counter(
+    "rag_context_tokens_total",
+    "Estimated prompt context tokens sent to the chat model and saved by packing",
+    ("kind",),
+)
+COALESCED_REQUESTS = metrics.counter(
+    "rag_coalesced_requests_total",
+    "Requests served by joining an identical request already in flight",
+    ("route",),
+)
+
+# Stage timings of the HTTP request being served: stage -> milliseconds
+_request_timings: ContextVar[dict[str, float] | None] = ContextVar("request_timings", default=None)
+
+
+def record_stages(scope: str, timings: dict[str, float], keys: Iterable[str] | None = None) -> None:
+    """
+    Observe each ``<stage>_ms`` entry of ``timings`` (or only ``keys``) as
+    stage ``<scope>.<stage>``.
+    """
+    if not settings.metrics_enabled:
+        return
+    current = _request_timings.get()
+    for key in keys if keys is not None else list(timings):
+        ms = timings.get(key)
+        if ms is None or not key.endswith("_ms"):
+            continue
+        stage = f"{scope}.{key[:-3]}"
+        STAGE_SECONDS.observe(ms / 1000, stage=stage)
+        if current is not None:
+            current[stage] = current.get(stage, 0.0) + ms
+
+
+@contextmanager
+def span(stage: str):
+    """Time the enclosed block as ``stage``."""
+    if not settings.metrics_enabled:
+        yield
+        return
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        STAGE_SECONDS.observe(time.perf_counter() - t0, stage=stage)
+
+
+def record_llm_usage(message) -> None:
+    """Count the prompt and completion tokens a chat model reported on ``message``."""
+    usage = getattr(message, "usage_metadata", None)
+    if not usage or not settings.metrics_enabled:
+        return
+    LLM_TOKENS.inc(usage.get("input_tokens", 0), kind="prompt")
+    LLM_TOKENS.inc(usage.get("output_tokens", 0), kind="completion")
+
+
+def record_context_usage(usage: dict[str, int]) -> None:
+    """Count the context tokens sent and saved for one answer (see ``PackedContext.usage``)."""
+    if not settings.metrics_enabled:
+        return
+    CONTEXT_TOKENS.inc(usage["sent"], kind="sent")
+    CONTEXT_TOKENS.inc(usage["saved"], kind="saved")
+
+
+def begin_request():
+    """Start collecting stage timings for the current request; returns a reset token."""
+    return _request_timings.set({})
+
+
+def end_request(token) -> dict[str, float]:
+    timings = _request_timings.get() or {}
+    _request_timings.reset(token)
+    return timings
+
+
+def server_timing_header(timings: dict[str, float], total_ms: float) -> str:
+    """``Server-Timing`` value listing each stage and the request total."""
+    entries = [f"{stage};dur={ms:.2f}" for stage, ms in timings.items()]
+    entries.append(f"total;dur={total_ms:.2f}")
+    return ", ".join(entries)
@@ -0,0 +1,227 @@
+"""Persistent corpus-wide BM25 inverted index backed by SQLite.
+
+The index is updated incrementally by ``ingest_documents`` and queried
+directly by the keyword leg of hybrid search, so a query only touches the
+postings of its own terms instead of re-tokenizing candidate chunks.
+
+``chunk_meta`` maps each chunk's filename, page and ingest time to its
+id under SQLite indexes, so a filtered query resolves its scope through
+those indexes and reads only the postings of in-scope chunks.
+"""
+
+from __future__ import annotations
+
+import heapq
+import math
+import sqlite3
+import threading
+from collections import Counter
+from pathlib import Path
+
+from src.search.filters import MetadataFilter
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS chunks (
+    chunk_id TEXT PRIMARY KEY,
+    length INTEGER NOT NULL
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS postings (
+    term TEXT NOT NULL,
+    chunk_id TEXT NOT NULL,
+    tf INTEGER NOT NULL,
+    PRIMARY KEY (term, chunk_id)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS terms (
+    term TEXT PRIMARY KEY,
+    df INTEGER NOT NULL
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS chunk_meta (
+    chunk_id TEXT PRIMARY KEY,
+    filename TEXT,
+    page INTEGER,
+    ingested_at REAL
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_chunk_meta_file_page ON chunk_meta (filename, page);
+CREATE INDEX IF NOT EXISTS idx_chunk_meta_ingested ON chunk_meta (ingested_at);
+CREATE TABLE IF NOT EXISTS stats (
+    key TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+) WITHOUT ROWID;
+"""
+
+# Metadata filter fields are columns of ``chunk_meta``
+FILTER_COLUMNS = {field: field for field in ("filename", "page", "ingested_at")}
+
+
+def tokenize(text: str) -> list[str]:
+    """Simple whitespace + lowercase tokenizer."""
+    return text.lower().split()
+
+
+class BM25Index:
+    """
+    On-disk inverted index with postings, document lengths and document
+    frequencies. Scores use Okapi BM25 with the non-negative IDF
+    ``log(1 + (N - df + 0.5) / (df + 0.5))`` so corpus statistics stay
+    valid as chunks are added without a global re-normalization pass.
+    """
+
+    def __init__(self, path: str | Path, k1: float = 1.5, b: float = 0.75):
+        self.path = Path(path)
+        self.k1 = k1
+        self.b = b
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(SCHEMA)
+
+    def _stat(self, key: str) -> int:
+        row = self._conn.execute("SELECT value FROM stats WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else 0
+
+    def _bump_stat(self, key: str, delta: int) -> None:
+        self._conn.execute(
+            "INSERT INTO stats (key, value) VALUES (?, ?) "
+            "ON CONFLICT(key) DO UPDATE SET value = value + excluded.value",
+            (key, delta),
+        )
+
+    def add(self, ids: list[str], texts: list[str], metadatas: list[dict | None] | None = None) -> int:
+        """
+        Index new chunks, recording the filter fields of ``metadatas`` when
+        given. Ids already present are skipped. Returns count added.
+        """
+        added = 0
+        with self._lock, self._conn:
+            for chunk_id, text, metadata in zip(ids, texts, metadatas or [None] * len(ids)):
+                tokens = tokenize(text)
+                cur = self._conn.execute(
+                    "INSERT OR IGNORE INTO chunks (chunk_id, length) VALUES (?, ?)",
+                    (chunk_id, len(tokens)),
+                )
+                if cur.rowcount == 0:
+                    continue
+                tf = Counter(tokens)
+                self._conn.executemany(
+                    "INSERT INTO postings (term, chunk_id, tf) VALUES (?, ?, ?)",
+                    [(term, chunk_id, count) for term, count in tf.items()],
+                )
+                self._conn.executemany(
+                    "INSERT INTO terms (term, df) VALUES (?, 1) "
+                    "ON CONFLICT(term) DO UPDATE SET df = df + 1",
+                    [(term,) for term in tf],
+                )
+                if metadata:
+                    self._conn.execute(
+                        "INSERT OR REPLACE INTO chunk_meta (chunk_id, filename, page, ingested_at) "
+                        "VALUES (?, ?, ?, ?)",
+                        (chunk_id, metadata.get("filename"), metadata.get("page"), metadata.get("ingested_at")),
+                    )
+                self._bump_stat("num_docs", 1)
+                self._bump_stat("total_length", len(tokens))
+                added += 1
+        return added
+
+    def remove(self, ids: list[str]) -> int:
+        """Drop chunks and their postings. Unknown ids are ignored. Returns count removed."""
+        removed = 0
+        with self._lock, self._conn:
+            for chunk_id in ids:
+                row = self._conn.execute(
+                    "SELECT length FROM chunks WHERE chunk_id = ?", (chunk_id,)
+                ).fetchone()
+                if row is None:
+                    continue
+                terms = [
+                    term for (term,) in self._conn.execute(
+                        "SELECT term FROM postings WHERE chunk_id = ?", (chunk_id,)
+                    )
+                ]
+                self._conn.executemany(
+                    "UPDATE terms SET df = df - 1 WHERE term = ?", [(t,) for t in terms]
+                )
+                self._conn.execute("DELETE FROM postings WHERE chunk_id = ?", (chunk_id,))
+                self._conn.execute("DELETE FROM chunks WHERE chunk_id = ?", (chunk_id,))
+                self._conn.execute("DELETE FROM chunk_meta WHERE chunk_id = ?", (chunk_id,))
+                self._bump_stat("num_docs", -1)
+                self._bump_stat("total_length", -row[0])
+                removed += 1
+            if removed:
+                self._conn.execute("DELETE FROM terms WHERE df <= 0")
+        return removed
+
+    def search(self, query: str, k: int, where: MetadataFilter | None = None) -> list[tuple[str, float]]:
+        """Return the top-k ``(chunk_id, score)`` pairs with a positive score."""
+        return self.search_many([query], k, where)[0]
+
+    def search_many(
+        self,
+        queries: list[str],
+        k: int,
+        where: MetadataFilter | None = None,
+    ) -> list[list[tuple[str, float]]]:
+        """
+        Score several queries in one pass: the postings of every distinct
+        term across the batch are read once and shared by all queries.
+        With ``where`` only the postings of matching chunks are read; IDF
+        and length normalization still use whole-corpus statistics, so a
+        chunk scores the same with or without a filter.
+        """
+        query_tfs = [Counter(tokenize(query)) for query in queries]
+        terms = set().union(*query_tfs) if query_tfs else set()
+        if not terms:
+            return [[] for _ in queries]
+
+        with self._lock:
+            num_docs = self._stat("num_docs")
+            if num_docs == 0:
+                return [[] for _ in queries]
+            avgdl = self._stat("total_length") / num_docs
+            scope, scope_params = "", []
+            if where:
+                clause, scope_params = where.sql(FILTER_COLUMNS)
+                scope = f" AND p.chunk_id IN (SELECT chunk_id FROM chunk_meta WHERE {clause})"
+
+            # term -> [(chunk_id, bm25 term weight)]
+            weighted: dict[str, list[tuple[str, float]]] = {}
+            for term in terms:
+                row = self._conn.execute("SELECT df FROM terms WHERE term = ?", (term,)).fetchone()
+                if not row:
+                    continue
+                df = row[0]
+                idf = math.log(1.0 + (num_docs - df + 0.5) / (df + 0.5))
+                rows = self._conn.execute(
+                    "SELECT p.chunk_id, p.tf, c.length FROM postings p "
+                    "JOIN chunks c ON c.chunk_id = p.chunk_id WHERE p.term = ?" + scope,
+                    (term, *scope_params),
+                )
+                weighted[term] = [
+                    (chunk_id, idf * tf * (self.k1 + 1) / (tf + self.k1 * (1 - self.b + self.b * length / avgdl)))
+                    for chunk_id, tf, length in rows
+                ]
+
+        results = []
+        for query_tf in query_tfs:
+            scores: dict[str, float] = {}
+            for term, qtf in query_tf.items():
+                for chunk_id, weight in weighted.get(term, ()):
+                    scores[chunk_id] = scores.get(chunk_id, 0.0) + qtf * weight
+            top = heapq.nlargest(k, scores.items(), key=lambda item: item[1])
+            results.append([(chunk_id, score) for chunk_id, score in top if score > 0])
+        return results
+
+    def count(self) -> int:
+        """Number of indexed chunks."""
+        with self._lock:
+            return self._stat("num_docs")
+
+    def clear(self) -> None:
+        """Drop every posting and statistic."""
+        with self._lock, self._conn:
+            for table in ("chunks", "postings", "terms", "chunk_meta", "stats"):
+                self._conn.execute(f"DELETE FROM {table}")
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
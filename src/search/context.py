@@ -0,0 +1,148 @@
+"""Token-budgeted assembly of the LLM context from retrieved chunks.
+
+Chunks are split with ``chunk_overlap`` characters of shared text, so
+neighbouring hits from one page repeat themselves when joined verbatim.
+``pack_context`` groups the ranked chunks by file and page, stitches the
+chunks of a page into one passage in reading order with the repeated
+spans removed, and admits chunks in fused-rank order while the packed
+context fits ``settings.context_token_budget``. Tokens are estimated with
+the same ~4 characters per token rule as the embedding rate limiter.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+from langchain_core.documents import Document
+
+from src.config import settings
+from src.ingestion.rate_limit import estimate_tokens
+
+# Shortest shared span treated as chunk overlap rather than coincidence
+MIN_OVERLAP = 16
+GAP = "\n[…]\n"
+
+
+@dataclass
+class PackedContext:
+    """The context string and what went into it."""
+
+    text: str
+    # Chunks included, in fused-rank order
+    documents: list[Document]
+    tokens: int
+    # Estimated tokens of joining every retrieved chunk verbatim
+    verbatim_tokens: int
+    dropped_chunks: int = 0
+
+    @property
+    def tokens_saved(self) -> int:
+        return max(0, self.verbatim_tokens - self.tokens)
+
+    def usage(self) -> dict[str, int]:
+        return {
+            "sent": self.tokens,
+            "saved": self.tokens_saved,
+            "dropped_chunks": self.dropped_chunks,
+        }
+
+
+def _header(index: int, doc: Document) -> str:
+    return f"[Source {index}: {doc.metadata.get('filename', 'unknown')}, Page {doc.metadata.get('page', '?')}]"
+
+
+def format_verbatim(documents: list[Document]) -> str:
+    """Every chunk under its own source header, as retrieved."""
+    return "\n\n".join(f"{_header(i, doc)}\n{doc.page_content}" for i, doc in enumerate(documents, 1))
+
+
+def _page_key(doc: Document) -> tuple:
+    metadata = doc.metadata
+    return (metadata.get("source") or metadata.get("filename"), metadata.get("page"))
+
+
+def _position(doc: Document) -> int | None:
+    position = doc.metadata.get("chunk_id")
+    return position if isinstance(position, int) else None
+
+
+def overlap(text: str, following: str, min_overlap: int = MIN_OVERLAP) -> int:
+    """Length of the longest suffix of ``text`` that ``following`` starts with."""
+    if len(following) < min_overlap:
+        return 0
+    probe = following[:min_overlap]
+    start = text.find(probe, max(0, len(text) - len(following)))
+    while start != -1:
+        if following.startswith(text[start:]):
+            return len(text) - start
+        start = text.find(probe, start + 1)
+    return 0
+
+
+def stitch(chunks: list[Document]) -> str:
+    """
+    Join chunks of one page in reading order, dropping the span each
+    repeats from the one before it. Chunks that are neither overlapping
+    nor consecutive are separated by a gap marker.
+    """
+    chunks = sorted(chunks, key=lambda doc: (_position(doc) is None, _position(doc) or 0))
+    text = chunks[0].page_content
+    previous = _position(chunks[0])
+    for chunk in chunks[1:]:
+        piece = chunk.page_content
+        position = _position(chunk)
+        if piece not in text:
+            shared = overlap(text, piece)
+            if shared:
+                text += piece[shared:]
+            elif previous is not None and position == previous + 1:
+                text += " " + piece
+            else:
+                text += GAP + piece
+        previous = position
+    return text
+
+
+def _render(pages: dict[tuple, list[Document]]) -> str:
+    return "\n\n".join(
+        f"{_header(i, chunks[0])}\n{stitch(chunks)}" for i, chunks in enumerate(pages.values(), 1)
+    )
+
+
+def pack_context(documents: list[Document], budget: int | None = None) -> PackedContext:
+    """
+    Pack ranked ``documents`` into at most ``budget`` estimated tokens
+    (``settings.context_token_budget`` by default, 0 for no limit).
+
+    Chunks are considered best first; one that would overflow the budget
+    is skipped and later, cheaper ones (often an overlapping neighbour)
+    are still tried. The best chunk is always included. Pages appear in
+    the order of their best chunk.
+    """
+    budget = settings.context_token_budget if budget is None else budget
+    pages: dict[tuple, list[Document]] = {}
+    included: list[Document] = []
+    seen: set = set()
+    dropped = 0
+    text = ""
+    for doc in documents:
+        identity = doc.id or (_page_key(doc), doc.page_content)
+        if identity in seen:
+            continue
+        seen.add(identity)
+        key = _page_key(doc)
+        candidate = {**pages, key: pages.get(key, []) + [doc]}
+        candidate_text = _render(candidate)
+        if included and budget and estimate_tokens(candidate_text) > budget:
+            dropped += 1
+            continue
+        pages, text = candidate, candidate_text
+        included.append(doc)
+
+    return PackedContext(
+        text=text,
+        documents=included,
+        tokens=estimate_tokens(text) if text else 0,
+        verbatim_tokens=estimate_tokens(format_verbatim(documents)) if documents else 0,
+        dropped_chunks=dropped,
+    )
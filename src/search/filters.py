@@ -0,0 +1,73 @@
+"""Metadata filters for scoped retrieval.
+
+A ``MetadataFilter`` narrows a search to chunks of some files, a page
+range and an ingest-time window. It is pushed down rather than applied
+to results: the Chroma backend turns it into a ``where`` clause, the
+NumPy backend and the BM25 index into SQL over indexed filename, page
+and ``ingested_at`` columns, so a narrowly scoped query only scores the
+chunks that can match. Pages are the 0-based numbers stored in chunk
+metadata (as reported in ``sources``); ``ingested_at`` is a Unix time
+stamped on each chunk when it is first stored.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any
+
+
+@dataclass(frozen=True)
+class MetadataFilter:
+    """Conjunction of optional conditions; an empty filter matches everything."""
+
+    filenames: tuple[str, ...] | None = None
+    page_from: int | None = None
+    page_to: int | None = None
+    ingested_after: float | None = None
+    ingested_before: float | None = None
+
+    def __bool__(self) -> bool:
+        return any(value is not None for value in self.key())
+
+    def key(self) -> tuple:
+        """Hashable form for cache and coalescing keys."""
+        return (self.filenames, self.page_from, self.page_to, self.ingested_after, self.ingested_before)
+
+    def _conditions(self) -> list[tuple[str, str, Any]]:
+        """``(field, operator, value)`` triples; operators are Chroma's."""
+        conditions = []
+        if self.filenames is not None:
+            conditions.append(("filename", "$in", list(self.filenames)))
+        if self.page_from is not None:
+            conditions.append(("page", "$gte", self.page_from))
+        if self.page_to is not None:
+            conditions.append(("page", "$lte", self.page_to))
+        if self.ingested_after is not None:
+            conditions.append(("ingested_at", "$gte", self.ingested_after))
+        if self.ingested_before is not None:
+            conditions.append(("ingested_at", "$lt", self.ingested_before))
+        return conditions
+
+    def chroma_where(self) -> dict | None:
+        """The filter as a Chroma ``where`` clause, or ``None`` when empty."""
+        clauses = [{field: {op: value}} for field, op, value in self._conditions()]
+        if not clauses:
+            return None
+        return clauses[0] if len(clauses) == 1 else {"$and": clauses}
+
+    def sql(self, columns: dict[str, str]) -> tuple[str, list]:
+        """
+        The filter as an SQL condition and its parameters, with each field
+        read from the expression ``columns[field]``. Empty filters give "1".
+        """
+        operators = {"$gte": ">=", "$lte": "<=", "$lt": "<"}
+        parts: list[str] = []
+        params: list = []
+        for field, op, value in self._conditions():
+            if op == "$in":
+                parts.append(f"{columns[field]} IN ({','.join('?' * len(value))})")
+                params.extend(value)
+            else:
+                parts.append(f"{columns[field]} {operators[op]} ?")
+                params.append(value)
+        return (" AND ".join(parts) or "1"), params
@@ -1,87 +1,741 @@
 from __future__ import annotations
-"""Hybrid search: semantic (ChromaDB) + keyword (BM25) with RRF re-ranking."""
+"""Hybrid search: semantic (vector backend) + keyword (BM25) with RRF re-ranking."""
+
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, NamedTuple, Sequence, TypeVar
 
 import numpy as np
 from rank_bm25 import BM25Okapi
-from langchain.schema import Document
+from langchain_core.documents import Document
 
+from src.clients import registry
 from src.config import settings
-from src.ingestion.embedder import get_vector_store
+from src.ingestion.embedder import (
+    chunk_ids,
+    get_collection_version,
+    get_embeddings,
+    get_keyword_index,
+    get_vector_backend,
+)
+from src.metrics import record_stages
+from src.search.bm25_index import tokenize as _tokenize
+from src.search.filters import MetadataFilter
+from src.search.result_cache import Ranking
+from src.search.sharding import resolve_collections
+from src.search.vector_backend import VectorBackend
+
+T = TypeVar("T")
+
+# Shared pool so the semantic and keyword legs of a query run concurrently
+# without paying thread start-up on every request.
+_leg_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="hybrid-leg")
+# Legs fan out over the searched collections on their own pool, so a leg
+# waiting on its collections never holds a thread they need.
+_collection_executor = ThreadPoolExecutor(max_workers=16, thread_name_prefix="hybrid-collection")
+
+
+def _each(fn: Callable[[int], T], count: int) -> list[T]:
+    """``fn(i)`` for every collection index, concurrently when there are several."""
+    if count == 1:
+        return [fn(0)]
+    return list(_collection_executor.map(fn, range(count)))
+
+
+def semantic_search(query: str, k: int | None = None, collection: str | None = None) -> list[Document]:
+    """Pure vector similarity search via the configured vector backend."""
+    vector = get_embeddings().embed_query(query)
+    return _vector_search(get_vector_backend(collection), vector, k or settings.top_k)
+
 
+def _vector_search(backend, vector: list[float], k: int) -> list[Document]:
+    return [doc for doc, _ in backend.query([vector], k)[0]]
 
-def _tokenize(text: str) -> list[str]:
-    """Simple whitespace + lowercase tokenizer."""
-    return text.lower().split()
 
+def _vector_ranking(backend, vector: list[float], k: int, where: MetadataFilter | None = None) -> Ranking:
+    return backend.query_ids([vector], k, where)[0]
+
+
+def _fetch_documents(ids: list[str], collections: Sequence[str] | None = None) -> list[Document]:
+    """
+    Load chunks from the collections' vector stores, preserving the order
+    of ``ids``; each collection is only asked for the ids still missing.
+    """
+    if not ids:
+        return []
+    names = resolve_collections(collections)
+    if len(names) == 1:
+        return get_vector_backend(names[0]).get(ids)
+    found: dict[str, Document] = {}
+    for name in names:
+        missing = [chunk_id for chunk_id in ids if chunk_id not in found]
+        if not missing:
+            break
+        found.update((_doc_id(doc), doc) for doc in get_vector_backend(name).get(missing))
+    return [found[chunk_id] for chunk_id in ids if chunk_id in found]
+
+
+def _materialize(
+    ids: list[str],
+    known: dict[str, Document] | None = None,
+    collections: Sequence[str] | None = None,
+) -> list[Document]:
+    """
+    Documents for ``ids`` in order, taken from ``known`` where possible and
+    otherwise read with one lookup per collection; vanished chunks are skipped.
+    """
+    known = known or {}
+    missing = [chunk_id for chunk_id in ids if chunk_id not in known]
+    if missing:
+        known = {**known, **{doc.id: doc for doc in _fetch_documents(missing, collections)}}
+    return [known[chunk_id] for chunk_id in ids if chunk_id in known]
 
-def semantic_search(query: str, k: int | None = None) -> list[Document]:
-    """Pure vector similarity search via ChromaDB."""
-    store = get_vector_store()
-    return store.similarity_search(query, k=k or settings.top_k)
 
+def keyword_search(
+    query: str,
+    documents: list[Document] | None = None,
+    k: int | None = None,
+    collection: str | None = None,
+) -> list[Document]:
+    """
+    BM25 keyword search.
 
-def keyword_search(query: str, documents: list[Document], k: int | None = None) -> list[Document]:
-    """BM25 keyword search over a set of documents."""
+    With ``documents=None`` the persistent index of ``collection`` is
+    queried; otherwise a throwaway BM25 scorer is built over the given
+    documents.
+    """
     k = k or settings.top_k
+    if documents is None:
+        hits = get_keyword_index(collection).search(query, k)
+        return _fetch_documents([chunk_id for chunk_id, _ in hits], [collection] if collection else None)
+    return [documents[i] for i, _ in _bm25_rank(query, documents, k)]
+
+
+def _bm25_rank(query: str, documents: list[Document], k: int) -> list[tuple[int, float]]:
+    """Top-``k`` ``(index, score)`` pairs of ``documents`` with a positive BM25 score."""
     if not documents:
         return []
-
     corpus = [_tokenize(doc.page_content) for doc in documents]
     bm25 = BM25Okapi(corpus)
     scores = bm25.get_scores(_tokenize(query))
 
     # Get top-k indices
     top_indices = np.argsort(scores)[::-1][:k]
-    return [documents[i] for i in top_indices if scores[i] > 0]
+    return [(int(i), float(scores[i])) for i in top_indices if scores[i] > 0]
+
+
+def fuse_rankings(
+    rankings: list[Ranking],
+    k: int = 60,
+    weights: list[float] | None = None,
+) -> Ranking:
+    """
+    Weighted Reciprocal Rank Fusion of any number of ``(chunk id, score)``
+    lists: fused(id) = Σ weight_i / (k + rank_i) over the lists containing
+    id. Leg scores are ignored, only ranks count; ties keep first-seen
+    order, so the result depends only on the inputs.
+    """
+    if weights is None:
+        weights = [1.0] * len(rankings)
+    elif len(weights) != len(rankings):
+        raise ValueError(f"{len(weights)} weights for {len(rankings)} rankings")
+
+    scores: dict[str, float] = {}
+    for weight, ranking in zip(weights, rankings):
+        if not weight:
+            continue
+        for rank, (chunk_id, _) in enumerate(ranking, 1):
+            scores[chunk_id] = scores.get(chunk_id, 0.0) + weight / (k + rank)
+    return sorted(scores.items(), key=lambda item: item[1], reverse=True)
+
+
+def _doc_id(doc: Document) -> str:
+    """The document's chunk id, or the id it would be stored under."""
+    return doc.id or chunk_ids([doc])[0]
 
 
 def reciprocal_rank_fusion(
     result_lists: list[list[Document]],
     k: int = 60,
+    weights: list[float] | None = None,
 ) -> list[Document]:
     """
     Reciprocal Rank Fusion (RRF) to merge multiple ranked lists.
 
-    RRF score = Σ 1 / (k + rank_i) for each list where the doc appears.
-    Default k=60 as per the original paper (Cormack et al., 2009).
+    RRF score = Σ weight_i / (k + rank_i) for each list where the doc appears.
+    Default k=60 as per the original paper (Cormack et al., 2009). Documents
+    are matched by chunk id; those without one get the id they would be
+    stored under.
     """
-    scores: dict[str, float] = {}
-    doc_map: dict[str, Document] = {}
-
+    by_id: dict[str, Document] = {}
+    rankings = []
     for result_list in result_lists:
-        for rank, doc in enumerate(result_list):
-            # Use content hash as key for dedup across lists
-            doc_key = hash(doc.page_content)
-            doc_map[doc_key] = doc
-            scores[doc_key] = scores.get(doc_key, 0.0) + 1.0 / (k + rank + 1)
+        ranking = []
+        for doc in result_list:
+            chunk_id = _doc_id(doc)
+            by_id.setdefault(chunk_id, doc)
+            ranking.append((chunk_id, 0.0))
+        rankings.append(ranking)
+    return [by_id[chunk_id] for chunk_id, _ in fuse_rankings(rankings, k, weights)]
+
 
-    # Sort by fused score descending
-    sorted_keys = sorted(scores.keys(), key=lambda x: scores[x], reverse=True)
-    return [doc_map[k] for k in sorted_keys]
+def _elapsed_ms(start: float) -> float:
+    return round((time.perf_counter() - start) * 1000, 2)
 
 
-def hybrid_search(query: str, top_k: int | None = None, rerank_k: int | None = None) -> list[Document]:
+def hybrid_search(
+    query: str,
+    top_k: int | None = None,
+    rerank_k: int | None = None,
+    timings: dict[str, float] | None = None,
+    vector: list[float] | None = None,
+    collections: Sequence[str] | None = None,
+    filters: MetadataFilter | None = None,
+) -> list[Document]:
     """
     Full hybrid search pipeline:
-    1. Semantic search (ChromaDB embeddings)
-    2. Keyword search (BM25) over the semantic results' broader context
+    1. Semantic search (vector backend)
+    2. Keyword search (BM25) over the corpus index, or over the semantic
+       results' broader context when the index is empty
     3. RRF re-ranking to fuse both result sets
+
+    Fused rankings are cached per collection generation (see
+    ``result_cache``); a hit skips embedding and both legs and only
+    re-reads the winning chunks by id. The query is embedded once and the
+    vector backend is queried once at the widest k either leg needs. In
+    corpus mode the keyword leg runs concurrently with the semantic leg,
+    both legs return chunk ids only, and text is loaded for the
+    ``rerank_k`` winners alone. Per-stage wall times in
+    milliseconds are written into ``timings`` when a dict is supplied; a
+    cache hit records ``cache_ms`` instead of the per-leg stages. A
+    precomputed query ``vector`` skips the embedding step.
+
+    ``collections`` names the collections to search (the default
+    collection when omitted). Each leg queries them concurrently, and
+    their semantic and keyword rankings all enter the same fusion.
+    ``filters`` restricts both legs to matching chunks inside the vector
+    backend and the BM25 index rather than by filtering their results.
+    """
+    k = top_k or settings.top_k
+    final_k = rerank_k or settings.rerank_top_k
+    timings = timings if timings is not None else {}
+    started = time.perf_counter()
+    names = resolve_collections(collections)
+    where = filters or None
+
+    cache_key = _cache_key(query, k, final_k, names, where)
+    if cache_key is not None:
+        cached = _cached_results(cache_key, timings, started, names)
+        if cached is not None:
+            record_stages("search", timings)
+            return cached
+
+    backends, use_index = _open_collections(names)
+    pool_ks = [_pool_k(k, indexed) for indexed in use_index]
+
+    def semantic_leg() -> list[tuple[Ranking, list[Document] | None]]:
+        query_vector = vector
+        if query_vector is None:
+            t0 = time.perf_counter()
+            query_vector = get_embeddings().embed_query(query)
+            timings["embed_ms"] = _elapsed_ms(t0)
+        t0 = time.perf_counter()
+        results = _each(
+            lambda i: _semantic_ranking(backends[i], query_vector, pool_ks[i], use_index[i], where),
+            len(names),
+        )
+        timings["vector_ms"] = _elapsed_ms(t0)
+        return results
+
+    def keyword_leg(candidates: list[list[Document] | None]) -> list[Ranking]:
+        t0 = time.perf_counter()
+        results = _each(lambda i: _keyword_ranking(query, candidates[i], k, names[i], where), len(names))
+        timings["keyword_ms"] = _elapsed_ms(t0)
+        return results
+
+    # Steps 1 + 2: semantic and keyword legs
+    if all(use_index):
+        keyword_future = _leg_executor.submit(keyword_leg, [None] * len(names))
+        semantic = semantic_leg()
+        keyword = keyword_future.result()
+    else:
+        semantic = semantic_leg()
+        keyword = keyword_leg([candidates for _, candidates in semantic])
+
+    results = _fuse(
+        [ranking[:k] for ranking, _ in semantic], keyword, final_k, timings, started,
+        cache_key, _known(semantic), names,
+    )
+    record_stages("search", timings)
+    return results
+
+
+async def ahybrid_search(
+    query: str,
+    top_k: int | None = None,
+    rerank_k: int | None = None,
+    timings: dict[str, float] | None = None,
+    collections: Sequence[str] | None = None,
+    filters: MetadataFilter | None = None,
+    vector: list[float] | None = None,
+) -> list[Document]:
+    """
+    Async variant of ``hybrid_search`` for the API.
+
+    The query is embedded with the embeddings client's async path; opening
+    the clients, the vector query and BM25 scoring of every collection run
+    on the registry's bounded executor, so the event loop is never blocked.
+    A precomputed query ``vector`` skips the embedding step.
     """
     k = top_k or settings.top_k
     final_k = rerank_k or settings.rerank_top_k
+    timings = timings if timings is not None else {}
+    started = time.perf_counter()
+    loop = asyncio.get_running_loop()
+    executor = registry.executor()
+    names = resolve_collections(collections)
+    where = filters or None
+
+    cache_key = await loop.run_in_executor(executor, _cache_key, query, k, final_k, names, where)
+    if cache_key is not None:
+        cached = await loop.run_in_executor(
+            executor, _cached_results, cache_key, timings, started, names
+        )
+        if cached is not None:
+            record_stages("search", timings)
+            return cached
+
+    backends, use_index = await loop.run_in_executor(executor, _open_collections, names)
+    pool_ks = [_pool_k(k, indexed) for indexed in use_index]
+
+    async def semantic_leg() -> list[tuple[Ranking, list[Document] | None]]:
+        query_vector = vector
+        if query_vector is None:
+            t0 = time.perf_counter()
+            embeddings = await loop.run_in_executor(executor, get_embeddings)
+            query_vector = await embeddings.aembed_query(query)
+            timings["embed_ms"] = _elapsed_ms(t0)
+        t0 = time.perf_counter()
+        results = await asyncio.gather(*(
+            loop.run_in_executor(
+                executor, _semantic_ranking, backend, query_vector, pool_k, indexed, where
+            )
+            for backend, pool_k, indexed in zip(backends, pool_ks, use_index)
+        ))
+        timings["vector_ms"] = _elapsed_ms(t0)
+        return list(results)
+
+    async def keyword_leg(candidates: list[list[Document] | None]) -> list[Ranking]:
+        t0 = time.perf_counter()
+        results = await asyncio.gather(*(
+            loop.run_in_executor(executor, _keyword_ranking, query, docs, k, name, where)
+            for name, docs in zip(names, candidates)
+        ))
+        timings["keyword_ms"] = _elapsed_ms(t0)
+        return list(results)
+
+    if all(use_index):
+        semantic, keyword = await asyncio.gather(semantic_leg(), keyword_leg([None] * len(names)))
+    else:
+        semantic = await semantic_leg()
+        keyword = await keyword_leg([candidates for _, candidates in semantic])
+
+    results = await loop.run_in_executor(
+        executor, _fuse, [ranking[:k] for ranking, _ in semantic], keyword, final_k,
+        timings, started, cache_key, _known(semantic), names,
+    )
+    record_stages("search", timings)
+    return results
+
+
+def _open_collections(names: list[str]) -> tuple[list[VectorBackend], list[bool]]:
+    """
+    Vector backend of each collection and whether its keyword index is used.
+    Opening a backend may build it under the registry lock, so the async
+    path calls this on the executor.
+    """
+    backends = [get_vector_backend(name) for name in names]
+    return backends, [_use_keyword_index(name) for name in names]
+
 
-    # Step 1: Semantic search (cast a wide net)
-    semantic_results = semantic_search(query, k=k)
+def _pool_k(k: int, indexed: bool) -> int:
+    """Vector leg depth: wider where BM25 re-scores the candidates."""
+    return k if indexed else k * settings.keyword_pool_factor
 
-    if not semantic_results:
+
+def _known(semantic: list[tuple[Ranking, list[Document] | None]]) -> list[Document]:
+    """Documents the semantic leg already loaded, across collections."""
+    return [doc for _, docs in semantic if docs for doc in docs]
+
+
+def _semantic_ranking(
+    backend, vector: list[float], k: int, ids_only: bool, where: MetadataFilter | None = None
+) -> tuple[Ranking, list[Document] | None]:
+    """
+    The semantic leg's ``(chunk id, score)`` list, plus the documents
+    themselves when the keyword leg has to re-score them (``ids_only`` off).
+    """
+    if ids_only:
+        return _vector_ranking(backend, vector, k, where), None
+    hits = backend.query([vector], k, where)[0]
+    return [(_doc_id(doc), score) for doc, score in hits], [doc for doc, _ in hits]
+
+
+def _keyword_ranking(
+    query: str,
+    candidates: list[Document] | None,
+    k: int,
+    collection: str | None = None,
+    where: MetadataFilter | None = None,
+) -> Ranking:
+    """
+    BM25 over the collection's index (``candidates=None``), restricted to
+    chunks matching ``where``, or over the given, already filtered, chunks.
+    """
+    if candidates is None:
+        return get_keyword_index(collection).search(query, k, where)
+    return [(_doc_id(candidates[i]), score) for i, score in _bm25_rank(query, candidates, k)]
+
+
+def _use_keyword_index(collection: str | None = None) -> bool:
+    """Whether the keyword leg should query the collection's BM25 index."""
+    return settings.keyword_search_scope == "corpus" and get_keyword_index(collection).count() > 0
+
+
+def _cache_key(
+    query: str,
+    k: int,
+    final_k: int,
+    collections: tuple[str, ...],
+    where: MetadataFilter | None = None,
+) -> tuple | None:
+    """Retrieval cache key for the current generation, or ``None`` when disabled."""
+    if registry.retrieval_cache() is None:
+        return None
+    return registry.retrieval_cache().key(
+        query, k, final_k, get_collection_version(collections), _fusion_params(collections, where)
+    )
+
+
+def _fusion_params(collections: tuple[str, ...] = (), where: MetadataFilter | None = None) -> tuple:
+    """Settings, collections and filters besides k and final_k that change a ranking, for cache keys."""
+    return (
+        settings.keyword_search_scope,
+        settings.rrf_k,
+        settings.keyword_pool_factor,
+        *_leg_weights(),
+        *collections,
+        *((where.key(),) if where else ()),
+    )
+
+
+def _leg_weights(collections: int = 1) -> list[float]:
+    """RRF weights of the semantic legs, then the keyword legs, one per collection."""
+    return [settings.rrf_semantic_weight] * collections + [settings.rrf_keyword_weight] * collections
+
+
+def _cached_results(
+    cache_key: tuple,
+    timings: dict[str, float],
+    started: float,
+    collections: Sequence[str] | None = None,
+) -> list[Document] | None:
+    """Materialize a cached ranking, or ``None`` on a miss or a vanished chunk."""
+    t0 = time.perf_counter()
+    ranking = registry.retrieval_cache().get(cache_key)
+    if ranking is None:
+        return None
+    docs = _fetch_documents([chunk_id for chunk_id, _ in ranking], collections)
+    if len(docs) != len(ranking):
+        return None
+    timings["cache_ms"] = _elapsed_ms(t0)
+    timings["total_ms"] = _elapsed_ms(started)
+    return docs
+
+
+def _fuse(
+    semantic: list[Ranking],
+    keyword: list[Ranking],
+    final_k: int,
+    timings: dict[str, float],
+    started: float,
+    cache_key: tuple | None = None,
+    known: list[Document] | None = None,
+    collections: Sequence[str] | None = None,
+) -> list[Document]:
+    """
+    Step 3: weighted Reciprocal Rank Fusion of every collection's semantic
+    and keyword ``(chunk id, score)`` lists, truncated to ``final_k``. Only
+    the winners are materialized, from ``known`` documents or with one
+    lookup per collection. The ranking is stored under ``cache_key``.
+    """
+    if not any(semantic):
+        timings["total_ms"] = _elapsed_ms(started)
+        return []
+
+    t0 = time.perf_counter()
+    fused = fuse_rankings(semantic + keyword, settings.rrf_k, _leg_weights(len(semantic)))[:final_k]
+    timings["fusion_ms"] = _elapsed_ms(t0)
+
+    t0 = time.perf_counter()
+    docs = _materialize([chunk_id for chunk_id, _ in fused], _by_id(known), collections)
+    timings["fetch_ms"] = _elapsed_ms(t0)
+
+    if cache_key is not None and len(docs) == len(fused):
+        registry.retrieval_cache().put(cache_key, fused)
+    timings["total_ms"] = _elapsed_ms(started)
+    return docs
+
+
+def _by_id(docs: list[Document] | None) -> dict[str, Document]:
+    return {_doc_id(doc): doc for doc in docs} if docs else {}
+
+
+# -- Batch search --------------------------------------------------------------
+
+
+class SearchQuery(NamedTuple):
+    """One query of a batch, with optional per-query retrieval parameters."""
+
+    query: str
+    top_k: int | None = None
+    rerank_k: int | None = None
+    collections: Sequence[str] | None = None
+    filters: MetadataFilter | None = None
+
+
+class _BatchPlan(NamedTuple):
+    ks: list[tuple[int, int]]
+    collections: list[tuple[str, ...]]
+    filters: list[MetadataFilter | None]
+    cache_keys: list[tuple | None]
+    results: list[list[Document] | None]
+    misses: list[int]
+
+
+def _plan_batch(queries: list[SearchQuery]) -> _BatchPlan:
+    """Resolve parameters and serve whatever the retrieval cache already holds."""
+    ks = [(q.top_k or settings.top_k, q.rerank_k or settings.rerank_top_k) for q in queries]
+    collections = [resolve_collections(q.collections) for q in queries]
+    filters = [q.filters or None for q in queries]
+    cache = registry.retrieval_cache()
+    generations = {
+        names: get_collection_version(names) for names in set(collections)
+    } if cache is not None else {}
+    cache_keys = [
+        cache.key(q.query, k, final_k, generations[names], _fusion_params(names, where))
+        if cache is not None else None
+        for q, (k, final_k), names, where in zip(queries, ks, collections, filters)
+    ]
+    rankings = [cache.get(key) if key is not None else None for key in cache_keys]
+
+    # Materialize every cached ranking with a single id lookup per collection.
+    cached_ids = list(dict.fromkeys(
+        chunk_id for ranking in rankings if ranking for chunk_id, _ in ranking
+    ))
+    searched = list(dict.fromkeys(
+        name for names, ranking in zip(collections, rankings) if ranking for name in names
+    ))
+    by_id = {doc.id: doc for doc in _fetch_documents(cached_ids, searched)}
+    results: list[list[Document] | None] = []
+    for ranking in rankings:
+        if ranking is not None and all(chunk_id in by_id for chunk_id, _ in ranking):
+            results.append([by_id[chunk_id] for chunk_id, _ in ranking])
+        else:
+            results.append(None)
+    misses = [i for i, r in enumerate(results) if r is None]
+    return _BatchPlan(ks, collections, filters, cache_keys, results, misses)
+
+
+def _vector_search_many(
+    backend,
+    vectors: list[list[float]],
+    pool_ks: list[int],
+    ids_only: bool,
+    where: MetadataFilter | None = None,
+) -> list[tuple[Ranking, list[Document] | None]]:
+    """
+    Query the backend once for every vector; each result is cut to its own
+    k. Documents come back alongside the rankings unless ``ids_only``.
+    """
+    if not vectors:
         return []
+    if ids_only:
+        return [
+            (hits[:pool_k], None)
+            for hits, pool_k in zip(backend.query_ids(vectors, max(pool_ks), where), pool_ks)
+        ]
+    return [
+        ([(_doc_id(doc), score) for doc, score in hits[:pool_k]], [doc for doc, _ in hits[:pool_k]])
+        for hits, pool_k in zip(backend.query(vectors, max(pool_ks), where), pool_ks)
+    ]
+
+
+def _add_ms(timings: dict[str, float], stage: str, start: float) -> None:
+    timings[stage] = round(timings.get(stage, 0.0) + (time.perf_counter() - start) * 1000, 2)
+
+
+def _retrieve_batch(
+    queries: list[SearchQuery],
+    vectors: list[list[float]],
+    plan: _BatchPlan,
+    timings: dict[str, float],
+) -> None:
+    """
+    Run both legs for the planned misses and fill ``plan.results`` in
+    place. Queries searching the same collections with the same filters
+    are retrieved together; stage timings add up over those groups.
+    """
+    groups: dict[tuple[tuple[str, ...], MetadataFilter | None], list[int]] = {}
+    for position, i in enumerate(plan.misses):
+        groups.setdefault((plan.collections[i], plan.filters[i]), []).append(position)
+    for (names, where), positions in groups.items():
+        _retrieve_group(
+            queries, [vectors[p] for p in positions], [plan.misses[p] for p in positions],
+            names, where, plan, timings,
+        )
+
+
+def _retrieve_group(
+    queries: list[SearchQuery],
+    vectors: list[list[float]],
+    misses: list[int],
+    names: tuple[str, ...],
+    where: MetadataFilter | None,
+    plan: _BatchPlan,
+    timings: dict[str, float],
+) -> None:
+    backends = [get_vector_backend(name) for name in names]
+    use_index = [_use_keyword_index(name) for name in names]
+    ks = [plan.ks[i][0] for i in misses]
+    texts = [queries[i].query for i in misses]
+
+    def vector_leg() -> list[list[tuple[Ranking, list[Document] | None]]]:
+        # Per collection, then per query
+        t0 = time.perf_counter()
+        results = _each(
+            lambda c: _vector_search_many(
+                backends[c], vectors, [_pool_k(k, use_index[c]) for k in ks], use_index[c], where
+            ),
+            len(names),
+        )
+        _add_ms(timings, "vector_ms", t0)
+        return results
+
+    def keyword_leg(semantic: list[list[tuple[Ranking, list[Document] | None]]] | None) -> list[list[Ranking]]:
+        def one(c: int) -> list[Ranking]:
+            if use_index[c]:
+                # Corpus mode: one BM25 pass over the collection for the whole batch.
+                hits = get_keyword_index(names[c]).search_many(texts, max(ks), where)
+                return [per_query[:k] for per_query, k in zip(hits, ks)]
+            return [
+                _keyword_ranking(text, docs, k) if docs else []
+                for text, (_, docs), k in zip(texts, semantic[c], ks)
+            ]
+
+        t0 = time.perf_counter()
+        results = _each(one, len(names))
+        _add_ms(timings, "keyword_ms", t0)
+        return results
+
+    if all(use_index):
+        # The keyword pass runs alongside the vector query.
+        keyword_future = _leg_executor.submit(keyword_leg, None)
+        semantic = vector_leg()
+        keyword = keyword_future.result()
+    else:
+        semantic = vector_leg()
+        keyword = keyword_leg(semantic)
+
+    t0 = time.perf_counter()
+    weights = _leg_weights(len(names))
+    fused_per_query = []
+    for j, (i, k) in enumerate(zip(misses, ks)):
+        semantic_legs = [per_collection[j][0][:k] for per_collection in semantic]
+        keyword_legs = [per_collection[j] for per_collection in keyword]
+        fused_per_query.append(
+            fuse_rankings(semantic_legs + keyword_legs, settings.rrf_k, weights)[:plan.ks[i][1]]
+            if any(semantic_legs) else []
+        )
+    _add_ms(timings, "fusion_ms", t0)
+
+    # Materialize every query's winners with a single id lookup per collection.
+    t0 = time.perf_counter()
+    winners = list(dict.fromkeys(
+        chunk_id for fused in fused_per_query for chunk_id, _ in fused
+    ))
+    known = {
+        _doc_id(doc): doc
+        for per_collection in semantic for _, docs in per_collection if docs for doc in docs
+    }
+    by_id = _by_id(_materialize(winners, known, names))
+    _add_ms(timings, "fetch_ms", t0)
+
+    cache = registry.retrieval_cache()
+    for i, fused in zip(misses, fused_per_query):
+        docs = [by_id[chunk_id] for chunk_id, _ in fused if chunk_id in by_id]
+        key = plan.cache_keys[i]
+        if cache is not None and key is not None and fused and len(docs) == len(fused):
+            cache.put(key, fused)
+        plan.results[i] = docs
+
+
+def hybrid_search_batch(
+    queries: list[SearchQuery],
+    timings: dict[str, float] | None = None,
+    vectors: list[list[float]] | None = None,
+) -> list[list[Document]]:
+    """
+    ``hybrid_search`` for many queries at once, returning one result list
+    per query in input order.
+
+    Cached rankings are served first. The remaining queries are embedded
+    with one ``embed_documents`` call (unless ``vectors`` for every query
+    are supplied), sent to the vector backend as one multi-query request, and scored
+    against the keyword index in one pass. ``timings`` covers the batch.
+    """
+    timings = timings if timings is not None else {}
+    started = time.perf_counter()
+    plan = _plan_batch(queries)
+    if plan.misses:
+        t0 = time.perf_counter()
+        if vectors is None:
+            miss_vectors = get_embeddings().embed_documents(
+                [queries[i].query for i in plan.misses]
+            )
+        else:
+            miss_vectors = [vectors[i] for i in plan.misses]
+        timings["embed_ms"] = _elapsed_ms(t0)
+        _retrieve_batch(queries, miss_vectors, plan, timings)
+    timings["total_ms"] = _elapsed_ms(started)
+    record_stages("search_batch", timings)
+    return plan.results
 
-    # Step 2: BM25 keyword search over the same candidate pool
-    # We pull a larger set from the vector store and re-rank with BM25
-    all_candidates = semantic_search(query, k=k * 2)
-    keyword_results = keyword_search(query, all_candidates, k=k)
 
-    # Step 3: Reciprocal Rank Fusion
-    fused = reciprocal_rank_fusion([semantic_results, keyword_results])
+async def ahybrid_search_batch(
+    queries: list[SearchQuery],
+    timings: dict[str, float] | None = None,
+    vectors: list[list[float]] | None = None,
+) -> list[list[Document]]:
+    """Async variant of ``hybrid_search_batch``; blocking stages run on the executor."""
+    timings = timings if timings is not None else {}
+    started = time.perf_counter()
+    loop = asyncio.get_running_loop()
+    executor = registry.executor()
 
-    return fused[:final_k]
+    plan = await loop.run_in_executor(executor, _plan_batch, queries)
+    if plan.misses:
+        t0 = time.perf_counter()
+        if vectors is None:
+            embeddings = await loop.run_in_executor(executor, get_embeddings)
+            miss_vectors = await embeddings.aembed_documents(
+                [queries[i].query for i in plan.misses]
+            )
+        else:
+            miss_vectors = [vectors[i] for i in plan.misses]
+        timings["embed_ms"] = _elapsed_ms(t0)
+        await loop.run_in_executor(executor, _retrieve_batch, queries, miss_vectors, plan, timings)
+    timings["total_ms"] = _elapsed_ms(started)
+    record_stages("search_batch", timings)
+    return plan.results
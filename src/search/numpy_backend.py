@@ -0,0 +1,562 @@
+"""In-process vector backend over a memory-mapped NumPy matrix.
+
+Vectors are L2-normalized and appended to ``vectors.f32``, a headerless
+row-major float32 file that every process maps read-only, so opening the
+index costs nothing regardless of corpus size. Chunk text, metadata and
+tombstones live in a SQLite sidecar whose write transactions also
+serialize writers across processes; readers reload their view only when
+the stored epoch changes.
+
+Search is either exact (blocked matrix products over the whole map) or
+IVF: k-means centroids partition the rows into lists and a query scans
+only the ``nprobe`` lists nearest to it. Scores are cosine similarities.
+
+With a lossy ``Codec`` (float16, int8 or truncated dimensions) the scan
+runs over a compact copy of the matrix in ``codes-<codec>.bin`` and only
+a shortlist of ``k * rescore`` rows per query is rescored against the
+float32 rows, so the full-precision map is paged in for a few rows rather
+than streamed through memory. Codes are derived from ``vectors.f32``, so
+changing the codec rebuilds them on open without re-embedding.
+
+A query with a ``MetadataFilter`` selects the matching rows through
+expression indexes on the sidecar's filename, page and ``ingested_at``
+metadata and scores only those rows, exactly.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterator
+
+import numpy as np
+from langchain_core.documents import Document
+
+from src.search.compression import Codec
+from src.search.filters import MetadataFilter
+from src.search.vector_backend import VectorBackend
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS chunks (
+    row INTEGER PRIMARY KEY,
+    chunk_id TEXT NOT NULL,
+    text TEXT NOT NULL,
+    metadata TEXT,
+    deleted INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_chunks_id ON chunks (chunk_id);
+CREATE INDEX IF NOT EXISTS idx_chunks_file_page ON chunks (
+    json_extract(metadata, '$.filename'), json_extract(metadata, '$.page')
+);
+CREATE INDEX IF NOT EXISTS idx_chunks_ingested ON chunks (json_extract(metadata, '$.ingested_at'));
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+) WITHOUT ROWID;
+"""
+
+# Rows scored per matrix product in exact search; bounds temporary memory
+# to BLOCK_ROWS x queries floats.
+BLOCK_ROWS = 65_536
+KMEANS_ITERATIONS = 10
+# Metadata filter fields, read with the expressions the sidecar indexes
+FILTER_COLUMNS = {
+    field: f"json_extract(metadata, '$.{field}')" for field in ("filename", "page", "ingested_at")
+}
+# Training points sampled per centroid
+KMEANS_SAMPLE_PER_LIST = 64
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+def _merge_topk(
+    best_scores: np.ndarray,
+    best_rows: np.ndarray,
+    scores: np.ndarray,
+    rows: np.ndarray,
+    k: int,
+) -> tuple[np.ndarray, np.ndarray]:
+    """Keep the ``k`` highest of the current best and a new ``(queries, n)`` block."""
+    scores = np.concatenate([best_scores, scores], axis=1)
+    rows = np.concatenate([best_rows, np.broadcast_to(rows, (scores.shape[0], rows.shape[-1]))], axis=1)
+    if scores.shape[1] > k:
+        top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        scores = np.take_along_axis(scores, top, axis=1)
+        rows = np.take_along_axis(rows, top, axis=1)
+    return scores, rows
+
+
+def kmeans(points: np.ndarray, clusters: int, iterations: int = KMEANS_ITERATIONS, seed: int = 0) -> np.ndarray:
+    """Spherical k-means (cosine) returning L2-normalized centroids."""
+    rng = np.random.default_rng(seed)
+    clusters = min(clusters, len(points))
+    centroids = points[rng.choice(len(points), clusters, replace=False)].copy()
+    for _ in range(iterations):
+        assignment = np.argmax(points @ centroids.T, axis=1)
+        order = np.argsort(assignment, kind="stable")
+        counts = np.bincount(assignment, minlength=clusters)
+        sums = np.zeros_like(centroids)
+        used = counts > 0
+        sums[used] = np.add.reduceat(points[order], np.concatenate([[0], np.cumsum(counts)[:-1]])[used])
+        empty = ~used
+        # Re-seed empty clusters from random points so every list is used.
+        sums[empty] = points[rng.choice(len(points), int(empty.sum()))]
+        centroids = _normalize(sums)
+    return centroids
+
+
+@dataclass
+class _View:
+    """Read-only snapshot of the index at one epoch."""
+
+    epoch: str
+    rows: int
+    matrix: np.ndarray | None
+    live: np.ndarray
+    codes: np.ndarray | None = None
+    scales: np.ndarray | None = None
+    centroids: np.ndarray | None = None
+    order: np.ndarray | None = None
+    offsets: np.ndarray | None = None
+
+
+class NumpyBackend(VectorBackend):
+    """
+    Memory-mapped flat or IVF index. ``index="ivf"`` searches the
+    ``nprobe`` nearest of ``nlist`` k-means lists once ``optimize()`` has
+    trained them, and falls back to exact search before that. ``storage``
+    and ``dims`` select the first-pass ``Codec``; ``rescore`` sets the
+    shortlist size as a multiple of ``k``.
+    """
+
+    def __init__(
+        self,
+        path: str | Path,
+        index: str = "flat",
+        nlist: int = 0,
+        nprobe: int = 8,
+        storage: str = "float32",
+        dims: int = 0,
+        rescore: int = 4,
+    ):
+        if index not in ("flat", "ivf"):
+            raise ValueError(f"Unknown vector index {index!r}; expected 'flat' or 'ivf'")
+        self.path = Path(path)
+        self.path.mkdir(parents=True, exist_ok=True)
+        self.index = index
+        self.nlist = nlist
+        self.nprobe = nprobe
+        self.codec = Codec(storage, dims)
+        self.rescore = max(1, rescore)
+        self.vectors_path = self.path / "vectors.f32"
+        self.lists_path = self.path / "lists.i32"
+        self.centroids_path = self.path / "centroids.npy"
+        self.codes_path = self.path / f"codes-{self.codec.name}.bin"
+        self.scales_path = self.path / f"scales-{self.codec.name}.f32"
+        self._lock = threading.RLock()
+        # Autocommit mode: write transactions are opened explicitly with
+        # BEGIN IMMEDIATE so they also exclude writers in other processes.
+        self._conn = sqlite3.connect(str(self.path / "chunks.db"), check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(SCHEMA)
+        self._view: _View | None = None
+
+    # -- Metadata ------------------------------------------------------------
+
+    def _meta(self, key: str) -> str | None:
+        row = self._conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def _set_meta(self, key: str, value) -> None:
+        self._conn.execute(
+            "INSERT INTO meta (key, value) VALUES (?, ?) "
+            "ON CONFLICT(key) DO UPDATE SET value = excluded.value",
+            (key, str(value)),
+        )
+
+    def _bump_epoch(self) -> None:
+        self._set_meta("epoch", int(self._meta("epoch") or 0) + 1)
+
+    @property
+    def dim(self) -> int | None:
+        with self._lock:
+            value = self._meta("dim")
+        return int(value) if value else None
+
+    @contextmanager
+    def _write_transaction(self):
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+
+    # -- View ----------------------------------------------------------------
+
+    def _current_view(self) -> _View:
+        """Return the snapshot for the stored epoch, reloading it if stale."""
+        with self._lock:
+            epoch = self._meta("epoch") or "0"
+            if self._view is not None and self._view.epoch == epoch:
+                return self._view
+
+            (rows,) = self._conn.execute("SELECT COALESCE(MAX(row) + 1, 0) FROM chunks").fetchone()
+            dim = self.dim
+            matrix = None
+            if rows and dim:
+                matrix = np.memmap(self.vectors_path, dtype=np.float32, mode="r", shape=(rows, dim))
+            live = np.ones(rows, dtype=bool)
+            for (row,) in self._conn.execute("SELECT row FROM chunks WHERE deleted = 1"):
+                live[row] = False
+
+            view = _View(epoch=epoch, rows=rows, matrix=matrix, live=live)
+            if matrix is not None and not self.codec.exact:
+                view.codes, view.scales = self._load_codes(matrix)
+            if self.index == "ivf" and rows and self.centroids_path.exists():
+                lists = np.memmap(self.lists_path, dtype=np.int32, mode="r", shape=(rows,))
+            else:
+                lists = None
+            # Rows written before the lists were trained have no list; the
+            # view then stays exact until the next ``train()``.
+            if lists is not None and not (lists < 0).any():
+                view.centroids = np.load(self.centroids_path)
+                view.order = np.argsort(lists, kind="stable")
+                view.offsets = np.concatenate(
+                    [[0], np.cumsum(np.bincount(lists, minlength=len(view.centroids)))]
+                )
+            self._view = view
+            return view
+
+    def _load_codes(self, matrix: np.ndarray) -> tuple[np.ndarray, np.ndarray | None]:
+        """Map the coarse codes for every row of ``matrix``, encoding rows that have none yet."""
+        rows, dim = matrix.shape
+        width = self.codec.coarse_dim(dim)
+        row_bytes = width * np.dtype(self.codec.dtype).itemsize
+        int8 = self.codec.storage == "int8"
+
+        have = self.codes_path.stat().st_size // row_bytes if self.codes_path.exists() else 0
+        if int8:
+            have = min(have, self.scales_path.stat().st_size // 4 if self.scales_path.exists() else 0)
+        # Codes are a pure function of the rows, so concurrent catch-ups
+        # write identical bytes.
+        for start in range(have, rows, BLOCK_ROWS):
+            codes, scales = self.codec.encode(np.asarray(matrix[start:start + BLOCK_ROWS]))
+            self._write_rows(self.codes_path, start * row_bytes, codes.tobytes())
+            if int8:
+                self._write_rows(self.scales_path, start * 4, scales.tobytes())
+
+        codes = np.memmap(self.codes_path, dtype=self.codec.dtype, mode="r", shape=(rows, width))
+        scales = np.memmap(self.scales_path, dtype=np.float32, mode="r", shape=(rows,)) if int8 else None
+        return codes, scales
+
+    # -- Writes --------------------------------------------------------------
+
+    def _assign(self, vectors: np.ndarray) -> np.ndarray:
+        """Nearest-centroid list per row, or -1 when no IVF model is trained."""
+        if self.centroids_path.exists():
+            centroids = np.load(self.centroids_path)
+            return np.argmax(vectors @ centroids.T, axis=1).astype(np.int32)
+        return np.full(len(vectors), -1, dtype=np.int32)
+
+    def upsert(self, ids, vectors, texts, metadatas) -> None:
+        if not ids:
+            return
+        matrix = _normalize(np.asarray(vectors, dtype=np.float32))
+        with self._write_transaction():
+            dim = self.dim
+            if dim is None:
+                self._set_meta("dim", matrix.shape[1])
+            elif dim != matrix.shape[1]:
+                raise ValueError(f"Vector dimension {matrix.shape[1]} does not match index dimension {dim}")
+            if not self.codec.exact:
+                # Bring codes of existing rows up to date before appending.
+                self._current_view()
+            (start,) = self._conn.execute("SELECT COALESCE(MAX(row) + 1, 0) FROM chunks").fetchone()
+
+            self._conn.executemany(
+                "UPDATE chunks SET deleted = 1 WHERE chunk_id = ? AND deleted = 0",
+                [(chunk_id,) for chunk_id in ids],
+            )
+            self._conn.executemany(
+                "INSERT INTO chunks (row, chunk_id, text, metadata) VALUES (?, ?, ?, ?)",
+                [
+                    (start + i, chunk_id, text, json.dumps(metadata) if metadata else None)
+                    for i, (chunk_id, text, metadata) in enumerate(zip(ids, texts, metadatas))
+                ],
+            )
+            # Row data goes to the maps before the rows become visible on commit.
+            self._write_rows(self.vectors_path, start * matrix.shape[1] * 4, matrix.tobytes())
+            self._write_rows(self.lists_path, start * 4, self._assign(matrix).tobytes())
+            if not self.codec.exact:
+                codes, scales = self.codec.encode(matrix)
+                self._write_rows(self.codes_path, start * codes[0].nbytes, codes.tobytes())
+                if scales is not None:
+                    self._write_rows(self.scales_path, start * 4, scales.tobytes())
+            self._bump_epoch()
+
+    @staticmethod
+    def _write_rows(path: Path, offset: int, data: bytes) -> None:
+        with open(path, "r+b" if path.exists() else "wb") as f:
+            f.seek(offset)
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+
+    def delete(self, ids: list[str]) -> None:
+        if not ids:
+            return
+        with self._write_transaction():
+            self._conn.executemany(
+                "UPDATE chunks SET deleted = 1 WHERE chunk_id = ? AND deleted = 0",
+                [(chunk_id,) for chunk_id in ids],
+            )
+            self._bump_epoch()
+
+    def optimize(self) -> bool:
+        """
+        Train the IVF lists when in IVF mode and they are missing or the
+        corpus has doubled since training. Returns whether it retrained.
+        """
+        if self.index != "ivf":
+            return False
+        view = self._current_view()
+        live_rows = int(view.live.sum())
+        trained = int(self._meta("trained_rows") or 0)
+        if live_rows == 0 or (self.centroids_path.exists() and live_rows < 2 * trained):
+            return False
+        self.train()
+        return True
+
+    def train(self) -> None:
+        """(Re)build the k-means lists from a sample of live rows and reassign every row."""
+        with self._write_transaction():
+            self._view = None
+            view = self._current_view()
+            live_rows = np.flatnonzero(view.live)
+            if not len(live_rows):
+                return
+            nlist = self.nlist or max(1, int(np.sqrt(len(live_rows))))
+            rng = np.random.default_rng(0)
+            sample = np.sort(rng.choice(
+                live_rows, min(len(live_rows), nlist * KMEANS_SAMPLE_PER_LIST), replace=False
+            ))
+            centroids = kmeans(np.asarray(view.matrix[sample]), nlist)
+
+            tmp = self.centroids_path.with_suffix(".tmp.npy")
+            np.save(tmp, centroids)
+            os.replace(tmp, self.centroids_path)
+            lists = np.empty(view.rows, dtype=np.int32)
+            for start in range(0, view.rows, BLOCK_ROWS):
+                block = np.asarray(view.matrix[start:start + BLOCK_ROWS])
+                lists[start:start + BLOCK_ROWS] = np.argmax(block @ centroids.T, axis=1)
+            self._write_rows(self.lists_path, 0, lists.tobytes())
+            self._set_meta("trained_rows", len(live_rows))
+            self._bump_epoch()
+
+    # -- Reads ---------------------------------------------------------------
+
+    def _documents(self, rows: list[int]) -> dict[int, Document]:
+        found: dict[int, Document] = {}
+        with self._lock:
+            for start in range(0, len(rows), 500):
+                batch = rows[start:start + 500]
+                placeholders = ",".join("?" * len(batch))
+                for row, chunk_id, text, metadata in self._conn.execute(
+                    f"SELECT row, chunk_id, text, metadata FROM chunks WHERE row IN ({placeholders})",
+                    batch,
+                ):
+                    found[row] = Document(
+                        page_content=text,
+                        metadata=json.loads(metadata) if metadata else {},
+                        id=chunk_id,
+                    )
+        return found
+
+    def _chunk_ids(self, rows: list[int]) -> dict[int, str]:
+        found: dict[int, str] = {}
+        with self._lock:
+            for start in range(0, len(rows), 500):
+                batch = rows[start:start + 500]
+                placeholders = ",".join("?" * len(batch))
+                found.update(self._conn.execute(
+                    f"SELECT row, chunk_id FROM chunks WHERE row IN ({placeholders})", batch,
+                ))
+        return found
+
+    def _search_flat(self, view: _View, queries: np.ndarray, k: int) -> tuple[np.ndarray, np.ndarray]:
+        if self.codec.exact:
+            matrix, scales, prepared = view.matrix, None, queries
+        else:
+            # First pass over the codes for a shortlist; ``query`` rescores it.
+            matrix, scales, prepared = view.codes, view.scales, self.codec.prepare(queries)
+            k *= self.rescore
+        best_scores = np.full((len(queries), 0), -np.inf, dtype=np.float32)
+        best_rows = np.zeros((len(queries), 0), dtype=np.int64)
+        for start in range(0, view.rows, BLOCK_ROWS):
+            end = min(start + BLOCK_ROWS, view.rows)
+            scores = self.codec.score(
+                matrix[start:end], None if scales is None else scales[start:end], prepared
+            )
+            scores[:, ~view.live[start:end]] = -np.inf
+            best_scores, best_rows = _merge_topk(
+                best_scores, best_rows, scores, np.arange(start, end)[None, :], k
+            )
+        return best_scores, best_rows
+
+    def _rescore(self, view: _View, query: np.ndarray, rows: np.ndarray, k: int) -> tuple[np.ndarray, np.ndarray]:
+        """Exact top-``k`` of ``query`` among the sorted candidate ``rows``."""
+        return _merge_topk(
+            np.full((1, 0), -np.inf, dtype=np.float32),
+            np.zeros((1, 0), dtype=np.int64),
+            (np.asarray(view.matrix[rows]) @ query)[None, :],
+            rows[None, :],
+            k,
+        )
+
+    def _matching_rows(self, view: _View, where: MetadataFilter) -> np.ndarray:
+        """Sorted live rows of ``view`` whose metadata satisfies ``where``."""
+        clause, params = where.sql(FILTER_COLUMNS)
+        with self._lock:
+            found = self._conn.execute(
+                f"SELECT row FROM chunks WHERE deleted = 0 AND row < ? AND {clause} ORDER BY row",
+                [view.rows, *params],
+            ).fetchall()
+        return np.array([row for (row,) in found], dtype=np.int64)
+
+    def _search_rows(self, view: _View, queries: np.ndarray, rows: np.ndarray, k: int) -> tuple[np.ndarray, np.ndarray]:
+        """Exact top-``k`` of each query among the sorted candidate ``rows``."""
+        best_scores = np.full((len(queries), 0), -np.inf, dtype=np.float32)
+        best_rows = np.zeros((len(queries), 0), dtype=np.int64)
+        for start in range(0, len(rows), BLOCK_ROWS):
+            block = rows[start:start + BLOCK_ROWS]
+            scores = queries @ np.asarray(view.matrix[block]).T
+            best_scores, best_rows = _merge_topk(best_scores, best_rows, scores, block[None, :], k)
+        return best_scores, best_rows
+
+    def _search_ivf(self, view: _View, query: np.ndarray, k: int) -> tuple[np.ndarray, np.ndarray]:
+        probes = np.argsort(-(view.centroids @ query))[: self.nprobe]
+        rows = np.concatenate([view.order[view.offsets[p]:view.offsets[p + 1]] for p in probes])
+        rows = np.sort(rows[view.live[rows]])
+        shortlist = k * self.rescore
+        if not self.codec.exact and len(rows) > shortlist:
+            coarse = self.codec.score(
+                view.codes[rows],
+                None if view.scales is None else view.scales[rows],
+                self.codec.prepare(query[None, :]),
+            )[0]
+            rows = np.sort(rows[np.argpartition(-coarse, shortlist - 1)[:shortlist]])
+        return self._rescore(view, query, rows, k)
+
+    def _ranked_rows(self, vectors, k, where: MetadataFilter | None = None) -> list[list[tuple[int, float]]]:
+        """Top-``k`` ``(row, score)`` pairs for each query vector among rows matching ``where``, best first."""
+        view = self._current_view()
+        if view.matrix is None or k <= 0:
+            return [[] for _ in vectors]
+        queries = _normalize(np.asarray(vectors, dtype=np.float32))
+
+        if where:
+            # A filter usually leaves few rows: score them all at full
+            # precision instead of probing lists or scanning codes.
+            all_scores, all_rows = self._search_rows(view, queries, self._matching_rows(view, where), k)
+            scores, rows = list(all_scores), list(all_rows)
+        elif view.centroids is not None:
+            results = [self._search_ivf(view, q, k) for q in queries]
+            scores = [s[0] for s, _ in results]
+            rows = [r[0] for _, r in results]
+        else:
+            all_scores, all_rows = self._search_flat(view, queries, k)
+            scores, rows = list(all_scores), list(all_rows)
+            if not self.codec.exact:
+                results = [
+                    self._rescore(view, q, np.sort(r[np.isfinite(s)]), k)
+                    for q, s, r in zip(queries, scores, rows)
+                ]
+                scores = [s[0] for s, _ in results]
+                rows = [r[0] for _, r in results]
+
+        ranked = []
+        for query_scores, query_rows in zip(scores, rows):
+            order = np.argsort(-query_scores, kind="stable")
+            ranked.append([
+                (int(query_rows[i]), float(query_scores[i]))
+                for i in order if np.isfinite(query_scores[i])
+            ])
+        return ranked
+
+    def query(self, vectors, k, where=None) -> list[list[tuple[Document, float]]]:
+        if not vectors:
+            return []
+        ranked = self._ranked_rows(vectors, k, where)
+        docs = self._documents(sorted({row for hits in ranked for row, _ in hits}))
+        return [[(docs[row], score) for row, score in hits if row in docs] for hits in ranked]
+
+    def query_ids(self, vectors, k, where=None) -> list[list[tuple[str, float]]]:
+        if not vectors:
+            return []
+        ranked = self._ranked_rows(vectors, k, where)
+        ids = self._chunk_ids(sorted({row for hits in ranked for row, _ in hits}))
+        return [[(ids[row], score) for row, score in hits if row in ids] for hits in ranked]
+
+    def existing_ids(self, ids: list[str]) -> set[str]:
+        return {doc_id for doc_id, _ in self._live_rows(ids)}
+
+    def _live_rows(self, ids: list[str]) -> list[tuple[str, int]]:
+        found = []
+        unique = list(dict.fromkeys(ids))
+        with self._lock:
+            for start in range(0, len(unique), 500):
+                batch = unique[start:start + 500]
+                placeholders = ",".join("?" * len(batch))
+                found.extend(self._conn.execute(
+                    f"SELECT chunk_id, row FROM chunks WHERE deleted = 0 AND chunk_id IN ({placeholders})",
+                    batch,
+                ))
+        return found
+
+    def get(self, ids: list[str]) -> list[Document]:
+        rows = dict(self._live_rows(ids))
+        docs = self._documents(list(rows.values()))
+        return [docs[rows[i]] for i in ids if i in rows and rows[i] in docs]
+
+    def count(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM chunks WHERE deleted = 0").fetchone()[0]
+
+    def sample_vectors(self, n: int, seed: int = 0) -> np.ndarray:
+        view = self._current_view()
+        if view.matrix is None:
+            return np.zeros((0, self.dim or 0), dtype=np.float32)
+        live = np.flatnonzero(view.live)
+        rows = np.random.default_rng(seed).choice(live, min(n, len(live)), replace=False)
+        return np.asarray(view.matrix[np.sort(rows)])
+
+    def iter_texts(self, batch_size: int = 1000) -> Iterator[tuple[list[str], list[str]]]:
+        last = -1
+        while True:
+            with self._lock:
+                rows = self._conn.execute(
+                    "SELECT row, chunk_id, text FROM chunks WHERE deleted = 0 AND row > ? "
+                    "ORDER BY row LIMIT ?",
+                    (last, batch_size),
+                ).fetchall()
+            if not rows:
+                return
+            last = rows[-1][0]
+            yield [r[1] for r in rows], [r[2] for r in rows]
+
+    def close(self) -> None:
+        with self._lock:
+            self._view = None
+            self._conn.close()
@@ -1,12 +1,34 @@
 from __future__ import annotations
 """Question-answering chain with source attribution."""
 
-from langchain_openai import ChatOpenAI
-from langchain.prompts import ChatPromptTemplate
-from langchain.schema import Document
+import asyncio
+import threading
+import time
+from collections import OrderedDict
+from collections import deque
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import TYPE_CHECKING, AsyncIterator, Callable, Sequence, TypeVar
 
+import numpy as np
+from langchain_core.documents import Document
+
+from src.clients import registry
 from src.config import settings
-from src.search.hybrid import hybrid_search
+from src.ingestion.embedder import get_collection_version
+from src.metrics import record_context_usage, record_llm_usage, record_stages
+from src.search.context import PackedContext, pack_context
+from src.search.filters import MetadataFilter
+from src.search.hybrid import SearchQuery, ahybrid_search, ahybrid_search_batch, hybrid_search
+from src.search.result_cache import normalize_query as normalize_question
+from src.search.sharding import resolve_collections
+
+if TYPE_CHECKING:
+    from langchain_core.prompts import ChatPromptTemplate
+
+T = TypeVar("T")
+
+NO_RESULTS_ANSWER = "No relevant documents found. Please ingest some documents first."
 
 
 SYSTEM_PROMPT = """You are a precise document analyst. Answer questions based ONLY on the provided context.
@@ -18,76 +40,541 @@ Rules:
 - Use bullet points for multi-part answers
 - Never fabricate information not in the context"""
 
-QA_PROMPT = ChatPromptTemplate.from_messages([
-    ("system", SYSTEM_PROMPT),
-    ("human", """Context from documents:
+HUMAN_PROMPT = """Context from documents:
 ---
 {context}
 ---
 
 Question: {question}
 
-Answer based on the above context:"""),
-])
+Answer based on the above context:"""
+
+
+@lru_cache(maxsize=1)
+def qa_prompt() -> ChatPromptTemplate:
+    """The QA prompt, built on first use so importing this module stays cheap."""
+    from langchain_core.prompts import ChatPromptTemplate
+
+    return ChatPromptTemplate.from_messages([("system", SYSTEM_PROMPT), ("human", HUMAN_PROMPT)])
+
+
+@dataclass
+class _CachedAnswer:
+    result: dict
+    params: tuple
+    version: tuple
+    embedding: np.ndarray | None
+    created: float
+    latency_ms: float
+
+
+class AnswerCache:
+    """
+    Two-tier LRU cache of ``ask`` results.
+
+    The exact tier is keyed on the normalized question plus retrieval
+    parameters. The semantic tier matches a new question against cached
+    question embeddings with the same parameters and returns the best match
+    at or above ``similarity_threshold`` (cosine). Entries expire after
+    ``ttl_seconds`` and are ignored once the version of a collection they
+    were built from changes.
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: float, similarity_threshold: float):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.similarity_threshold = similarity_threshold
+        self._entries: OrderedDict[tuple, _CachedAnswer] = OrderedDict()
+        self._lock = threading.Lock()
+        self.exact_hits = 0
+        self.semantic_hits = 0
+        self.misses = 0
+        self.latency_saved_ms = 0.0
+
+    def _live(self, entry: _CachedAnswer, version: tuple, now: float) -> bool:
+        return entry.version == version and now - entry.created < self.ttl_seconds
+
+    def lookup(
+        self,
+        question: str,
+        params: tuple,
+        version: tuple,
+        embedding: list[float] | None = None,
+    ) -> tuple[dict, str] | None:
+        """Return ``(result, tier)`` for a live match, or ``None``."""
+        key = (normalize_question(question), params)
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and not self._live(entry, version, now):
+                del self._entries[key]
+                entry = None
+            tier = "exact"
+
+            if entry is None and embedding is not None:
+                candidates = [
+                    (k, e) for k, e in self._entries.items()
+                    if e.params == params and e.embedding is not None and self._live(e, version, now)
+                ]
+                if candidates:
+                    query = _unit(embedding)
+                    sims = np.stack([e.embedding for _, e in candidates]) @ query
+                    best = int(np.argmax(sims))
+                    if sims[best] >= self.similarity_threshold:
+                        key, entry = candidates[best]
+                        tier = "semantic"
+
+            if entry is None:
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            if tier == "exact":
+                self.exact_hits += 1
+            else:
+                self.semantic_hits += 1
+            self.latency_saved_ms += entry.latency_ms
+            return dict(entry.result), tier
+
+    def store(
+        self,
+        question: str,
+        params: tuple,
+        version: tuple,
+        result: dict,
+        latency_ms: float,
+        embedding: list[float] | None = None,
+    ) -> None:
+        key = (normalize_question(question), params)
+        entry = _CachedAnswer(
+            result=result,
+            params=params,
+            version=version,
+            embedding=_unit(embedding) if embedding is not None else None,
+            created=time.time(),
+            latency_ms=latency_ms,
+        )
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            if len(self._entries) > self.max_entries:
+                now = time.time()
+                # Other parameters may search collections whose version has not changed.
+                for stale in [
+                    k for k, e in self._entries.items()
+                    if (e.params == params or now - e.created >= self.ttl_seconds)
+                    and not self._live(e, version, now)
+                ]:
+                    del self._entries[stale]
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            hits = self.exact_hits + self.semantic_hits
+            lookups = hits + self.misses
+            return {
+                "exact_hits": self.exact_hits,
+                "semantic_hits": self.semantic_hits,
+                "misses": self.misses,
+                "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+                "latency_saved_ms": round(self.latency_saved_ms, 2),
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+            }
+
+
+def _unit(vector: list[float]) -> np.ndarray:
+    v = np.asarray(vector, dtype=np.float32)
+    norm = np.linalg.norm(v)
+    return v / norm if norm else v
+
+
+answer_cache = AnswerCache(
+    max_entries=settings.answer_cache_max_entries,
+    ttl_seconds=settings.answer_cache_ttl_seconds,
+    similarity_threshold=settings.answer_cache_similarity,
+)
 
 
 def format_context(documents: list[Document]) -> str:
-    """Format retrieved documents into a context string."""
-    parts = []
-    for i, doc in enumerate(documents, 1):
-        source = doc.metadata.get("filename", "unknown")
+    """Format retrieved documents into a context string (see ``pack_context``)."""
+    return pack_context(documents).text
+
+
+def _build_context(documents: list[Document], timings: dict[str, float]) -> PackedContext:
+    t0 = time.perf_counter()
+    packed = pack_context(documents)
+    timings["context_ms"] = _elapsed_ms(t0)
+    record_context_usage(packed.usage())
+    return packed
+
+
+def extract_sources(documents: list[Document]) -> list[dict]:
+    """Unique (filename, page) citations in retrieval order."""
+    sources = []
+    seen = set()
+    for doc in documents:
+        filename = doc.metadata.get("filename", "unknown")
         page = doc.metadata.get("page", "?")
-        parts.append(f"[Source {i}: {source}, Page {page}]\n{doc.page_content}")
-    return "\n\n".join(parts)
+        key = f"{filename}:{page}"
+        if key not in seen:
+            sources.append({"filename": filename, "page": page})
+            seen.add(key)
+    return sources
+
+
+def _no_results(timings: dict[str, float]) -> dict:
+    return {
+        "answer": NO_RESULTS_ANSWER,
+        "sources": [],
+        "num_sources": 0,
+        "timings_ms": timings,
+    }
+
+
+def _cache_params(
+    top_k: int | None,
+    rerank_k: int | None,
+    collections: Sequence[str] | None = None,
+    filters: MetadataFilter | None = None,
+) -> tuple:
+    """Retrieval parameters an answer depends on, for answer cache keys."""
+    return (
+        top_k or settings.top_k,
+        rerank_k or settings.rerank_top_k,
+        resolve_collections(collections),
+        filters.key() if filters else None,
+    )
+
+
+def _cache_versions(params: list[tuple]) -> list[tuple]:
+    """Collection versions for each ``_cache_params`` tuple, read once per set of collections."""
+    by_collections = {names: get_collection_version(names) for names in {p[2] for p in params}}
+    return [by_collections[p[2]] for p in params]
+
+
+def _cache_hit(result: dict, tier: str, started: float) -> dict:
+    result["cache_hit"] = tier
+    result["timings_ms"] = {"total_ms": round((time.perf_counter() - started) * 1000, 2)}
+    record_stages("ask", {"cache_hit_ms": result["timings_ms"]["total_ms"]})
+    return result
+
+
+def _elapsed_ms(started: float) -> float:
+    return round((time.perf_counter() - started) * 1000, 2)
+
+
+# Stages ``ask`` adds to the search stages in its ``timings``
+_ASK_STAGES = ("context_ms", "first_token_ms", "llm_ms", "total_ms")
+
+
+def _record_ask(timings: dict[str, float], started: float) -> None:
+    """Export the answer stages, with ``total_ms`` covering the whole call."""
+    record_stages("ask", {**timings, "total_ms": _elapsed_ms(started)}, keys=_ASK_STAGES)
 
 
 def ask(
     question: str,
     top_k: int | None = None,
     rerank_k: int | None = None,
+    collections: Sequence[str] | None = None,
+    filters: MetadataFilter | None = None,
 ) -> dict:
     """
     End-to-end RAG pipeline:
-    1. Hybrid search for relevant chunks
-    2. Format context with source attribution
-    3. Generate answer with GPT
+    1. Answer cache lookup (exact, then near-duplicate question)
+    2. Hybrid search for relevant chunks
+    3. Format context with source attribution
+    4. Generate answer with GPT
     """
+    started = time.perf_counter()
+    params = _cache_params(top_k, rerank_k, collections, filters)
+    version = embedding = None
+    if settings.answer_cache_enabled:
+        version = get_collection_version(collections)
+        if settings.answer_cache_semantic:
+            embedding = registry.embeddings().embed_query(question)
+        hit = answer_cache.lookup(question, params, version, embedding)
+        if hit:
+            return _cache_hit(*hit, started)
+
     # Retrieve
-    documents = hybrid_search(question, top_k=top_k, rerank_k=rerank_k)
+    timings: dict[str, float] = {}
+    documents = hybrid_search(
+        question, top_k=top_k, rerank_k=rerank_k, timings=timings, vector=embedding,
+        collections=collections, filters=filters,
+    )
 
     if not documents:
-        return {
-            "answer": "No relevant documents found. Please ingest some documents first.",
-            "sources": [],
-            "num_sources": 0,
-        }
+        return _no_results(timings)
 
     # Build context
-    context = format_context(documents)
+    packed = _build_context(documents, timings)
 
     # Generate
-    llm = ChatOpenAI(
-        model=settings.openai_model,
-        temperature=0.1,
-        openai_api_key=settings.openai_api_key,
+    chain = qa_prompt() | registry.chat_model()
+    t0 = time.perf_counter()
+    response = chain.invoke({"context": packed.text, "question": question})
+    timings["llm_ms"] = _elapsed_ms(t0)
+    record_llm_usage(response)
+    _record_ask(timings, started)
+
+    result = {
+        "answer": response.content,
+        "sources": extract_sources(packed.documents),
+        "num_sources": len(packed.documents),
+        "timings_ms": timings,
+        "context_tokens": packed.usage(),
+    }
+    if version is not None:
+        answer_cache.store(question, params, version, dict(result), _elapsed_ms(started), embedding)
+    return result
+
+
+async def _aclient(getter: Callable[..., T], *args) -> T:
+    """Resolve a client on the executor: it may still be warming up under the registry lock."""
+    return await asyncio.get_running_loop().run_in_executor(registry.executor(), getter, *args)
+
+
+async def _alookup(question: str, params: tuple, collections: Sequence[str] | None):
+    """Async cache lookup; returns ``(hit, version, embedding)``."""
+    if not settings.answer_cache_enabled:
+        return None, None, None
+    version = await _aclient(get_collection_version, collections)
+    embedding = None
+    if settings.answer_cache_semantic:
+        embeddings = await _aclient(registry.embeddings)
+        embedding = await embeddings.aembed_query(question)
+    return answer_cache.lookup(question, params, version, embedding), version, embedding
+
+
+async def aask(
+    question: str,
+    top_k: int | None = None,
+    rerank_k: int | None = None,
+    collections: Sequence[str] | None = None,
+    filters: MetadataFilter | None = None,
+) -> dict:
+    """Async variant of ``ask`` using async retrieval and ``chain.ainvoke``."""
+    started = time.perf_counter()
+    params = _cache_params(top_k, rerank_k, collections, filters)
+    hit, version, embedding = await _alookup(question, params, collections)
+    if hit:
+        return _cache_hit(*hit, started)
+
+    timings: dict[str, float] = {}
+    documents = await ahybrid_search(
+        question, top_k=top_k, rerank_k=rerank_k, timings=timings,
+        collections=collections, filters=filters, vector=embedding,
     )
 
-    chain = QA_PROMPT | llm
-    response = chain.invoke({"context": context, "question": question})
+    if not documents:
+        return _no_results(timings)
 
-    # Extract source info
-    sources = []
-    seen = set()
-    for doc in documents:
-        filename = doc.metadata.get("filename", "unknown")
-        page = doc.metadata.get("page", "?")
-        key = f"{filename}:{page}"
-        if key not in seen:
-            sources.append({"filename": filename, "page": page})
-            seen.add(key)
+    packed = _build_context(documents, timings)
 
-    return {
+    chain = qa_prompt() | await _aclient(registry.chat_model)
+    t0 = time.perf_counter()
+    response = await chain.ainvoke({"context": packed.text, "question": question})
+    timings["llm_ms"] = _elapsed_ms(t0)
+    record_llm_usage(response)
+    _record_ask(timings, started)
+
+    result = {
         "answer": response.content,
-        "sources": sources,
-        "num_sources": len(documents),
+        "sources": extract_sources(packed.documents),
+        "num_sources": len(packed.documents),
+        "timings_ms": timings,
+        "context_tokens": packed.usage(),
     }
+    if version is not None:
+        answer_cache.store(question, params, version, dict(result), _elapsed_ms(started), embedding)
+    return result
+
+
+async def astream_ask(
+    question: str,
+    top_k: int | None = None,
+    rerank_k: int | None = None,
+    collections: Sequence[str] | None = None,
+    filters: MetadataFilter | None = None,
+) -> AsyncIterator[tuple[str, dict]]:
+    """
+    Streaming variant of ``aask`` yielding ``(event, data)`` pairs:
+    ``sources`` once retrieval finishes, one ``token`` per LLM chunk, and
+    ``done`` with the final timings. A cached answer is sent as one token.
+    """
+    started = time.perf_counter()
+    params = _cache_params(top_k, rerank_k, collections, filters)
+    hit, version, embedding = await _alookup(question, params, collections)
+    if hit:
+        result = _cache_hit(*hit, started)
+        yield "sources", {"sources": result["sources"], "num_sources": result["num_sources"]}
+        yield "token", {"text": result["answer"]}
+        yield "done", {"timings_ms": result["timings_ms"], "cache_hit": result["cache_hit"]}
+        return
+
+    timings: dict[str, float] = {}
+    documents = await ahybrid_search(
+        question, top_k=top_k, rerank_k=rerank_k, timings=timings,
+        collections=collections, filters=filters, vector=embedding,
+    )
+
+    if not documents:
+        yield "sources", {"sources": [], "num_sources": 0}
+        yield "token", {"text": NO_RESULTS_ANSWER}
+        yield "done", {"timings_ms": timings}
+        return
+
+    packed = _build_context(documents, timings)
+    sources = extract_sources(packed.documents)
+    yield "sources", {"sources": sources, "num_sources": len(packed.documents)}
+
+    chain = qa_prompt() | await _aclient(registry.chat_model)
+    t0 = time.perf_counter()
+    parts: list[str] = []
+    async for chunk in chain.astream({"context": packed.text, "question": question}):
+        # Token usage arrives on a final chunk with no content.
+        record_llm_usage(chunk)
+        if not chunk.content:
+            continue
+        if not parts:
+            timings["first_token_ms"] = _elapsed_ms(t0)
+        parts.append(chunk.content)
+        yield "token", {"text": chunk.content}
+    timings["llm_ms"] = _elapsed_ms(t0)
+    _record_ask(timings, started)
+
+    if version is not None:
+        answer_cache.store(
+            question,
+            params,
+            version,
+            {
+                "answer": "".join(parts),
+                "sources": sources,
+                "num_sources": len(packed.documents),
+                "timings_ms": dict(timings),
+                "context_tokens": packed.usage(),
+            },
+            _elapsed_ms(started),
+            embedding,
+        )
+    yield "done", {"timings_ms": timings, "context_tokens": packed.usage()}
+
+
+async def abatch_ask(
+    queries: list[SearchQuery],
+    concurrency: int | None = None,
+) -> AsyncIterator[dict]:
+    """
+    Answer many questions, yielding one result per question in input order.
+
+    Questions are processed in slices of ``settings.batch_chunk_size``: each
+    slice is embedded with one call whose vectors serve both the answer
+    cache lookup and ``ahybrid_search_batch``, then its LLM calls start,
+    with at most ``concurrency`` generations in flight across the batch.
+    Results are yielded as soon as every earlier one is ready; a failed
+    question yields ``{"error": ...}`` instead of aborting the batch.
+    """
+    loop = asyncio.get_running_loop()
+    semaphore = asyncio.Semaphore(max(1, concurrency or settings.batch_llm_concurrency))
+    chain = qa_prompt() | await _aclient(registry.chat_model)
+
+    async def answer(
+        query: SearchQuery,
+        documents: list[Document],
+        timings: dict,
+        started: float,
+        embedding,
+        params: tuple,
+        version: tuple | None,
+    ):
+        if not documents:
+            return _no_results(dict(timings))
+        packed = pack_context(documents)
+        record_context_usage(packed.usage())
+        async with semaphore:
+            t0 = time.perf_counter()
+            response = await chain.ainvoke({"context": packed.text, "question": query.query})
+        result = {
+            "answer": response.content,
+            "sources": extract_sources(packed.documents),
+            "num_sources": len(packed.documents),
+            "timings_ms": {**timings, "llm_ms": _elapsed_ms(t0)},
+            "context_tokens": packed.usage(),
+        }
+        record_llm_usage(response)
+        record_stages("ask", result["timings_ms"], keys=("llm_ms",))
+        if version is not None:
+            answer_cache.store(
+                query.query, params, version, dict(result), _elapsed_ms(started), embedding
+            )
+        return result
+
+    async def settled(future: asyncio.Future) -> dict:
+        try:
+            return await future
+        except Exception as e:
+            return {"error": str(e)}
+
+    def done_future(result: dict) -> asyncio.Future:
+        future = loop.create_future()
+        future.set_result(result)
+        return future
+
+    pending: deque[asyncio.Future] = deque()
+    size = max(1, settings.batch_chunk_size)
+    try:
+        for offset in range(0, len(queries), size):
+            batch = queries[offset:offset + size]
+            started = time.perf_counter()
+            try:
+                embeddings = await _aclient(registry.embeddings)
+                vectors = await embeddings.aembed_documents([q.query for q in batch])
+                params = [
+                    _cache_params(q.top_k, q.rerank_k, q.collections, q.filters) for q in batch
+                ]
+                versions = [None] * len(batch)
+                hits = [None] * len(batch)
+                if settings.answer_cache_enabled:
+                    versions = await _aclient(_cache_versions, params)
+                    hits = [
+                        answer_cache.lookup(
+                            q.query, p, version, vector if settings.answer_cache_semantic else None
+                        )
+                        for q, p, version, vector in zip(batch, params, versions, vectors)
+                    ]
+                misses = [i for i, hit in enumerate(hits) if hit is None]
+                timings: dict[str, float] = {}
+                documents = await ahybrid_search_batch(
+                    [batch[i] for i in misses], timings=timings, vectors=[vectors[i] for i in misses]
+                ) if misses else []
+            except Exception as e:
+                pending.extend(done_future({"error": str(e)}) for _ in batch)
+                continue
+
+            retrieved = dict(zip(misses, documents))
+            for i, (query, hit) in enumerate(zip(batch, hits)):
+                if hit is not None:
+                    pending.append(done_future(_cache_hit(*hit, started)))
+                else:
+                    pending.append(asyncio.ensure_future(
+                        answer(
+                            query, retrieved[i], timings, started, vectors[i],
+                            params[i], versions[i],
+                        )
+                    ))
+            while pending and pending[0].done():
+                yield await settled(pending.popleft())
+
+        while pending:
+            yield await settled(pending.popleft())
+    finally:
+        for future in pending:
+            future.cancel()
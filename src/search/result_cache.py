@@ -0,0 +1,200 @@
+"""Generation-versioned cache of fused hybrid search rankings.
+
+Entries are keyed by ``(normalized query, k, final_k, fusion settings,
+generation)`` where the generation holds the ``(collection, version)``
+pairs of the searched collections, each bumped by every ingest into that
+collection, so a ranking computed before an ingest can never be served
+after it, while rankings of other collections stay valid. Only the
+compact ranking — chunk ids and fused scores — is stored; documents are
+re-read from the vector store by id on a hit.
+
+The in-process tier is a bounded LRU. An optional SQLite tier can be
+shared by several API workers on the same host.
+"""
+
+from __future__ import annotations
+
+import json
+import sqlite3
+import threading
+from collections import OrderedDict
+from pathlib import Path
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS rankings (
+    key TEXT PRIMARY KEY,
+    scope TEXT NOT NULL,
+    generation INTEGER NOT NULL,
+    ranking TEXT NOT NULL,
+    last_used INTEGER NOT NULL
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_rankings_last_used ON rankings (last_used);
+CREATE INDEX IF NOT EXISTS idx_rankings_generation ON rankings (scope, generation);
+"""
+
+# Puts between exact recounts; other workers sharing the file change the
+# entry count without this one seeing it.
+RECOUNT_EVERY = 1000
+
+Ranking = list[tuple[str, float]]
+Generation = tuple[tuple[str, int], ...]
+
+
+def normalize_query(query: str) -> str:
+    """Case- and whitespace-insensitive form of a query used in cache keys."""
+    return " ".join(query.lower().split()).rstrip("?!. ")
+
+
+class _SharedTier:
+    """SQLite LRU of rankings shared across processes."""
+
+    def __init__(self, path: str | Path, max_entries: int):
+        self.path = Path(path)
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(rankings)")}
+        if columns and "scope" not in columns:
+            # Written before per-collection generations; it is only a cache.
+            self._conn.execute("DROP TABLE rankings")
+        self._conn.executescript(SCHEMA)
+        (clock,) = self._conn.execute("SELECT MAX(last_used) FROM rankings").fetchone()
+        self._clock = clock or 0
+        self._count = self._entry_count()
+        self._puts = 0
+
+    def _entry_count(self) -> int:
+        return self._conn.execute("SELECT COUNT(*) FROM rankings").fetchone()[0]
+
+    def get(self, key: str) -> Ranking | None:
+        with self._lock, self._conn:
+            row = self._conn.execute(
+                "SELECT ranking FROM rankings WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            self._clock += 1
+            self._conn.execute(
+                "UPDATE rankings SET last_used = ? WHERE key = ?", (self._clock, key)
+            )
+        return [(chunk_id, score) for chunk_id, score in json.loads(row[0])]
+
+    def put(self, key: str, generation: Generation, ranking: Ranking) -> None:
+        # Versions only grow, so while the searched collections stay the
+        # same a smaller sum means an older generation.
+        scope = json.dumps([name for name, _ in generation])
+        total = sum(version for _, version in generation)
+        with self._lock, self._conn:
+            self._clock += 1
+            row = (scope, total, json.dumps(ranking), self._clock, key)
+            inserted = self._conn.execute(
+                "INSERT OR IGNORE INTO rankings (scope, generation, ranking, last_used, key) "
+                "VALUES (?, ?, ?, ?, ?)",
+                row,
+            ).rowcount
+            if not inserted:
+                self._conn.execute(
+                    "UPDATE rankings SET scope = ?, generation = ?, ranking = ?, last_used = ? "
+                    "WHERE key = ?",
+                    row,
+                )
+            self._count += inserted
+            # Rankings from older generations can never be hit again.
+            self._count -= self._conn.execute(
+                "DELETE FROM rankings WHERE scope = ? AND generation < ?", (scope, total)
+            ).rowcount
+            self._puts += 1
+            if self._puts % RECOUNT_EVERY == 0:
+                self._count = self._entry_count()
+            overflow = self._count - self.max_entries
+            if overflow > 0:
+                self._count -= self._conn.execute(
+                    "DELETE FROM rankings WHERE key IN ("
+                    "SELECT key FROM rankings ORDER BY last_used LIMIT ?)",
+                    (overflow,),
+                ).rowcount
+
+    def count(self) -> int:
+        with self._lock:
+            return self._entry_count()
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class RetrievalCache:
+    """
+    Bounded LRU of ``hybrid_search`` rankings with an optional shared tier.
+
+    ``get`` consults memory first, then the shared tier (promoting hits into
+    memory); ``put`` writes through to both.
+    """
+
+    def __init__(self, max_entries: int = 5000, shared_path: str | Path | None = None):
+        self.max_entries = max_entries
+        self._entries: OrderedDict[tuple, Ranking] = OrderedDict()
+        self._lock = threading.Lock()
+        self._shared = _SharedTier(shared_path, max_entries) if shared_path else None
+        self.hits = 0
+        self.shared_hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(query: str, k: int, final_k: int, generation: Generation, fusion: tuple = ()) -> tuple:
+        # The generation stays last: the shared tier reads it from there.
+        return (normalize_query(query), k, final_k, tuple(fusion), generation)
+
+    def get(self, key: tuple) -> Ranking | None:
+        with self._lock:
+            ranking = self._entries.get(key)
+            if ranking is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return ranking
+
+        if self._shared is not None:
+            ranking = self._shared.get(json.dumps(key))
+            if ranking is not None:
+                with self._lock:
+                    self._remember(key, ranking)
+                    self.shared_hits += 1
+                return ranking
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def put(self, key: tuple, ranking: Ranking) -> None:
+        with self._lock:
+            self._remember(key, ranking)
+        if self._shared is not None:
+            self._shared.put(json.dumps(key), key[-1], ranking)
+
+    def _remember(self, key: tuple, ranking: Ranking) -> None:
+        self._entries[key] = ranking
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.shared_hits + self.misses
+            return {
+                "hits": self.hits,
+                "shared_hits": self.shared_hits,
+                "misses": self.misses,
+                "hit_rate": round((self.hits + self.shared_hits) / lookups, 4) if lookups else 0.0,
+                "entries": len(self._entries),
+                "shared_entries": self._shared.count() if self._shared is not None else None,
+                "max_entries": self.max_entries,
+            }
+
+    def close(self) -> None:
+        if self._shared is not None:
+            self._shared.close()
@@ -0,0 +1,141 @@
+"""Named collections and hash-sharded vector backends.
+
+A collection is an isolated corpus (per tenant, per document set) with
+its own vector index, keyword index and ingest manifest. With
+``settings.collection_shards`` above 1 its vectors are spread over that
+many shards, each an ordinary backend holding the chunks whose id hashes
+to it. ``ShardedBackend`` presents the shards as one ``VectorBackend``:
+writes and id lookups touch only the owning shards, in parallel, and a
+query asks every shard for its own top-k concurrently. Shards of a
+collection score with the same metric, so merging their lists by score
+yields the top-k of an unsharded index.
+"""
+
+from __future__ import annotations
+
+import heapq
+import re
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from itertools import chain
+from typing import Callable, Iterable, Iterator, TypeVar
+
+import numpy as np
+from langchain_core.documents import Document
+
+from src.config import settings
+from src.search.vector_backend import VectorBackend
+
+# 3-63 characters, usable as a Chroma collection name and a file name
+COLLECTION_NAME_PATTERN = r"^[A-Za-z0-9][A-Za-z0-9_-]{1,61}[A-Za-z0-9]$"
+
+T = TypeVar("T")
+
+
+def collection_name(name: str | None = None) -> str:
+    """``name``, or the default collection; raises ``ValueError`` for an invalid name."""
+    name = name or settings.default_collection
+    if not re.match(COLLECTION_NAME_PATTERN, name):
+        raise ValueError(
+            f"Invalid collection name {name!r}: use 3-63 letters, digits, '-' or '_', "
+            "starting and ending with a letter or digit"
+        )
+    return name
+
+
+def resolve_collections(names: Iterable[str] | None = None) -> tuple[str, ...]:
+    """Validated, de-duplicated collection names; the default collection when empty."""
+    resolved = tuple(dict.fromkeys(collection_name(name) for name in names or ()))
+    return resolved or (collection_name(),)
+
+
+def shard_names(name: str, shards: int) -> list[str]:
+    """
+    Storage names of a collection's shards. An unsharded collection keeps
+    its own name; the shard count is part of each shard's name, so a
+    collection re-created with another count starts from empty shards
+    instead of misrouting the chunks of the old layout.
+    """
+    if shards <= 1:
+        return [name]
+    return [f"{name}-shard{i}of{shards}" for i in range(shards)]
+
+
+def shard_of(chunk_id: str, shards: int) -> int:
+    """Shard holding ``chunk_id``: a stable hash of the id, so every process agrees."""
+    return zlib.crc32(chunk_id.encode()) % shards
+
+
+def merge_by_score(lists: list[list[tuple[T, float]]], k: int) -> list[tuple[T, float]]:
+    """The ``k`` best ``(item, score)`` pairs across lists that are each sorted best first."""
+    return list(heapq.merge(*lists, key=lambda hit: hit[1], reverse=True))[:k]
+
+
+class ShardedBackend(VectorBackend):
+    """Fan-out over per-shard backends, with chunks routed by ``shard_of``."""
+
+    def __init__(self, shards: list[VectorBackend], workers: int | None = None):
+        if not shards:
+            raise ValueError("ShardedBackend needs at least one shard")
+        self.shards = shards
+        self._executor = ThreadPoolExecutor(
+            max_workers=workers or 4 * len(shards), thread_name_prefix="shard"
+        )
+
+    def _map(self, fn: Callable[..., T], *args: Iterable) -> list[T]:
+        return list(self._executor.map(fn, *args))
+
+    def _route(self, ids: list[str], *columns: list) -> dict[int, tuple[list, ...]]:
+        """Split ``ids`` (and parallel ``columns``) by owning shard."""
+        routed: dict[int, tuple[list, ...]] = {}
+        for row in zip(ids, *columns):
+            parts = routed.setdefault(shard_of(row[0], len(self.shards)), tuple([] for _ in row))
+            for part, value in zip(parts, row):
+                part.append(value)
+        return routed
+
+    def upsert(self, ids, vectors, texts, metadatas) -> None:
+        routed = self._route(ids, vectors, texts, metadatas)
+        self._map(lambda shard: self.shards[shard].upsert(*routed[shard]), routed)
+
+    def existing_ids(self, ids: list[str]) -> set[str]:
+        routed = self._route(ids)
+        return set().union(*self._map(lambda shard: self.shards[shard].existing_ids(*routed[shard]), routed))
+
+    def get(self, ids: list[str]) -> list[Document]:
+        routed = self._route(ids)
+        found = self._map(lambda shard: self.shards[shard].get(*routed[shard]), routed)
+        by_id = {doc.id: doc for doc in chain.from_iterable(found)}
+        return [by_id[i] for i in ids if i in by_id]
+
+    def delete(self, ids: list[str]) -> None:
+        routed = self._route(ids)
+        self._map(lambda shard: self.shards[shard].delete(*routed[shard]), routed)
+
+    def query(self, vectors, k, where=None) -> list[list[tuple[Document, float]]]:
+        per_shard = self._map(lambda shard: shard.query(vectors, k, where), self.shards)
+        return [merge_by_score(list(hits), k) for hits in zip(*per_shard)]
+
+    def query_ids(self, vectors, k, where=None) -> list[list[tuple[str, float]]]:
+        per_shard = self._map(lambda shard: shard.query_ids(vectors, k, where), self.shards)
+        return [merge_by_score(list(hits), k) for hits in zip(*per_shard)]
+
+    def count(self) -> int:
+        return sum(self._map(lambda shard: shard.count(), self.shards))
+
+    def iter_texts(self, batch_size: int = 1000) -> Iterator[tuple[list[str], list[str]]]:
+        for shard in self.shards:
+            yield from shard.iter_texts(batch_size)
+
+    def sample_vectors(self, n: int) -> np.ndarray:
+        per_shard = -(-n // len(self.shards))
+        samples = [s for s in self._map(lambda shard: shard.sample_vectors(per_shard), self.shards) if len(s)]
+        return np.concatenate(samples)[:n] if samples else np.empty((0, 0), dtype=np.float32)
+
+    def optimize(self) -> bool:
+        return any(self._map(lambda shard: shard.optimize(), self.shards))
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=True)
+        for shard in self.shards:
+            shard.close()
@@ -0,0 +1,159 @@
+"""Vector index backends behind semantic search and ingestion.
+
+``VectorBackend`` is the narrow interface the rest of the system uses to
+store chunk vectors and run nearest-neighbour queries. ``ChromaBackend``
+talks to a Chroma collection directly (no LangChain wrapper);
+``NumpyBackend`` (see ``numpy_backend``) keeps vectors in a memory-mapped
+matrix inside the process. Scores are higher-is-better and only
+comparable within one backend. Queries take an optional
+``MetadataFilter`` that each backend applies inside its own index.
+"""
+
+from __future__ import annotations
+
+from abc import ABC, abstractmethod
+from typing import Iterator
+
+import numpy as np
+from langchain_core.documents import Document
+
+from src.search.filters import MetadataFilter
+
+
+class VectorBackend(ABC):
+    """Storage and k-NN search over chunk vectors keyed by chunk id."""
+
+    @abstractmethod
+    def upsert(
+        self,
+        ids: list[str],
+        vectors: list[list[float]],
+        texts: list[str],
+        metadatas: list[dict | None],
+    ) -> None:
+        """Insert or replace chunks."""
+
+    @abstractmethod
+    def existing_ids(self, ids: list[str]) -> set[str]:
+        """The subset of ``ids`` currently stored."""
+
+    @abstractmethod
+    def get(self, ids: list[str]) -> list[Document]:
+        """Load chunks by id, preserving the order of ``ids`` and skipping unknown ids."""
+
+    @abstractmethod
+    def delete(self, ids: list[str]) -> None:
+        """Remove chunks; unknown ids are ignored."""
+
+    @abstractmethod
+    def query(
+        self,
+        vectors: list[list[float]],
+        k: int,
+        where: MetadataFilter | None = None,
+    ) -> list[list[tuple[Document, float]]]:
+        """Top-``k`` ``(document, score)`` pairs for each query vector among chunks matching ``where``, best first."""
+
+    def query_ids(
+        self,
+        vectors: list[list[float]],
+        k: int,
+        where: MetadataFilter | None = None,
+    ) -> list[list[tuple[str, float]]]:
+        """``query`` returning ``(chunk id, score)`` pairs without loading text or metadata."""
+        return [[(doc.id, score) for doc, score in hits] for hits in self.query(vectors, k, where)]
+
+    @abstractmethod
+    def count(self) -> int:
+        """Number of stored chunks."""
+
+    @abstractmethod
+    def iter_texts(self, batch_size: int = 1000) -> Iterator[tuple[list[str], list[str]]]:
+        """Yield ``(ids, texts)`` batches covering every stored chunk."""
+
+    @abstractmethod
+    def sample_vectors(self, n: int) -> np.ndarray:
+        """Up to ``n`` stored vectors as a float32 ``(rows, dim)`` matrix."""
+
+    def optimize(self) -> bool:
+        """Rebuild derived search structures after bulk writes. Returns whether it did."""
+        return False
+
+    def close(self) -> None:
+        """Release files and connections held by the backend."""
+
+
+class ChromaBackend(VectorBackend):
+    """Backend over a raw ``chromadb`` collection."""
+
+    def __init__(self, collection):
+        self.collection = collection
+
+    def upsert(self, ids, vectors, texts, metadatas) -> None:
+        self.collection.upsert(ids=ids, embeddings=vectors, documents=texts, metadatas=metadatas)
+
+    def existing_ids(self, ids: list[str]) -> set[str]:
+        try:
+            return set(self.collection.get(ids=ids, include=[])["ids"])
+        except Exception:
+            return set()
+
+    def get(self, ids: list[str]) -> list[Document]:
+        if not ids:
+            return []
+        found = self.collection.get(ids=ids, include=["documents", "metadatas"])
+        by_id = {
+            chunk_id: Document(page_content=text, metadata=metadata or {}, id=chunk_id)
+            for chunk_id, text, metadata in zip(found["ids"], found["documents"], found["metadatas"])
+        }
+        return [by_id[i] for i in ids if i in by_id]
+
+    def delete(self, ids: list[str]) -> None:
+        if ids:
+            self.collection.delete(ids=ids)
+
+    def query(self, vectors, k, where=None) -> list[list[tuple[Document, float]]]:
+        if not vectors:
+            return []
+        found = self.collection.query(
+            query_embeddings=vectors,
+            n_results=k,
+            where=where.chroma_where() if where else None,
+            include=["documents", "metadatas", "distances"],
+        )
+        return [
+            [
+                (Document(page_content=text, metadata=metadata or {}, id=chunk_id), -distance)
+                for chunk_id, text, metadata, distance in zip(ids, texts, metadatas, distances)
+            ]
+            for ids, texts, metadatas, distances in zip(
+                found["ids"], found["documents"], found["metadatas"], found["distances"]
+            )
+        ]
+
+    def query_ids(self, vectors, k, where=None) -> list[list[tuple[str, float]]]:
+        if not vectors:
+            return []
+        found = self.collection.query(
+            query_embeddings=vectors,
+            n_results=k,
+            where=where.chroma_where() if where else None,
+            include=["distances"],
+        )
+        return [
+            [(chunk_id, -distance) for chunk_id, distance in zip(ids, distances)]
+            for ids, distances in zip(found["ids"], found["distances"])
+        ]
+
+    def count(self) -> int:
+        return self.collection.count()
+
+    def iter_texts(self, batch_size: int = 1000):
+        total = self.collection.count()
+        for offset in range(0, total, batch_size):
+            batch = self.collection.get(offset=offset, limit=batch_size, include=["documents"])
+            yield batch["ids"], batch["documents"]
+
+    def sample_vectors(self, n: int) -> np.ndarray:
+        found = self.collection.get(limit=n, include=["embeddings"])
+        return np.asarray(found["embeddings"], dtype=np.float32)
@@ -0,0 +1,30 @@
+"""Shared fixtures."""
+
+import pytest
+
+from src.clients import registry
+from src.config import settings
+from src.ingestion.jobs import close_job_manager
+
+STORES = {
+    "chroma_persist_dir": "chroma",
+    "vector_index_dir": "vectors",
+    "bm25_index_db": "bm25_index.db",
+    "embedding_cache_db": "embedding_cache.db",
+    "ingest_manifest_db": "ingest_manifest.db",
+    "retrieval_cache_db": "retrieval_cache.db",
+    "upload_dir": "uploads",
+    "jobs_db": "jobs.db",
+}
+
+
+@pytest.fixture
+def isolated_stores(tmp_path, monkeypatch):
+    """Point every on-disk store at ``tmp_path`` so the app never writes to ./data."""
+    for name, path in STORES.items():
+        monkeypatch.setattr(settings, name, str(tmp_path / path))
+    registry.shutdown()
+    close_job_manager()
+    yield tmp_path
+    registry.shutdown()
+    close_job_manager()
@@ -5,6 +5,8 @@ from fastapi.testclient import TestClient
 
 from src.api.server import app
 
+pytestmark = pytest.mark.usefixtures("isolated_stores")
+
 client = TestClient(app)
 
 
@@ -39,3 +41,223 @@ def test_upload_non_pdf():
         files={"file": ("test.txt", b"not a pdf", "text/plain")},
     )
     assert response.status_code == 400
+
+
+def test_health_stays_responsive_while_ask_in_flight():
+    """A slow LLM call must not block other requests on the event loop."""
+    import asyncio
+    import threading
+    import time
+    from unittest.mock import patch
+
+    from langchain.schema import Document
+    from langchain_core.messages import AIMessage
+    from langchain_core.runnables import RunnableLambda
+
+    from src.clients import registry
+
+    async def slow_llm(_):
+        await asyncio.sleep(1.0)
+        return AIMessage(content="slow answer")
+
+    async def fake_search(*args, **kwargs):
+        return [Document(page_content="ctx", metadata={"filename": "a.pdf", "page": 1})]
+
+    with TestClient(app) as live, \
+            patch("src.api.server.settings.openai_api_key", "test-key"), \
+            patch("src.search.qa.settings.answer_cache_enabled", False), \
+            patch("src.search.qa.ahybrid_search", fake_search):
+        registry.set(chat_model=RunnableLambda(lambda _: None, afunc=slow_llm))
+        answers = []
+        worker = threading.Thread(
+            target=lambda: answers.append(live.post("/ask", json={"question": "q"}))
+        )
+        worker.start()
+        time.sleep(0.2)
+        started = time.perf_counter()
+        assert live.get("/health").status_code == 200
+        assert time.perf_counter() - started < 0.5
+        worker.join()
+
+    assert answers[0].json()["answer"] == "slow answer"
+
+
+def test_ingest_returns_job_immediately(tmp_path):
+    from unittest.mock import patch
+
+    from src.ingestion.jobs import JobManager
+
+    manager = JobManager(tmp_path / "jobs.db")
+    with patch("src.api.server.get_job_manager", return_value=manager):
+        response = client.post("/ingest", json={"directory": "./docs"})
+        assert response.status_code == 202
+        job = response.json()
+        assert job["status"] == "queued"
+        assert job["files_total"] == 2
+
+        assert client.get(f"/jobs/{job['id']}").json()["id"] == job["id"]
+        assert client.get("/jobs").json()["jobs"][0]["id"] == job["id"]
+        assert client.get("/jobs/does-not-exist").status_code == 404
+    manager.close()
+
+
+def test_ask_stream_sends_sources_then_tokens():
+    from unittest.mock import patch
+
+    from langchain.schema import Document
+    from langchain_core.language_models.fake_chat_models import FakeListChatModel
+
+    from src.clients import registry
+
+    async def fake_search(*args, **kwargs):
+        return [Document(page_content="ctx", metadata={"filename": "a.pdf", "page": 2})]
+
+    registry.set(chat_model=FakeListChatModel(responses=["Attention is all you need"]))
+    try:
+        with patch("src.api.server.settings.openai_api_key", "test-key"), \
+                patch("src.search.qa.settings.answer_cache_enabled", False), \
+                patch("src.search.qa.ahybrid_search", fake_search):
+            response = client.post("/ask/stream", json={"question": "q"})
+    finally:
+        registry.shutdown()
+
+    assert response.headers["content-type"].startswith("text/event-stream")
+    events = [block.split("\n")[0].removeprefix("event: ") for block in response.text.strip().split("\n\n")]
+    assert events[0] == "sources"
+    assert events[-1] == "done"
+    assert events.count("token") > 1
+    assert '"filename": "a.pdf"' in response.text
+
+
+def test_ask_batch_streams_results_in_order():
+    import json
+    from unittest.mock import patch
+
+    from langchain.schema import Document
+    from langchain_core.language_models.fake_chat_models import FakeListChatModel
+
+    from src.clients import registry
+
+    class FakeEmbeddings:
+        async def aembed_documents(self, texts):
+            return [[float(len(t))] for t in texts]
+
+    async def fake_batch(queries, timings=None, vectors=None):
+        return [
+            [] if q.query == "empty" else [Document(page_content=q.query, metadata={"filename": "a.pdf", "page": 1})]
+            for q in queries
+        ]
+
+    registry.set(embeddings=FakeEmbeddings(), chat_model=FakeListChatModel(responses=["answer"]))
+    try:
+        with patch("src.api.server.settings.openai_api_key", "test-key"), \
+                patch("src.search.qa.settings.answer_cache_enabled", False), \
+                patch("src.search.qa.settings.batch_chunk_size", 2), \
+                patch("src.search.qa.ahybrid_search_batch", fake_batch):
+            response = client.post(
+                "/ask/batch",
+                json={"questions": [{"question": q} for q in ("a", "empty", "b")], "concurrency": 2},
+            )
+    finally:
+        registry.shutdown()
+
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert [line["index"] for line in lines] == [0, 1, 2]
+    assert lines[0]["answer"] == "answer"
+    assert lines[1]["num_sources"] == 0
+
+
+def test_metrics_and_server_timing():
+    response = client.get("/health")
+    assert response.headers["server-timing"].startswith("total;dur=")
+
+    metrics = client.get("/metrics")
+    assert metrics.status_code == 200
+    assert metrics.headers["content-type"].startswith("text/plain")
+    assert 'rag_http_request_duration_seconds_count{route="/health",status="200"}' in metrics.text
+    assert "# TYPE rag_stage_duration_seconds histogram" in metrics.text
+
+
+def test_identical_concurrent_asks_share_one_llm_call():
+    import asyncio
+    from unittest.mock import patch
+
+    import httpx
+    from langchain.schema import Document
+    from langchain_core.messages import AIMessage
+    from langchain_core.runnables import RunnableLambda
+
+    from src.clients import registry
+
+    calls = []
+
+    async def slow_llm(_):
+        calls.append(1)
+        await asyncio.sleep(0.2)
+        return AIMessage(content="shared answer")
+
+    async def fake_search(*args, **kwargs):
+        return [Document(page_content="ctx", metadata={"filename": "a.pdf", "page": 1})]
+
+    async def burst():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as live:
+            questions = ["What is RAG?"] * 4 + ["what is rag"] + ["Something else?"]
+            return await asyncio.gather(*(live.post("/ask", json={"question": q}) for q in questions))
+
+    registry.set(chat_model=RunnableLambda(lambda _: None, afunc=slow_llm))
+    try:
+        with patch("src.api.server.settings.openai_api_key", "test-key"), \
+                patch("src.search.qa.settings.answer_cache_enabled", False), \
+                patch("src.search.qa.ahybrid_search", fake_search):
+            responses = asyncio.run(burst())
+    finally:
+        registry.shutdown()
+
+    assert [r.status_code for r in responses] == [200] * 6
+    assert {r.json()["answer"] for r in responses} == {"shared answer"}
+    assert len(calls) == 2
+
+
+def test_health_stays_responsive_while_clients_warm_up(tmp_path):
+    """A request that needs a warming client waits off the event loop."""
+    import asyncio
+    import threading
+    import time
+    from unittest.mock import patch
+
+    import httpx
+
+    from benchmarks.suite import isolated
+    from src.clients import registry
+
+    building, release = threading.Event(), threading.Event()
+
+    def slow_warm_up():
+        # Hold the registry lock the way building a client does.
+        with registry._lock:
+            building.set()
+            release.wait(5)
+
+    async def main():
+        async with app.router.lifespan_context(app):
+            while not building.is_set():
+                await asyncio.sleep(0.01)
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://test") as live:
+                search = asyncio.ensure_future(live.post("/search", json={"question": "q"}))
+                started = time.perf_counter()
+                await asyncio.sleep(0.05)
+                health = await live.get("/health")
+                latency = time.perf_counter() - started
+                pending = not search.done()
+                release.set()
+                return health, latency, pending, await search
+
+    with isolated(tmp_path, backend="numpy"), patch.object(registry, "warm_up", slow_warm_up):
+        health, latency, pending, search = asyncio.run(main())
+
+    assert health.status_code == 200
+    assert latency < 0.5
+    assert pending
+    assert search.status_code == 200
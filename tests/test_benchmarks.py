@@ -0,0 +1,98 @@
+"""Tests for the offline benchmark suite."""
+
+import tempfile
+from pathlib import Path
+
+import numpy as np
+from langchain.schema import Document
+
+from benchmarks.compare import compare
+from benchmarks.corpus import synthetic_documents, synthetic_questions
+from benchmarks.fakes import FakeChatModel, HashEmbeddings
+from benchmarks.suite import isolated, run_suite
+from benchmarks.sweep import LabeledQuestion, load_labels, pareto_frontier, run_sweep, score
+from src.config import settings
+from src.ingestion.embedder import chunk_ids, ingest_documents
+from src.ingestion.loader import chunk_documents
+
+
+def test_fakes_are_deterministic_and_word_sensitive():
+    embeddings = HashEmbeddings(size=64)
+    a, b, c = embeddings.embed_documents(["kato rine mosa", "kato rine lusa", "vide pozeba"])
+    assert a == HashEmbeddings(size=64).embed_query("kato rine mosa")
+    assert np.dot(a, b) > np.dot(a, c)
+
+    reply = FakeChatModel(tokens=3).invoke("Context:\n---\nalpha beta gamma delta\n---\nQ?")
+    assert reply.content == "alpha beta gamma"
+
+
+def test_corpus_is_reproducible():
+    pages = synthetic_documents(files=2, pages_per_file=2, words_per_page=50, seed=3)
+    again = synthetic_documents(files=2, pages_per_file=2, words_per_page=50, seed=3)
+    assert [p.page_content for p in pages] == [p.page_content for p in again]
+    assert pages[3].metadata == {"source": "/synthetic/doc_0001.pdf", "page": 1}
+    assert synthetic_questions(pages, 5) == synthetic_questions(again, 5)
+
+
+def test_compare_flags_regressions_in_the_worse_direction():
+    def run(qps, p95):
+        return {"metrics": {
+            "qps": {"value": qps, "unit": "q/s", "better": "higher"},
+            "p95": {"value": p95, "unit": "ms", "better": "lower"},
+        }}
+
+    rows = {r["metric"]: r for r in compare(run(100, 10), run(85, 8), threshold=0.10)}
+    assert rows["qps"]["status"] == "regression"
+    assert rows["p95"]["status"] == "improved"
+    assert rows["p95"]["change"] > 0
+
+
+def test_tiny_run_is_isolated():
+    data_dir = settings.chroma_persist_dir
+    results = run_suite(scale="tiny", backend="numpy", log=lambda _: None)
+    assert settings.chroma_persist_dir == data_dir
+    assert results["metrics"]["ask.errors"]["value"] == 0
+    assert results["metrics"]["hybrid_search.p99_ms"]["better"] == "lower"
+    assert results["meta"]["chunks"] > 0
+    assert results["metrics"]["startup.first_request_ms"]["value"] > 0
+
+
+def test_sweep_scoring_and_frontier(tmp_path):
+    labels_file = tmp_path / "labels.jsonl"
+    labels_file.write_text(
+        '{"question": "q1", "relevant": ["c1", {"filename": "a.pdf", "page": 2}]}\n\n'
+    )
+    (label,) = load_labels(labels_file)
+    assert label == LabeledQuestion("q1", frozenset({"c1"}), frozenset({("a.pdf", "2")}))
+
+    results = [
+        Document(page_content="x", metadata={"filename": "b.pdf", "page": 0}, id="c9"),
+        Document(page_content="y", metadata={"filename": "a.pdf", "page": 2}, id="c7"),
+    ]
+    assert score(results, label) == (0.5, 0.5)
+
+    rows = [
+        {"name": "fast", "recall": 0.6, "mrr": 0.5, "p50_ms": 1.0},
+        {"name": "best", "recall": 0.9, "mrr": 0.8, "p50_ms": 5.0},
+        {"name": "dominated", "recall": 0.6, "mrr": 0.4, "p50_ms": 2.0},
+    ]
+    assert [r["name"] for r in pareto_frontier(rows)] == ["fast", "best"]
+
+
+def test_sweep_over_ingested_collection():
+    pages = synthetic_documents(files=3, pages_per_file=2, words_per_page=200, seed=1)
+    with tempfile.TemporaryDirectory() as workdir, isolated(Path(workdir), backend="numpy"):
+        chunks = chunk_documents(pages)
+        ingest_documents(chunks)
+        labels = [
+            LabeledQuestion(" ".join(chunk.page_content.split()[:12]), frozenset({chunk_id}), frozenset())
+            for chunk, chunk_id in list(zip(chunks, chunk_ids(chunks)))[::3]
+        ]
+        grid = {"top_k": [4, 8], "rerank_k": [3], "rrf_k": [60], "pool_factor": [1, 2]}
+        rows = run_sweep(labels, grid, ["corpus", "candidates"], log=lambda _: None)
+
+    assert len(rows) == 2 + 4
+    assert {row["scope"] for row in rows} == {"corpus", "candidates"}
+    assert all(0 <= row["recall"] <= 1 and row["p95_ms"] >= row["p50_ms"] for row in rows)
+    assert max(row["recall"] for row in rows) > 0.5
+    assert pareto_frontier(rows)
@@ -0,0 +1,56 @@
+"""Tests for the persistent BM25 keyword index."""
+
+import pytest
+
+from src.search.bm25_index import BM25Index
+
+
+@pytest.fixture
+def index(tmp_path):
+    idx = BM25Index(tmp_path / "bm25.db")
+    idx.add(
+        ["a", "b", "c"],
+        [
+            "Machine learning is a subset of artificial intelligence",
+            "Deep learning uses neural networks with many layers",
+            "Computer vision processes image and video data",
+        ],
+    )
+    yield idx
+    idx.close()
+
+
+def test_search_ranks_exact_terms(index):
+    hits = index.search("neural networks", k=5)
+    assert hits[0][0] == "b"
+    assert all(score > 0 for _, score in hits)
+
+
+def test_add_skips_existing_ids(index):
+    assert index.add(["a"], ["something else entirely"]) == 0
+    assert index.count() == 3
+
+
+def test_stats_persist_and_grow(tmp_path, index):
+    index.add(["d"], ["learning to rank"])
+    reopened = BM25Index(tmp_path / "bm25.db")
+    assert reopened.count() == 4
+    assert {chunk_id for chunk_id, _ in reopened.search("learning", k=10)} == {"a", "b", "d"}
+    reopened.close()
+
+
+def test_search_unknown_terms(index):
+    assert index.search("zebra", k=5) == []
+    assert index.search("", k=5) == []
+
+
+def test_remove_drops_postings_and_stats(index):
+    assert index.remove(["b", "missing"]) == 1
+    assert index.count() == 2
+    assert index.search("neural networks", k=5) == []
+    assert index.search("learning", k=5)[0][0] == "a"
+
+
+def test_search_many_matches_single_queries(index):
+    queries = ["learning", "image data", "nothing matches"]
+    assert index.search_many(queries, k=2) == [index.search(q, k=2) for q in queries]
@@ -0,0 +1,76 @@
+"""Tests for the shared client registry."""
+
+import os
+import subprocess
+import sys
+from pathlib import Path
+from unittest.mock import MagicMock
+
+import pytest
+from fastapi.testclient import TestClient
+
+from src.clients import ClientRegistry, registry
+from src.ingestion.embedder import get_embeddings, get_vector_store
+
+
+def test_injected_instances_are_shared():
+    embeddings, store = MagicMock(), MagicMock()
+    registry.set(embeddings=embeddings, vector_store=store)
+    try:
+        assert get_embeddings() is embeddings
+        assert get_vector_store() is store
+        assert get_vector_store() is get_vector_store()
+    finally:
+        registry.shutdown()
+
+
+def test_http_client_is_pooled_and_closed_on_shutdown():
+    reg = ClientRegistry()
+    client = reg.http_client()
+    assert reg.http_client() is client
+    reg.shutdown()
+    assert client.is_closed
+    assert reg.http_client() is not client
+    reg.shutdown()
+
+
+@pytest.mark.usefixtures("isolated_stores")
+def test_lifespan_builds_and_releases_clients():
+    from src.api.server import app
+
+    with TestClient(app) as client:
+        assert client.get("/health").status_code == 200
+        assert registry._keyword_indexes
+    assert not registry._keyword_indexes
+
+
+LAZY_IMPORT_PROBE = """
+import sys
+import ingest
+import src.api.server
+heavy = [m for m in ("chromadb", "langchain_openai", "langchain_chroma", "langchain_community") if m in sys.modules]
+assert not heavy, heavy
+from src.clients import registry
+ingest.run(ingest.build_parser().parse_args(["--stats", "."]))
+assert registry._embeddings is None and registry._chat_model is None
+assert "langchain_openai" not in sys.modules
+"""
+
+
+def test_entry_points_import_no_model_sdks(tmp_path):
+    env = {
+        **os.environ,
+        "OPENAI_API_KEY": "unused",
+        "VECTOR_BACKEND": "numpy",
+        "VECTOR_INDEX_DIR": str(tmp_path / "vectors"),
+        "CHROMA_PERSIST_DIR": str(tmp_path / "chroma"),
+        "BM25_INDEX_DB": str(tmp_path / "bm25.db"),
+        "EMBEDDING_CACHE_DB": str(tmp_path / "embedding_cache.db"),
+        "RETRIEVAL_CACHE_DB": str(tmp_path / "retrieval_cache.db"),
+    }
+    probe = subprocess.run(
+        [sys.executable, "-c", LAZY_IMPORT_PROBE],
+        cwd=Path(__file__).resolve().parent.parent, env=env, capture_output=True, text=True,
+    )
+    assert probe.returncode == 0, probe.stderr
+    assert "Documents: 0" in probe.stdout
@@ -0,0 +1,116 @@
+"""Tests for single-flight request coalescing."""
+
+import asyncio
+from unittest.mock import patch
+
+import pytest
+
+from src.api.coalesce import SingleFlight, request_key
+
+
+def test_request_key_normalizes_the_question():
+    assert request_key("/ask", "What is RAG?", 10, 5) == request_key("/ask", " what is  rag", 10, 5)
+    assert request_key("/ask", "What is RAG?", 10, 5) != request_key("/ask", "What is RAG?", 10, 3)
+
+
+def test_concurrent_calls_share_one_execution():
+    flights = SingleFlight()
+    calls = []
+
+    async def work():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return {"answer": len(calls)}
+
+    async def main():
+        results = await asyncio.gather(*(flights.call("k", work) for _ in range(5)))
+        other = await flights.call("other", work)
+        again = await flights.call("k", work)
+        return results, other, again
+
+    results, other, again = asyncio.run(main())
+    assert results == [{"answer": 1}] * 5
+    assert other == {"answer": 2} and again == {"answer": 3}
+    assert flights.in_flight() == 0
+
+
+def test_failures_reach_every_waiter_and_are_not_remembered():
+    flights = SingleFlight()
+    attempts = []
+
+    async def work():
+        attempts.append(1)
+        await asyncio.sleep(0.01)
+        if len(attempts) == 1:
+            raise RuntimeError("upstream down")
+        return "ok"
+
+    async def main():
+        first = await asyncio.gather(*(flights.call("k", work) for _ in range(3)), return_exceptions=True)
+        return first, await flights.call("k", work)
+
+    first, second = asyncio.run(main())
+    assert all(isinstance(e, RuntimeError) for e in first)
+    assert second == "ok"
+
+
+def test_followers_attach_to_the_leaders_stream():
+    flights = SingleFlight()
+    started = []
+
+    async def produce():
+        started.append(1)
+        for token in ("a", "b", "c", "d"):
+            await asyncio.sleep(0.02)
+            yield token
+
+    async def consume(delay):
+        await asyncio.sleep(delay)
+        return [item async for item in flights.stream("k", produce)]
+
+    async def main():
+        return await asyncio.gather(consume(0), consume(0.05))
+
+    leader, follower = asyncio.run(main())
+    assert leader == follower == ["a", "b", "c", "d"]
+    assert len(started) == 1
+
+
+def test_stream_stops_when_every_subscriber_leaves():
+    flights = SingleFlight()
+    produced = []
+
+    async def produce():
+        for token in range(100):
+            await asyncio.sleep(0.01)
+            produced.append(token)
+            yield token
+
+    async def main():
+        stream = flights.stream("k", produce)
+        assert await stream.__anext__() == 0
+        await stream.aclose()
+        await asyncio.sleep(0.05)
+        assert flights.in_flight() == 0
+        # A new request starts a fresh stream.
+        return [item async for item in flights.stream("k", produce)][:2]
+
+    assert asyncio.run(main()) == [0, 1]
+    assert len(produced) < 110
+
+
+@pytest.mark.parametrize("enabled, expected", [(True, 1), (False, 3)])
+def test_coalescing_can_be_disabled(enabled, expected):
+    flights = SingleFlight()
+    calls = []
+
+    async def work():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+
+    async def main():
+        await asyncio.gather(*(flights.call("k", work) for _ in range(3)))
+
+    with patch("src.api.coalesce.settings.request_coalescing", enabled):
+        asyncio.run(main())
+    assert len(calls) == expected
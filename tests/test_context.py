@@ -0,0 +1,59 @@
+"""Tests for token-budgeted context packing."""
+
+from langchain.schema import Document
+
+from src.ingestion.loader import chunk_documents
+from src.search.context import GAP, format_verbatim, overlap, pack_context, stitch
+
+PAGE_TEXT = " ".join(f"word{i % 97}x{i}" for i in range(700))
+
+
+def _chunks():
+    page = Document(page_content=PAGE_TEXT, metadata={"source": "/docs/a.pdf", "page": 2})
+    return chunk_documents([page], chunk_size=400, chunk_overlap=100)
+
+
+def test_overlap_finds_the_shared_span():
+    assert overlap("the quick brown fox jumps over", "fox jumps over the lazy dog", 5) == 14
+    assert overlap("abc", "xyz abc", 2) == 0
+
+
+def test_stitch_rebuilds_the_page_from_overlapping_chunks():
+    chunks = _chunks()
+    assert len(chunks) > 4
+    # Reading order comes from chunk positions, not retrieval order.
+    text = stitch([chunks[2], chunks[0], chunks[1]])
+    assert PAGE_TEXT.startswith(text)
+    assert len(text) < sum(len(c.page_content) for c in chunks[:3])
+
+    gapped = stitch([chunks[0], chunks[3]])
+    assert gapped == chunks[0].page_content + GAP + chunks[3].page_content
+
+
+def test_pack_merges_a_page_and_reports_savings():
+    chunks = _chunks()
+    other = Document(page_content="unrelated passage " * 5, metadata={"source": "/docs/b.pdf", "page": 0, "filename": "b.pdf"})
+    ranked = [chunks[1], other, chunks[0], chunks[1], chunks[2]]
+
+    packed = pack_context(ranked, budget=0)
+    assert packed.documents == [chunks[1], other, chunks[0], chunks[2]]
+    assert packed.text.count("[Source") == 2
+    assert packed.text.startswith("[Source 1: a.pdf, Page 2]")
+    assert packed.verbatim_tokens > packed.tokens
+    assert packed.usage() == {"sent": packed.tokens, "saved": packed.tokens_saved, "dropped_chunks": 0}
+
+
+def test_pack_fills_the_budget_greedily():
+    chunks = _chunks()
+    cheap = Document(page_content="short note", metadata={"filename": "c.pdf", "page": 1})
+    one = pack_context([chunks[0]], budget=0).tokens
+
+    packed = pack_context([chunks[0], chunks[4], cheap], budget=one + 10)
+    # The second chunk does not fit, the smaller one after it does.
+    assert packed.documents == [chunks[0], cheap]
+    assert packed.dropped_chunks == 1
+    assert packed.tokens <= one + 10
+
+    # The best chunk is kept even when it alone exceeds the budget.
+    assert pack_context([chunks[0]], budget=5).documents == [chunks[0]]
+    assert format_verbatim([]) == "" and pack_context([]).tokens == 0
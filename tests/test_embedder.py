@@ -0,0 +1,73 @@
+"""Tests for the batched, rate-limited ingestion writer."""
+
+import time
+from unittest.mock import MagicMock, patch
+
+import pytest
+from langchain.schema import Document
+
+from src.ingestion.embedder import ingest_documents
+from src.ingestion.rate_limit import RateLimiter
+from src.search.vector_backend import ChromaBackend
+
+
+@pytest.fixture
+def chunks():
+    return [
+        Document(page_content=f"chunk number {i}", metadata={"source": "/tmp/a.pdf", "page": i})
+        for i in range(10)
+    ]
+
+
+@pytest.fixture
+def fake_store():
+    collection = MagicMock()
+    collection.get.return_value = {"ids": []}
+    embeddings = MagicMock()
+    embeddings.embed_documents.side_effect = lambda texts: [[1.0, 0.0] for _ in texts]
+    index = MagicMock()
+    with patch("src.ingestion.embedder.get_vector_backend", return_value=ChromaBackend(collection)), \
+            patch("src.ingestion.embedder.get_embeddings", return_value=embeddings), \
+            patch("src.ingestion.embedder.get_keyword_index", return_value=index), \
+            patch("src.ingestion.embedder.registry.collection_version"), \
+            patch("src.ingestion.embedder.settings.ingest_batch_size", 3), \
+            patch("src.ingestion.embedder.settings.ingest_max_retries", 2):
+        yield collection, embeddings
+
+
+def test_batches_are_committed_individually(chunks, fake_store):
+    collection, _ = fake_store
+    stats = ingest_documents(chunks + chunks[:2])
+
+    assert collection.get.call_args.kwargs["include"] == []
+    assert collection.upsert.call_count == 4
+    assert stats["new_chunks"] == 10
+    assert stats["duplicates_skipped"] == 2
+    assert stats["failed_chunks"] == 0
+
+
+def test_failed_batch_does_not_lose_others(chunks, fake_store):
+    collection, embeddings = fake_store
+
+    def embed(texts):
+        if "chunk number 0" in texts:
+            raise RuntimeError("boom")
+        return [[1.0, 0.0] for _ in texts]
+
+    embeddings.embed_documents.side_effect = embed
+    with patch("tenacity.nap.time.sleep"):
+        stats = ingest_documents(chunks)
+
+    assert stats["new_chunks"] == 7
+    assert stats["failed_chunks"] == 3
+    assert stats["errors"] == ["boom"]
+    assert collection.upsert.call_count == 3
+
+
+def test_rate_limiter_blocks_when_budget_spent():
+    limiter = RateLimiter(requests_per_minute=600, tokens_per_minute=0)
+    for _ in range(600):
+        limiter.acquire()
+    started = time.monotonic()
+    limiter.acquire()
+    assert time.monotonic() - started >= 0.05
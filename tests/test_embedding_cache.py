@@ -0,0 +1,94 @@
+"""Tests for the content-addressed embedding cache."""
+
+from unittest.mock import MagicMock
+
+import pytest
+
+from src.ingestion.embedding_cache import CachedEmbeddings, EmbeddingCache, text_hash
+
+
+@pytest.fixture
+def cache(tmp_path):
+    c = EmbeddingCache(tmp_path / "cache.db", max_entries=3)
+    yield c
+    c.close()
+
+
+def _fake_model():
+    model = MagicMock()
+    model.embed_documents.side_effect = lambda texts: [[float(len(t)), 1.0] for t in texts]
+    model.embed_query.side_effect = lambda text: [float(len(text)), 2.0]
+    return model
+
+
+def test_only_misses_reach_the_model(cache):
+    model = _fake_model()
+    cached = CachedEmbeddings(model, cache, "m")
+
+    first = cached.embed_documents(["a", "bb", "a"])
+    second = cached.embed_documents(["bb", "ccc"])
+
+    assert first == [[1.0, 1.0], [2.0, 1.0], [1.0, 1.0]]
+    assert second == [[2.0, 1.0], [3.0, 1.0]]
+    assert model.embed_documents.call_args_list[0].args == (["a", "bb"],)
+    assert model.embed_documents.call_args_list[1].args == (["ccc"],)
+    assert cache.stats()["hits"] == 1
+
+
+def test_async_cache_work_runs_on_the_registry_executor(cache):
+    import asyncio
+    import threading
+    from concurrent.futures import ThreadPoolExecutor
+    from unittest.mock import AsyncMock, patch
+
+    model = _fake_model()
+    model.aembed_query = AsyncMock(return_value=[1.0, 2.0])
+    model.aembed_documents = AsyncMock(return_value=[[2.0, 1.0]])
+    threads = []
+    get_many, put_many = cache.get_many, cache.put_many
+    cache.get_many = lambda *args: threads.append(threading.current_thread().name) or get_many(*args)
+    cache.put_many = lambda *args: threads.append(threading.current_thread().name) or put_many(*args)
+    cached = CachedEmbeddings(model, cache, "m")
+
+    async def main():
+        await cached.aembed_query("q")
+        await cached.aembed_documents(["q", "bb"])
+
+    with ThreadPoolExecutor(thread_name_prefix="bounded") as executor, \
+            patch("src.ingestion.embedding_cache.registry.executor", return_value=executor):
+        asyncio.run(main())
+
+    assert len(threads) == 4
+    assert all(name.startswith("bounded") for name in threads)
+
+
+def test_query_cache_is_keyed_by_model(cache):
+    model = _fake_model()
+    CachedEmbeddings(model, cache, "m1").embed_query("q")
+    CachedEmbeddings(model, cache, "m1").embed_query("q")
+    CachedEmbeddings(model, cache, "m2").embed_query("q")
+    assert model.embed_query.call_count == 2
+
+
+def test_lru_eviction(cache):
+    for t in ["a", "b", "c"]:
+        cache.put_many("m", {text_hash(t): [1.0]})
+    cache.get_many("m", [text_hash("a")])
+    cache.put_many("m", {text_hash("d"): [1.0]})
+
+    remaining = cache.get_many("m", [text_hash(t) for t in ["a", "b", "c", "d"]])
+    assert text_hash("b") not in remaining
+    assert len(remaining) == 3
+
+
+def test_puts_keep_a_running_count_instead_of_scanning(cache):
+    statements = []
+    cache._conn.set_trace_callback(statements.append)
+    cache.put_many("m", {"a": [1.0], "b": [2.0]})
+    cache.put_many("m", {"a": [1.5], "c": [3.0]})  # "a" is replaced, not added
+    cache.put_many("m", {"d": [4.0]})
+    cache._conn.set_trace_callback(None)
+
+    assert not any("COUNT(" in sql for sql in statements)
+    assert cache.get_many("m", ["a", "b"]) == {"a": [1.5]}
+    assert cache._count == cache.stats()["entries"] == 3
@@ -0,0 +1,104 @@
+"""Tests for metadata-filtered retrieval."""
+
+import tempfile
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+
+from benchmarks.corpus import synthetic_documents
+from benchmarks.suite import isolated
+from src.api.models import SearchFilters
+from src.ingestion.embedder import chunk_ids, ingest_documents
+from src.ingestion.loader import chunk_documents
+from src.search.bm25_index import BM25Index
+from src.search.filters import MetadataFilter
+from src.search.hybrid import SearchQuery, hybrid_search, hybrid_search_batch
+from src.search.numpy_backend import NumpyBackend
+
+
+def test_filter_translates_to_chroma_and_sql():
+    scoped = MetadataFilter(filenames=("a.pdf", "b.pdf"), page_from=2, page_to=4)
+    assert scoped.chroma_where() == {"$and": [
+        {"filename": {"$in": ["a.pdf", "b.pdf"]}},
+        {"page": {"$gte": 2}},
+        {"page": {"$lte": 4}},
+    ]}
+    assert scoped.sql({"filename": "f", "page": "p"}) == (
+        "f IN (?,?) AND p >= ? AND p <= ?", ["a.pdf", "b.pdf", 2, 4]
+    )
+    assert MetadataFilter(ingested_before=5.0).chroma_where() == {"ingested_at": {"$lt": 5.0}}
+    assert not MetadataFilter() and MetadataFilter().chroma_where() is None
+    assert MetadataFilter().sql({}) == ("1", [])
+
+    request = SearchFilters(filenames=["b.pdf", "a.pdf", "b.pdf"], ingested_after=datetime(2024, 1, 1))
+    assert request.to_filter() == MetadataFilter(
+        filenames=("a.pdf", "b.pdf"),
+        ingested_after=datetime(2024, 1, 1, tzinfo=timezone.utc).timestamp(),
+    )
+
+
+def test_bm25_filter_reads_only_matching_chunks_with_corpus_scores(tmp_path):
+    index = BM25Index(tmp_path / "bm25.db")
+    ids = ["a0", "a1", "b0", "b1"]
+    index.add(
+        ids,
+        ["alpha beta", "alpha gamma", "alpha beta beta", "delta"],
+        [{"filename": f"{i[0]}.pdf", "page": int(i[1]), "ingested_at": 100.0 + n} for n, i in enumerate(ids)],
+    )
+    unfiltered = dict(index.search("alpha beta", k=10))
+
+    hits = index.search("alpha beta", k=10, where=MetadataFilter(filenames=("b.pdf",)))
+    assert hits == [("b0", unfiltered["b0"])]
+    assert [c for c, _ in index.search("alpha", k=10, where=MetadataFilter(page_from=1))] == ["a1"]
+    assert {c for c, _ in index.search("alpha", k=10, where=MetadataFilter(ingested_before=102.0))} == {"a0", "a1"}
+
+    index.remove(["b0"])
+    assert index.search("beta", k=10, where=MetadataFilter(filenames=("b.pdf",))) == []
+    index.close()
+
+
+def test_numpy_backend_filter_scores_exactly_within_scope(tmp_path):
+    rng = np.random.default_rng(0)
+    vectors = rng.normal(size=(200, 8)).astype(np.float32)
+    ids = [f"c{i}" for i in range(200)]
+    metadatas = [{"filename": f"doc{i % 4}.pdf", "page": i % 10} for i in range(200)]
+    backend = NumpyBackend(tmp_path / "vectors", storage="int8")
+    backend.upsert(ids, vectors.tolist(), ids, metadatas)
+    backend.delete(["c1"])
+
+    where = MetadataFilter(filenames=("doc1.pdf",), page_to=4)
+    scope = [i for i, m in enumerate(metadatas) if m["filename"] == "doc1.pdf" and m["page"] <= 4 and i != 1]
+    unit = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+    query = vectors[5] + 0.5
+    expected = sorted(scope, key=lambda i: -(unit[i] @ (query / np.linalg.norm(query))))[:5]
+
+    hits = backend.query_ids([query.tolist()], 5, where)[0]
+    assert [chunk_id for chunk_id, _ in hits] == [f"c{i}" for i in expected]
+    docs = backend.query([query.tolist()], 50, where)[0]
+    assert len(docs) == len(scope)
+    assert all(doc.metadata["filename"] == "doc1.pdf" for doc, _ in docs)
+    backend.close()
+
+
+def test_hybrid_search_is_scoped_by_filters():
+    chunks = chunk_documents(synthetic_documents(files=3, pages_per_file=3, words_per_page=150, seed=3))
+    target = next(c for c in chunks if c.metadata["filename"] == "doc_0000.pdf")
+    question = " ".join(target.page_content.split()[:12])
+    other = MetadataFilter(filenames=("doc_0002.pdf",), page_from=1)
+
+    with tempfile.TemporaryDirectory() as workdir, isolated(Path(workdir), backend="numpy", shards=2):
+        ingest_documents(chunks)
+        unfiltered = hybrid_search(question)
+        scoped = hybrid_search(question, filters=other)
+        batch = hybrid_search_batch([SearchQuery(question), SearchQuery(question, filters=other)])
+        stale = hybrid_search(question, filters=MetadataFilter(ingested_before=1.0))
+
+    assert chunk_ids([target])[0] in {doc.id for doc in unfiltered}
+    assert scoped and all(
+        doc.metadata["filename"] == "doc_0002.pdf" and doc.metadata["page"] >= 1 for doc in scoped
+    )
+    assert all("ingested_at" in doc.metadata for doc in scoped)
+    assert [doc.id for doc in batch[0]] == [doc.id for doc in unfiltered]
+    assert [doc.id for doc in batch[1]] == [doc.id for doc in scoped]
+    assert stale == []
@@ -0,0 +1,81 @@
+"""Tests for persistent background ingestion jobs."""
+
+import threading
+import time
+from unittest.mock import patch
+
+import pytest
+
+from src.ingestion.jobs import FAILED, QUEUED, SUCCEEDED, JobManager
+
+STATS = {
+    "total_chunks": 4, "new_chunks": 3, "duplicates_skipped": 1, "failed_chunks": 0,
+    "errors": [], "files": 1, "failed_files": 0, "seconds": 0.5,
+}
+
+
+def _wait_for(manager, job_id, statuses, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        job = manager.get(job_id)
+        if job["status"] in statuses:
+            return job
+        time.sleep(0.02)
+    raise AssertionError(f"job stuck in {manager.get(job_id)['status']}")
+
+
+@pytest.fixture
+def manager(tmp_path):
+    m = JobManager(tmp_path / "jobs.db")
+    yield m
+    m.close()
+
+
+def test_job_runs_and_reports_result(manager):
+    with patch("src.ingestion.jobs.run_ingest_pipeline", return_value=STATS):
+        job = manager.submit("ingest_directory", ["a.pdf"])
+        assert job["status"] == QUEUED
+        manager.start()
+        done = _wait_for(manager, job["id"], {SUCCEEDED})
+    assert done["chunks_done"] == 4
+    assert done["chunks_per_sec"] == 6.0
+    assert done["result"]["new_chunks"] == 3
+    assert manager.list()[0]["id"] == job["id"]
+
+
+def test_failed_job_records_error(manager):
+    with patch("src.ingestion.jobs.run_ingest_pipeline", side_effect=RuntimeError("disk full")):
+        job = manager.submit("upload", ["a.pdf"])
+        manager.start()
+        failed = _wait_for(manager, job["id"], {FAILED})
+    assert failed["errors"] == ["RuntimeError: disk full"]
+
+
+def test_queued_jobs_survive_restart(tmp_path):
+    first = JobManager(tmp_path / "jobs.db")
+    job = first.submit("ingest_directory", ["a.pdf"])
+    first.close()
+
+    second = JobManager(tmp_path / "jobs.db")
+    with patch("src.ingestion.jobs.run_ingest_pipeline", return_value=STATS):
+        second.start()
+        _wait_for(second, job["id"], {SUCCEEDED})
+    second.close()
+
+
+def test_stop_interrupts_running_job_and_requeues(manager):
+    started = threading.Event()
+
+    def slow_pipeline(paths, on_progress, **kwargs):
+        started.set()
+        while True:
+            on_progress(type("P", (), {})())
+            time.sleep(0.01)
+
+    with patch("src.ingestion.jobs.run_ingest_pipeline", slow_pipeline), \
+            patch("src.ingestion.jobs.PROGRESS_INTERVAL", 1e9):
+        job = manager.submit("ingest_directory", ["a.pdf"])
+        manager.start()
+        assert started.wait(5)
+        manager.stop()
+    assert manager.get(job["id"])["status"] == QUEUED
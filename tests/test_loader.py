@@ -5,7 +5,9 @@ from pathlib import Path
 from unittest.mock import patch, MagicMock
 from langchain.schema import Document
 
-from src.ingestion.loader import chunk_documents
+from src.ingestion.loader import chunk_documents, load_and_chunk_files, load_pdf
+
+DOCS = Path(__file__).resolve().parent.parent / "docs"
 
 
 @pytest.fixture
@@ -45,3 +47,38 @@ def test_chunk_empty_input():
     """Empty input should return empty output."""
     chunks = chunk_documents([])
     assert chunks == []
+
+
+@pytest.fixture
+def pdf_dir(tmp_path):
+    for pdf in DOCS.glob("*.pdf"):
+        (tmp_path / pdf.name).write_bytes(pdf.read_bytes())
+    (tmp_path / "a_corrupt.pdf").write_bytes(b"not really a pdf")
+    return tmp_path
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_load_and_chunk_files_ordered_and_isolated(pdf_dir, workers):
+    paths = sorted(pdf_dir.glob("*.pdf"))
+    results = list(load_and_chunk_files(paths, workers=workers, chunk_size=200, chunk_overlap=20))
+
+    assert [r.path for r in results] == paths
+    assert results[0].error and not results[0].chunks
+    assert all(r.error is None and r.chunks for r in results[1:])
+
+
+def test_worker_crash_is_reported_per_file(pdf_dir):
+    import os
+
+    def crashing_load(path):
+        if "corrupt" in str(path):
+            os._exit(1)
+        return load_pdf(path)
+
+    paths = sorted(pdf_dir.glob("*.pdf"))
+    with patch("src.ingestion.loader.load_pdf", crashing_load):
+        results = list(load_and_chunk_files(paths, workers=2))
+
+    assert [r.path for r in results] == paths
+    assert "BrokenProcessPool" in results[0].error
+    assert all(r.error is None for r in results[1:])
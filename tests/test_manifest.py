@@ -0,0 +1,30 @@
+"""Tests for the ingested-file manifest."""
+
+import os
+
+from src.ingestion.manifest import FileRecord, IngestManifest, file_sha256
+
+
+def test_plan_skips_unchanged_and_touched_files(tmp_path):
+    manifest = IngestManifest(tmp_path / "manifest.db")
+    docs = tmp_path / "docs"
+    docs.mkdir()
+    same, touched, edited, new = (docs / f"{n}.pdf" for n in ("same", "touched", "edited", "new"))
+    for path in (same, touched, edited):
+        path.write_text(path.stem)
+        st = path.stat()
+        manifest.record(FileRecord(str(path), st.st_size, st.st_mtime_ns, file_sha256(path), "1000:200", ["x"]))
+    new.write_text("new")
+    os.utime(touched, ns=(1, 1))
+    edited.write_text("edited, longer")
+
+    planned, unchanged = manifest.plan([same, touched, edited, new], "1000:200")
+    assert unchanged == 2
+    assert [p.path.name for p in planned] == ["edited.pdf", "new.pdf"]
+    assert planned[0].previous.chunk_ids == ["x"]
+    assert manifest.get(touched).mtime_ns == 1
+
+    planned, unchanged = manifest.plan([same], "500:50")
+    assert unchanged == 0 and len(planned) == 1
+    assert {r.path for r in manifest.under(docs)} == {str(p.resolve()) for p in (same, touched, edited)}
+    manifest.close()
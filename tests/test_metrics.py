@@ -0,0 +1,51 @@
+"""Tests for the Prometheus metrics and stage timing helpers."""
+
+from src.metrics import (
+    Counter,
+    Histogram,
+    MetricsRegistry,
+    begin_request,
+    end_request,
+    record_stages,
+    server_timing_header,
+)
+
+
+def test_histogram_renders_cumulative_buckets():
+    h = Histogram("latency_seconds", "Latency", ("stage",), buckets=(0.1, 1.0))
+    for value in (0.05, 0.5, 0.7, 3.0):
+        h.observe(value, stage="search.vector")
+    lines = list(h.collect())
+    assert 'latency_seconds_bucket{stage="search.vector",le="0.1"} 1' in lines
+    assert 'latency_seconds_bucket{stage="search.vector",le="1"} 3' in lines
+    assert 'latency_seconds_bucket{stage="search.vector",le="+Inf"} 4' in lines
+    assert 'latency_seconds_count{stage="search.vector"} 4' in lines
+
+
+def test_registry_renders_owned_metrics_and_collectors():
+    registry = MetricsRegistry()
+    tokens = registry.counter("tokens_total", "Tokens", ("kind",))
+    tokens.inc(12, kind="prompt")
+    tokens.inc(3, kind="prompt")
+    registry.register_collector(
+        lambda: [("hits_total", "counter", "Hits", [({"cache": 'a"b'}, 2)])]
+    )
+    text = registry.render()
+    assert "# TYPE tokens_total counter" in text
+    assert 'tokens_total{kind="prompt"} 15' in text
+    assert 'hits_total{cache="a\\"b"} 2' in text
+    assert isinstance(tokens, Counter)
+
+
+def test_record_stages_feeds_the_current_request():
+    token = begin_request()
+    record_stages("search", {"embed_ms": 1.5, "vector_ms": 2.0, "query": 1})
+    record_stages("ask", {"llm_ms": 10.0, "total_ms": 99.0}, keys=("llm_ms",))
+    stages = end_request(token)
+    assert stages == {"search.embed": 1.5, "search.vector": 2.0, "ask.llm": 10.0}
+    assert server_timing_header(stages, 20.0) == (
+        "search.embed;dur=1.50, search.vector;dur=2.00, ask.llm;dur=10.00, total;dur=20.00"
+    )
+
+    # Outside a request only the histograms are fed.
+    record_stages("search", {"embed_ms": 1.0})
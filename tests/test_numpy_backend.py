@@ -0,0 +1,111 @@
+"""Tests for the memory-mapped NumPy vector backend."""
+
+import numpy as np
+import pytest
+
+from src.search.numpy_backend import NumpyBackend
+
+
+def _corpus(n=400, dim=16, seed=0):
+    rng = np.random.default_rng(seed)
+    vectors = rng.normal(size=(n, dim)).astype(np.float32)
+    ids = [f"c{i}" for i in range(n)]
+    return ids, vectors
+
+
+@pytest.fixture
+def backend(tmp_path):
+    b = NumpyBackend(tmp_path / "vectors")
+    ids, vectors = _corpus()
+    b.upsert(ids, vectors.tolist(), [f"text {i}" for i in ids], [{"page": i} for i in range(len(ids))])
+    yield b
+    b.close()
+
+
+def _brute_force(vectors, query, k):
+    unit = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+    return [f"c{i}" for i in np.argsort(-(unit @ (query / np.linalg.norm(query))))[:k]]
+
+
+def test_flat_search_is_exact(backend):
+    _, vectors = _corpus()
+    queries = vectors[:3] + 0.1
+    results = backend.query(queries.tolist(), k=5)
+    for query, hits in zip(queries, results):
+        assert [doc.id for doc, _ in hits] == _brute_force(vectors, query, 5)
+    assert results[0][0][0].metadata == {"page": 0}
+
+
+def test_delete_and_reopen(backend, tmp_path):
+    backend.delete(["c0", "missing"])
+    assert backend.count() == 399
+    assert backend.existing_ids(["c0", "c1"]) == {"c1"}
+
+    reopened = NumpyBackend(tmp_path / "vectors")
+    _, vectors = _corpus()
+    hits = reopened.query([vectors[0].tolist()], k=3)[0]
+    assert "c0" not in [doc.id for doc, _ in hits]
+    assert [d.id for d in reopened.get(["c2", "c0", "c1"])] == ["c2", "c1"]
+    reopened.close()
+
+
+def test_readers_see_writes_from_other_instances(backend, tmp_path):
+    reader = NumpyBackend(tmp_path / "vectors")
+    assert reader.count() == 400
+    backend.upsert(["new"], [[1.0] + [0.0] * 15], ["new text"], [None])
+    assert reader.query([[1.0] + [0.0] * 15], k=1)[0][0][0].id == "new"
+    reader.close()
+
+
+def test_ivf_with_every_list_probed_matches_flat(tmp_path):
+    ids, vectors = _corpus()
+    ivf = NumpyBackend(tmp_path / "ivf", index="ivf", nlist=8, nprobe=8)
+    ivf.upsert(ids, vectors.tolist(), ids, [None] * len(ids))
+    assert ivf.optimize()
+    assert not ivf.optimize()
+
+    query = (vectors[7] + 0.05).tolist()
+    assert [d.id for d, _ in ivf.query([query], k=10)[0]] == _brute_force(vectors, np.array(query), 10)
+
+    ivf.nprobe = 1
+    ivf._view = None
+    assert len(ivf.query([query], k=10)[0]) == 10
+    ivf.close()
+
+
+@pytest.mark.parametrize("storage,dims", [("float16", 0), ("int8", 0), ("int8", 12)])
+def test_compressed_first_pass_is_rescored_exactly(tmp_path, storage, dims):
+    ids, vectors = _corpus()
+    b = NumpyBackend(tmp_path / "c", storage=storage, dims=dims, rescore=16)
+    b.upsert(ids[:200], vectors[:200].tolist(), ids[:200], [None] * 200)
+    b.upsert(ids[200:], vectors[200:].tolist(), ids[200:], [None] * 200)
+
+    query = vectors[11] + 0.05
+    hits = b.query([query.tolist()], k=5)[0]
+    assert [d.id for d, _ in hits] == _brute_force(vectors, query, 5)
+    # Scores come from the float32 rows, not the codes.
+    unit = vectors[11] / np.linalg.norm(vectors[11])
+    assert hits[0][1] == pytest.approx(float(unit @ (query / np.linalg.norm(query))), rel=1e-5)
+    b.close()
+
+
+def test_changing_codec_rebuilds_codes_from_stored_vectors(backend, tmp_path):
+    compact = NumpyBackend(tmp_path / "vectors", storage="int8", dims=8, rescore=20)
+    _, vectors = _corpus()
+    query = vectors[3] + 0.05
+    assert [d.id for d, _ in compact.query([query.tolist()], k=5)[0]] == _brute_force(vectors, query, 5)
+    assert compact.codes_path.stat().st_size == 400 * 8
+    assert compact.scales_path.stat().st_size == 400 * 4
+    compact.close()
+
+
+def test_recall_report_tradeoffs():
+    from src.search.compression import Codec, candidate_codecs, recall_report
+
+    _, vectors = _corpus(n=500, dim=64)
+    rows = {r["codec"]: r for r in recall_report(vectors[50:], vectors[:50], candidate_codecs(64), k=10)}
+    assert rows["float32-full"]["recall_coarse"] == 1.0
+    assert rows["int8-full"]["memory_reduction"] == pytest.approx(256 / 68, rel=0.01)
+    assert rows["int8-full"]["recall_rescored"] >= 0.95
+    assert rows["float16-32"]["recall_rescored"] >= rows["float16-32"]["recall_coarse"]
+    assert Codec("int8", 16).bytes_per_vector(64) == 20
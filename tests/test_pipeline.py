@@ -0,0 +1,108 @@
+"""Tests for the streaming ingestion pipeline."""
+
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+from langchain.schema import Document
+
+from src.ingestion.loader import FileResult
+from src.ingestion.manifest import IngestManifest
+from src.ingestion.pipeline import batched, iter_bounded, run_ingest_pipeline
+
+
+def test_iter_bounded_preserves_order_and_reraises():
+    def items():
+        yield from range(5)
+        raise ValueError("producer failed")
+
+    seen = []
+    with pytest.raises(ValueError, match="producer failed"):
+        for item in iter_bounded(items(), maxsize=2):
+            seen.append(item)
+    assert seen == [0, 1, 2, 3, 4]
+
+
+def test_batched():
+    assert [len(b) for b in batched(range(7), 3)] == [3, 3, 1]
+
+
+@pytest.fixture
+def manifest(tmp_path):
+    m = IngestManifest(tmp_path / "manifest.db")
+    with patch("src.ingestion.pipeline.registry.ingest_manifest", return_value=m):
+        yield m
+    m.close()
+
+
+@pytest.mark.usefixtures("isolated_stores")
+def test_pipeline_commits_before_all_files_are_parsed(tmp_path, manifest):
+    events = []
+
+    def fake_files(paths, **kwargs):
+        for path in paths:
+            events.append(f"parsed {path.name}")
+            chunks = [Document(page_content=f"{path.name} {i}", metadata={}) for i in range(4)]
+            yield FileResult(path, chunks, pages=1)
+        yield FileResult(Path("bad.pdf"), error="broken")
+
+    def fake_ingest(batch, progress=None, collection=None):
+        events.append(f"stored {len(batch)}")
+        progress(len(batch))
+        return {"duplicates_skipped": 0, "failed_chunks": 0, "errors": []}
+
+    paths = [tmp_path / f"f{i}.pdf" for i in range(5)]
+    for path in paths:
+        path.write_bytes(b"%PDF")
+    with patch("src.ingestion.pipeline.load_and_chunk_files", fake_files), \
+            patch("src.ingestion.pipeline.ingest_documents", fake_ingest), \
+            patch("src.ingestion.pipeline.settings.ingest_batch_size", 4), \
+            patch("src.ingestion.pipeline.settings.ingest_concurrency", 1), \
+            patch("src.ingestion.pipeline.settings.pipeline_queue_size", 1):
+        stats = run_ingest_pipeline(paths)
+
+    assert events.index("stored 4") < events.index("parsed f4.pdf")
+    assert stats["new_chunks"] == 20
+    assert stats["failed_files"] == 1
+    assert stats["errors"] == ["bad.pdf: broken"]
+
+
+@pytest.mark.usefixtures("isolated_stores")
+def test_pipeline_skips_unchanged_files_and_retires_stale_chunks(tmp_path, manifest):
+    parsed = []
+    deleted = []
+
+    def fake_files(paths, **kwargs):
+        for path in paths:
+            parsed.append(path.name)
+            text = path.read_text()
+            yield FileResult(path, [Document(page_content=text, metadata={"source": str(path)})])
+
+    def fake_ingest(batch, progress=None, collection=None):
+        progress(len(batch))
+        return {"duplicates_skipped": 0, "failed_chunks": 0, "errors": []}
+
+    a, b = tmp_path / "a.pdf", tmp_path / "b.pdf"
+    a.write_text("alpha")
+    b.write_text("beta")
+    with patch("src.ingestion.pipeline.load_and_chunk_files", fake_files), \
+            patch("src.ingestion.pipeline.ingest_documents", fake_ingest), \
+            patch("src.ingestion.pipeline.delete_chunks",
+                  side_effect=lambda ids, collection=None: deleted.extend(ids) or len(ids)):
+        run_ingest_pipeline([a, b], directory=tmp_path)
+        old_ids = manifest.get(a).chunk_ids + manifest.get(b).chunk_ids
+
+        b.write_text("beta, revised")
+        a.unlink()
+        parsed.clear()
+        stats = run_ingest_pipeline([b], directory=tmp_path)
+
+        assert parsed == ["b.pdf"]
+        assert stats["removed_files"] == 1
+        assert sorted(deleted) == sorted(old_ids)
+        assert manifest.get(a) is None
+
+        parsed.clear()
+        stats = run_ingest_pipeline([b], directory=tmp_path)
+        assert parsed == []
+        assert stats["skipped_files"] == 1
@@ -0,0 +1,76 @@
+"""Tests for the QA answer cache."""
+
+from unittest.mock import MagicMock, patch
+
+import pytest
+from langchain.schema import Document
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+
+from src.search.qa import AnswerCache, ask
+
+RESULT = {"answer": "42", "sources": [], "num_sources": 1, "timings_ms": {}}
+
+
+@pytest.fixture
+def cache():
+    return AnswerCache(max_entries=2, ttl_seconds=60, similarity_threshold=0.95)
+
+
+def test_exact_tier_normalizes_question(cache):
+    cache.store("What is RAG?", (10, 5), 1, RESULT, latency_ms=800)
+    result, tier = cache.lookup("  what is   rag ", (10, 5), 1)
+    assert tier == "exact"
+    assert result["answer"] == "42"
+    assert cache.lookup("what is rag", (10, 3), 1) is None
+    assert cache.stats()["latency_saved_ms"] == 800
+
+
+def test_semantic_tier_uses_similarity_threshold(cache):
+    cache.store("What is RAG?", (10, 5), 1, RESULT, latency_ms=800, embedding=[1.0, 0.0])
+    assert cache.lookup("Explain RAG", (10, 5), 1, embedding=[0.99, 0.05])[1] == "semantic"
+    assert cache.lookup("Unrelated", (10, 5), 1, embedding=[0.0, 1.0]) is None
+
+
+def test_version_bump_and_ttl_invalidate(cache):
+    cache.store("q", (10, 5), 1, RESULT, latency_ms=1)
+    assert cache.lookup("q", (10, 5), 2) is None
+    cache.store("q", (10, 5), 2, RESULT, latency_ms=1)
+    with patch("src.search.qa.time.time", return_value=10**12):
+        assert cache.lookup("q", (10, 5), 2) is None
+
+
+def test_lru_eviction(cache):
+    for q in ["a", "b"]:
+        cache.store(q, (10, 5), 1, RESULT, latency_ms=1)
+    cache.lookup("a", (10, 5), 1)
+    cache.store("c", (10, 5), 1, RESULT, latency_ms=1)
+    assert cache.lookup("b", (10, 5), 1) is None
+    assert cache.lookup("a", (10, 5), 1) is not None
+
+
+def test_new_version_purges_only_entries_with_the_same_params(cache):
+    cache.store("a", ("alpha",), (("alpha", 1),), RESULT, latency_ms=1)
+    cache.store("b", ("beta",), (("beta", 1),), RESULT, latency_ms=1)
+    cache.store("c", ("alpha",), (("alpha", 2),), RESULT, latency_ms=1)
+    assert cache.lookup("b", ("beta",), (("beta", 1),)) is not None
+    assert cache.lookup("a", ("alpha",), (("alpha", 2),)) is None
+
+
+def test_ask_serves_repeat_question_from_cache(cache):
+    docs = [Document(page_content="ctx", metadata={"filename": "a.pdf", "page": 1})]
+    embeddings = MagicMock()
+    embeddings.embed_query.return_value = [1.0, 0.0]
+    chat = FakeListChatModel(responses=["first", "second"])
+
+    with patch("src.search.qa.answer_cache", cache), \
+            patch("src.search.qa.get_collection_version", return_value=7), \
+            patch("src.search.qa.hybrid_search", return_value=docs) as search, \
+            patch("src.search.qa.registry.embeddings", return_value=embeddings), \
+            patch("src.search.qa.registry.chat_model", return_value=chat):
+        first = ask("What is RAG?")
+        second = ask("what is rag")
+
+    assert search.call_count == 1
+    assert search.call_args.kwargs["vector"] == [1.0, 0.0]
+    assert second["answer"] == first["answer"] == "first"
+    assert second["cache_hit"] == "exact"
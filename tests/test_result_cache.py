@@ -0,0 +1,62 @@
+"""Tests for the generation-versioned retrieval result cache."""
+
+from src.search.result_cache import RetrievalCache
+
+
+def gen(*versions: int, names: str = "ab") -> tuple:
+    return tuple(zip(names, versions))
+
+
+def test_key_normalizes_query_and_includes_generation():
+    key = RetrievalCache.key("  What is RAG? ", 10, 5, gen(3))
+    assert key == RetrievalCache.key("what is  rag", 10, 5, gen(3))
+    assert key != RetrievalCache.key("what is rag", 10, 5, gen(4))
+    assert key != RetrievalCache.key("what is rag", 10, 3, gen(3))
+    assert key != RetrievalCache.key("what is rag", 10, 5, gen(3), ("corpus", 30, 2))
+
+
+def test_lru_eviction():
+    cache = RetrievalCache(max_entries=2)
+    keys = [RetrievalCache.key(q, 10, 5, gen(0)) for q in ("a", "b", "c")]
+    cache.put(keys[0], [("id-a", 0.1)])
+    cache.put(keys[1], [("id-b", 0.1)])
+    cache.get(keys[0])
+    cache.put(keys[2], [("id-c", 0.1)])
+
+    assert cache.get(keys[0]) == [("id-a", 0.1)]
+    assert cache.get(keys[1]) is None
+    assert cache.stats()["entries"] == 2
+
+
+def test_shared_tier_is_visible_to_other_workers(tmp_path):
+    path = tmp_path / "rankings.db"
+    writer = RetrievalCache(shared_path=path)
+    reader = RetrievalCache(shared_path=path)
+    key = RetrievalCache.key("q", 10, 5, gen(1))
+    writer.put(key, [("c1", 0.03), ("c2", 0.02)])
+
+    assert reader.get(key) == [("c1", 0.03), ("c2", 0.02)]
+    assert reader.stats()["shared_hits"] == 1
+
+    # A newer generation purges older rankings of the same collections
+    # from the shared file, and leaves other collections' rankings alone.
+    writer.put(RetrievalCache.key("q", 10, 5, gen(7, names="b")), [("c4", 0.01)])
+    writer.put(RetrievalCache.key("q", 10, 5, gen(2)), [("c3", 0.01)])
+    assert writer.stats()["shared_entries"] == 2
+    writer.put(RetrievalCache.key("q", 10, 5, gen(2, 0)), [("c5", 0.01)])
+    assert writer.stats()["shared_entries"] == 3
+    writer.close()
+    reader.close()
+
+
+def test_shared_tier_keeps_a_running_count(tmp_path):
+    cache = RetrievalCache(max_entries=2, shared_path=tmp_path / "rankings.db")
+    statements = []
+    cache._shared._conn.set_trace_callback(statements.append)
+    for query in ("a", "b", "a", "c"):
+        cache.put(RetrievalCache.key(query, 10, 5, gen(1)), [("c1", 0.1)])
+    cache._shared._conn.set_trace_callback(None)
+
+    assert not any("COUNT(" in sql for sql in statements)
+    assert cache._shared._count == cache.stats()["shared_entries"] == 2
+    cache.close()
@@ -1,9 +1,18 @@
 """Tests for hybrid search and RRF."""
 
 import pytest
+import asyncio
+from unittest.mock import AsyncMock, MagicMock, patch
 from langchain.schema import Document
 
-from src.search.hybrid import reciprocal_rank_fusion, keyword_search, _tokenize
+from src.search.hybrid import (
+    fuse_rankings,
+    reciprocal_rank_fusion,
+    keyword_search,
+    hybrid_search,
+    ahybrid_search,
+    _tokenize,
+)
 
 
 @pytest.fixture
@@ -46,6 +55,190 @@ def test_rrf_empty_lists():
     assert fused == []
 
 
+def test_rrf_keeps_identical_text_from_different_files_apart():
+    doc_a = Document(page_content="Same text", metadata={"source": "a.pdf"})
+    doc_b = Document(page_content="Same text", metadata={"source": "b.pdf"})
+    fused = reciprocal_rank_fusion([[doc_a], [doc_b]])
+    assert fused == [doc_a, doc_b]
+
+
+def test_fuse_rankings_weights_and_many_legs():
+    semantic = [("a", 0.9), ("b", 0.8), ("c", 0.7)]
+    keyword = [("c", 12.0), ("d", 3.0)]
+    titles = [("d", 1.0)]
+
+    assert [i for i, _ in fuse_rankings([semantic, keyword])] == ["c", "a", "b", "d"]
+    assert [i for i, _ in fuse_rankings([semantic, keyword, titles])][:2] == ["d", "c"]
+    # Dropping the keyword leg leaves the semantic order.
+    assert [i for i, _ in fuse_rankings([semantic, keyword], weights=[1.0, 0.0])] == ["a", "b", "c"]
+    weighted = fuse_rankings([semantic, keyword], k=10, weights=[1.0, 3.0])
+    assert [i for i, _ in weighted] == ["c", "d", "a", "b"]
+    assert weighted[0][1] == pytest.approx(1 / 13 + 3 / 11)
+    # Ties keep first-seen order.
+    assert [i for i, _ in fuse_rankings([[("x", 0)], [("y", 0)]])] == ["x", "y"]
+    with pytest.raises(ValueError):
+        fuse_rankings([semantic, keyword], weights=[1.0])
+
+
 def test_keyword_search_empty():
     results = keyword_search("test query", [], k=5)
     assert results == []
+
+
+def _fake_backend(docs):
+    backend = MagicMock()
+    backend.query.side_effect = lambda vectors, k, where=None: [[(d, 1.0) for d in docs[:k]] for _ in vectors]
+    backend.query_ids.side_effect = lambda vectors, k, where=None: [[(d.id, 1.0) for d in docs[:k]] for _ in vectors]
+    backend.get.side_effect = lambda ids: [d for i in ids for d in docs if d.id == i]
+    return backend
+
+
+@pytest.mark.usefixtures("isolated_stores")
+def test_hybrid_search_embeds_query_once(sample_docs):
+    embeddings = MagicMock()
+    embeddings.embed_query.return_value = [0.1, 0.2]
+    backend = _fake_backend(sample_docs)
+    index = MagicMock()
+    index.count.return_value = 0
+
+    timings = {}
+    with patch("src.search.hybrid.get_embeddings", return_value=embeddings), \
+            patch("src.search.hybrid.get_vector_backend", return_value=backend), \
+            patch("src.search.hybrid.get_keyword_index", return_value=index):
+        results = hybrid_search("image data", top_k=2, rerank_k=3, timings=timings)
+
+    embeddings.embed_query.assert_called_once_with("image data")
+    backend.query.assert_called_once_with([[0.1, 0.2]], 4, None)
+    assert len(results) == 3
+    assert {"embed_ms", "vector_ms", "keyword_ms", "fusion_ms", "total_ms"} <= timings.keys()
+
+
+@pytest.mark.usefixtures("isolated_stores")
+def test_ahybrid_search_uses_async_embedding(sample_docs):
+    embeddings = MagicMock()
+    embeddings.aembed_query = AsyncMock(return_value=[0.1, 0.2])
+    index = MagicMock()
+    index.count.return_value = 0
+
+    with patch("src.search.hybrid.get_embeddings", return_value=embeddings), \
+            patch("src.search.hybrid.get_vector_backend", return_value=_fake_backend(sample_docs)), \
+            patch("src.search.hybrid.get_keyword_index", return_value=index):
+        results = asyncio.run(ahybrid_search("image data", top_k=2, rerank_k=3))
+        precomputed = asyncio.run(ahybrid_search("data image", top_k=2, rerank_k=3, vector=[0.1, 0.2]))
+
+    embeddings.aembed_query.assert_awaited_once_with("image data")
+    embeddings.embed_query.assert_not_called()
+    assert len(results) == 3
+    assert len(precomputed) == 3
+
+
+def test_corpus_search_loads_only_the_winners():
+    docs = [Document(page_content=f"chunk {i}", metadata={}, id=f"c{i}") for i in range(8)]
+    embeddings = MagicMock()
+    embeddings.embed_query.return_value = [0.1, 0.2]
+    backend = _fake_backend(docs)
+    index = MagicMock()
+    index.count.return_value = 8
+    index.search.return_value = [("c7", 3.0), ("c1", 2.0), ("c6", 1.0)]
+
+    with patch("src.search.hybrid.get_embeddings", return_value=embeddings), \
+            patch("src.search.hybrid.get_vector_backend", return_value=backend), \
+            patch("src.search.hybrid.get_keyword_index", return_value=index), \
+            patch("src.search.hybrid.registry.retrieval_cache", return_value=None):
+        results = hybrid_search("chunk", top_k=4, rerank_k=2)
+
+    backend.query.assert_not_called()
+    backend.query_ids.assert_called_once_with([[0.1, 0.2]], 4, None)
+    backend.get.assert_called_once_with(["c1", "c0"])
+    assert [d.id for d in results] == ["c1", "c0"]
+
+
+def test_hybrid_search_serves_repeat_queries_from_cache():
+    from src.search.result_cache import RetrievalCache
+
+    docs = [
+        Document(page_content=f"chunk {i} about image data", metadata={}, id=f"c{i}")
+        for i in range(4)
+    ]
+    embeddings = MagicMock()
+    embeddings.embed_query.return_value = [0.1, 0.2]
+    index = MagicMock()
+    index.count.return_value = 0
+    generation = [0]
+
+    with patch("src.search.hybrid.get_embeddings", return_value=embeddings), \
+            patch("src.search.hybrid.get_vector_backend", return_value=_fake_backend(docs)), \
+            patch("src.search.hybrid.get_keyword_index", return_value=index), \
+            patch(
+                "src.search.hybrid.get_collection_version",
+                side_effect=lambda names: (("default", generation[0]),),
+            ), \
+            patch("src.search.hybrid.registry.retrieval_cache", return_value=RetrievalCache()):
+        first = hybrid_search("Image data", top_k=2, rerank_k=3)
+        timings = {}
+        second = hybrid_search("image  data?", top_k=2, rerank_k=3, timings=timings)
+        assert embeddings.embed_query.call_count == 1
+        assert [d.id for d in second] == [d.id for d in first]
+        assert "cache_ms" in timings
+
+        # An ingest bumps the generation, so the cached ranking is not reused.
+        generation[0] += 1
+        hybrid_search("image data", top_k=2, rerank_k=3)
+        assert embeddings.embed_query.call_count == 2
+
+
+def test_hybrid_search_batch_embeds_and_queries_once():
+    from src.search.hybrid import SearchQuery, hybrid_search_batch
+
+    per_query = [
+        [Document(page_content=f"query{q} chunk {i}", metadata={}, id=f"c{q}{i}") for i in range(3)]
+        for q in range(2)
+    ]
+    embeddings = MagicMock()
+    embeddings.embed_documents.return_value = [[0.1], [0.2]]
+    backend = MagicMock()
+    backend.query.return_value = [[(d, 1.0) for d in docs] for docs in per_query]
+    index = MagicMock()
+    index.count.return_value = 0
+
+    with patch("src.search.hybrid.get_embeddings", return_value=embeddings), \
+            patch("src.search.hybrid.get_vector_backend", return_value=backend), \
+            patch("src.search.hybrid.get_keyword_index", return_value=index), \
+            patch("src.search.hybrid.registry.retrieval_cache", return_value=None):
+        results = hybrid_search_batch([SearchQuery("query0 chunk", 2, 2), SearchQuery("query1", 3, 1)])
+
+    embeddings.embed_documents.assert_called_once_with(["query0 chunk", "query1"])
+    backend.query.assert_called_once_with([[0.1], [0.2]], 6, None)
+    assert [len(r) for r in results] == [2, 1]
+    assert all(d.id.startswith("c0") for d in results[0])
+    assert results[1][0].id.startswith("c1")
+
+
+def test_batch_keyword_timing_excludes_the_concurrent_vector_leg():
+    import time
+
+    from src.search.hybrid import SearchQuery, hybrid_search_batch
+
+    docs = [Document(page_content=f"chunk {i}", metadata={}, id=f"c{i}") for i in range(4)]
+    embeddings = MagicMock()
+    embeddings.embed_documents.return_value = [[0.1], [0.2]]
+    backend = _fake_backend(docs)
+
+    def slow_query_ids(vectors, k, where=None):
+        time.sleep(0.2)
+        return [[("c0", 0.9), ("c1", 0.8)] for _ in vectors]
+
+    backend.query_ids.side_effect = slow_query_ids
+    index = MagicMock()
+    index.count.return_value = 4
+    index.search_many.return_value = [[("c1", 2.0)], [("c2", 1.0)]]
+
+    timings = {}
+    with patch("src.search.hybrid.get_embeddings", return_value=embeddings), \
+            patch("src.search.hybrid.get_vector_backend", return_value=backend), \
+            patch("src.search.hybrid.get_keyword_index", return_value=index), \
+            patch("src.search.hybrid.registry.retrieval_cache", return_value=None):
+        hybrid_search_batch([SearchQuery("chunk one"), SearchQuery("chunk two")], timings=timings)
+
+    assert timings["vector_ms"] >= 200
+    assert timings["keyword_ms"] < 100
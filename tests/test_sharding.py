@@ -0,0 +1,120 @@
+"""Tests for named collections and hash-sharded vector backends."""
+
+import tempfile
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from benchmarks.corpus import synthetic_documents
+from benchmarks.suite import isolated, override_settings
+from src.ingestion.embedder import (
+    chunk_ids,
+    delete_chunks,
+    get_collection_stats,
+    get_collection_version,
+    ingest_documents,
+)
+from src.ingestion.loader import chunk_documents
+from src.search.hybrid import SearchQuery, hybrid_search, hybrid_search_batch
+from src.search.numpy_backend import NumpyBackend
+from src.search.sharding import ShardedBackend, resolve_collections, shard_names, shard_of
+
+
+def _corpus(n=300, dim=16, seed=0):
+    rng = np.random.default_rng(seed)
+    vectors = rng.normal(size=(n, dim)).astype(np.float32)
+    return [f"c{i}" for i in range(n)], vectors
+
+
+def test_sharded_backend_matches_a_single_index(tmp_path):
+    ids, vectors = _corpus()
+    texts = [f"text {i}" for i in ids]
+    metadatas = [{"page": i} for i in range(len(ids))]
+    single = NumpyBackend(tmp_path / "single")
+    shards = [NumpyBackend(tmp_path / name) for name in shard_names("docs", 4)]
+    sharded = ShardedBackend(shards)
+    try:
+        single.upsert(ids, vectors.tolist(), texts, metadatas)
+        sharded.upsert(ids, vectors.tolist(), texts, metadatas)
+
+        assert sharded.count() == len(ids)
+        assert [shard.count() for shard in shards] == [
+            sum(shard_of(i, 4) == n for i in ids) for n in range(4)
+        ]
+        assert all(shard.count() for shard in shards)
+
+        queries = (vectors[:5] + 0.1).tolist()
+        expected = [[chunk_id for chunk_id, _ in hits] for hits in single.query_ids(queries, 10)]
+        assert [[chunk_id for chunk_id, _ in hits] for hits in sharded.query_ids(queries, 10)] == expected
+        assert [[doc.id for doc, _ in hits] for hits in sharded.query(queries, 10)] == expected
+
+        assert [doc.id for doc in sharded.get(["c7", "missing", "c3"])] == ["c7", "c3"]
+        sharded.delete(["c7", "missing"])
+        assert sharded.existing_ids(["c7", "c3"]) == {"c3"}
+        assert sharded.sample_vectors(50).shape == (50, 16)
+    finally:
+        single.close()
+        sharded.close()
+
+
+def test_collection_names_are_validated():
+    assert resolve_collections(None) == ("documents",)
+    assert resolve_collections(["team-a", "team_b", "team-a"]) == ("team-a", "team_b")
+    assert shard_names("docs", 1) == ["docs"]
+    for bad in ["a", "-leading", "with space", "../escape"]:
+        with pytest.raises(ValueError):
+            resolve_collections([bad])
+
+
+def test_search_targets_a_subset_of_sharded_collections():
+    alpha = chunk_documents(synthetic_documents(files=2, pages_per_file=2, words_per_page=150, seed=1))
+    beta = chunk_documents(synthetic_documents(files=2, pages_per_file=2, words_per_page=150, seed=2))
+    alpha_ids, beta_ids = set(chunk_ids(alpha)), set(chunk_ids(beta))
+    question = " ".join(alpha[0].page_content.split()[:12])
+
+    with tempfile.TemporaryDirectory() as workdir, isolated(Path(workdir), backend="numpy", shards=3):
+        ingest_documents(alpha, collection="alpha")
+        ingest_documents(beta, collection="beta")
+        assert get_collection_stats("alpha")["total_documents"] == len(alpha_ids)
+        assert get_collection_stats("alpha")["shards"] == 3
+        assert get_collection_stats()["total_documents"] == 0
+
+        only_beta = hybrid_search(question, collections=["beta"])
+        both = hybrid_search(question, collections=["alpha", "beta"])
+        batch = hybrid_search_batch([
+            SearchQuery(question, collections=["alpha"]),
+            SearchQuery(question, collections=["alpha", "beta"]),
+        ])
+
+    assert only_beta and {doc.id for doc in only_beta} <= beta_ids
+    assert both[0].id == chunk_ids(alpha)[0]
+    assert {doc.id for doc in both} & beta_ids
+    assert {doc.id for doc in batch[0]} <= alpha_ids
+    assert [doc.id for doc in batch[1]] == [doc.id for doc in both]
+
+
+def test_changing_one_collection_keeps_other_collections_cached():
+    alpha = chunk_documents(synthetic_documents(files=2, pages_per_file=2, words_per_page=150, seed=1))
+    beta = chunk_documents(synthetic_documents(files=2, pages_per_file=2, words_per_page=150, seed=2))
+    question = " ".join(alpha[0].page_content.split()[:12])
+
+    with tempfile.TemporaryDirectory() as workdir, isolated(Path(workdir), backend="numpy"), \
+            override_settings(retrieval_cache_enabled=True):
+        ingest_documents(alpha, collection="alpha")
+        ingest_documents(beta[:2], collection="beta")
+        before = get_collection_version(["alpha", "beta"])
+        hybrid_search(question, collections=["alpha"])
+        hybrid_search(question, collections=["alpha", "beta"])
+
+        ingest_documents(beta[2:], collection="beta")
+        delete_chunks(chunk_ids(beta[:1]), collection="beta")
+        after = get_collection_version(["alpha", "beta"])
+        alpha_timings, both_timings = {}, {}
+        hybrid_search(question, collections=["alpha"], timings=alpha_timings)
+        hybrid_search(question, collections=["alpha", "beta"], timings=both_timings)
+
+    assert before == (("alpha", 1), ("beta", 1))
+    assert after == (("alpha", 1), ("beta", 3))
+    assert "cache_ms" in alpha_timings
+    assert "cache_ms" not in both_timings